@@ -0,0 +1,107 @@
+"""extension.to_safe_image 기존 구현과 새 구현의 처리시간/최대 메모리(RSS) 비교
+
+사용법 (저장소 루트에서):
+    python benchmarks/image_sanitize.py
+
+측정마다 별도 프로세스를 띄워 ru_maxrss 가 이전 측정의 영향을 받지 않도록 한다.
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src", "intranet_team1"))
+
+
+def legacy_to_safe_image(file):
+    # 변경 전 extension.to_safe_image (비교용 사본)
+    from PIL import Image, ImageSequence
+    try:
+        Image.open(file).verify()
+        file.seek(0)
+        image = Image.open(file)
+        output = BytesIO()
+
+        if image.format == "GIF":
+            frames = [f.copy() for f in ImageSequence.Iterator(image)]
+            if len(frames) > 1:
+                frames[0].save(
+                    output, format="GIF", save_all=True,
+                    append_images=frames[1:], loop=0,
+                    duration=image.info.get("duration", 100),
+                    disposal=image.info.get("disposal", 2)
+                )
+            else:
+                image.save(output, format="GIF")
+        else:
+            image = image.convert("RGB")
+            img = Image.new(image.mode, image.size)
+            img.putdata(list(image.getdata()))
+            img.save(output, format="JPEG", quality=85)
+
+        output.seek(0)
+        return output
+    except:
+        return None
+
+
+def make_samples(directory):
+    from PIL import Image
+    samples = {}
+
+    # 휴대폰 사진 크기(12MP) JPEG - 노이즈를 섞어 실제 사진과 비슷한 압축률로 만든다
+    photo = Image.effect_noise((4000, 3000), 64).convert("RGB")
+    path = os.path.join(directory, "photo_12mp.jpg")
+    photo.save(path, format="JPEG", quality=90)
+    samples["jpeg 4000x3000"] = path
+
+    png = Image.effect_noise((2000, 2000), 32).convert("RGB")
+    path = os.path.join(directory, "image_4mp.png")
+    png.save(path, format="PNG")
+    samples["png 2000x2000"] = path
+
+    frames = [Image.effect_noise((480, 360), 20 + i).convert("P") for i in range(60)]
+    path = os.path.join(directory, "animated.gif")
+    frames[0].save(path, format="GIF", save_all=True, append_images=frames[1:], duration=50, loop=0)
+    samples["gif 480x360 x60"] = path
+    return samples
+
+
+def run_one(variant, path):
+    # 자식 프로세스에서 실행: 한 번 처리하고 시간/최대 RSS 출력
+    with open(path, "rb") as f:
+        data = f.read()
+    if variant == "legacy":
+        func = legacy_to_safe_image
+    else:
+        from extension import to_safe_image as func
+
+    started = time.perf_counter()
+    result = func(BytesIO(data))
+    elapsed = time.perf_counter() - started
+    max_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    size = len(result.getvalue()) if result else 0
+    print(f"{elapsed:.3f} {max_rss_kb} {size}")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        samples = make_samples(directory)
+        print(f"{'sample':<20}{'variant':<10}{'time(s)':>10}{'peak RSS(MB)':>15}{'output(KB)':>12}")
+        for label, path in samples.items():
+            for variant in ("legacy", "new"):
+                out = subprocess.run([sys.executable, __file__, "--run", variant, path],
+                                     capture_output=True, text=True, check=True).stdout.split()
+                elapsed, rss_kb, size = float(out[0]), int(out[1]), int(out[2])
+                print(f"{label:<20}{variant:<10}{elapsed:>10.3f}{rss_kb / 1024:>15.1f}{size / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--run":
+        run_one(sys.argv[2], sys.argv[3])
+    else:
+        main()
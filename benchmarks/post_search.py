@@ -0,0 +1,105 @@
+"""게시판 검색: 기존 $regex 검색과 bigram 색인 검색(services/post_search.py)의 응답시간 비교
+
+사용법 (저장소 루트에서, 실행 중인 MongoDB 필요):
+    MONGO_URI=mongodb://localhost:27017 python benchmarks/post_search.py [게시글 수, 기본 100000]
+
+MONGO_DB_NAME(기본 intranet_bench_search) DB 를 만들어 쓰고 끝나면 삭제한다. 운영 DB 이름을 주지 말 것.
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src", "intranet_team1"))
+os.environ.setdefault("MONGO_DB_NAME", "intranet_bench_search")
+
+WORDS = ["개발팀", "회의", "배포", "일정", "서버", "장애", "보고서", "점심", "휴가", "신규", "고객사", "계약",
+         "데이터베이스", "프론트엔드", "백엔드", "디자인", "테스트", "릴리즈", "공지", "질문", "답변", "회식",
+         "프로젝트", "마감", "검토", "요청", "승인", "인프라", "모니터링", "로그"]
+# 대부분의 글에 나오는 단어 (COMMON_RATIO). 후보가 컬렉션 전체에 가까워지는 경우를 측정한다
+COMMON_WORD = "회의록"
+COMMON_RATIO = 0.8
+QUERIES = ["개발팀", "데이터베이스 장애", "모니터링", "회식 공지", "릴리즈 일정", COMMON_WORD]
+REPEAT = 5
+
+
+def make_vocabulary(rng, size=5000):
+    # 실제 게시판처럼 단어 종류가 많아야 검색어가 일부 글에만 나온다
+    syllables = [chr(code) for code in range(0xAC00, 0xD7A4, 37)]
+    vocabulary = set(WORDS)
+    while len(vocabulary) < size:
+        vocabulary.add("".join(rng.choices(syllables, k=rng.randint(2, 4))))
+    return sorted(vocabulary)
+
+
+def make_posts(db, count):
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng)
+    base = datetime(2024, 1, 1)
+    batch = []
+    for i in range(count):
+        content = rng.choices(vocabulary, k=60)
+        if rng.random() < COMMON_RATIO:
+            content.append(COMMON_WORD)
+        batch.append({
+            "title": " ".join(rng.choices(vocabulary, k=4)),
+            "content": " ".join(content),
+            "category": rng.choice(["free", "qna", "notice"]),
+            "author_id": None,
+            "created_at": base + timedelta(minutes=i),
+            "comments": [],
+        })
+        if len(batch) == 5000:
+            db.posts.insert_many(batch)
+            batch = []
+    if batch:
+        db.posts.insert_many(batch)
+
+
+def regex_search(db, query):
+    # 변경 전 write_route.home 의 검색 (20건만 화면에 쓴다고 가정)
+    cond = {"$or": [{"title": {"$regex": query, "$options": "i"}},
+                    {"content": {"$regex": query, "$options": "i"}}]}
+    return list(db.posts.find(cond).sort("created_at", -1).limit(20))
+
+
+def measure(func):
+    times = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    from db import get_db
+    from services.indexes import INDEXES
+    from services.post_search import rebuild_post_search, search_posts
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    db = get_db()
+    db.client.drop_database(db.name)
+    try:
+        print(f"게시글 {count}건 생성 중...")
+        make_posts(db, count)
+        db.posts.create_indexes(INDEXES["posts"])
+        db.post_search.create_indexes(INDEXES["post_search"])
+        started = time.perf_counter()
+        rebuild_post_search()
+        print(f"색인 생성 {time.perf_counter() - started:.1f}s")
+
+        print(f"{'query':<20}{'regex(ms)':>12}{'bigram(ms)':>12}")
+        for query in QUERIES:
+            regex_ms = measure(lambda: regex_search(db, query))
+            bigram_ms = measure(lambda: search_posts(query))
+            print(f"{query:<20}{regex_ms:>12.1f}{bigram_ms:>12.1f}")
+    finally:
+        db.client.drop_database(db.name)
+
+
+if __name__ == "__main__":
+    main()
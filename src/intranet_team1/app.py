@@ -1,15 +1,16 @@
 from datetime import timedelta
-import io
+import logging
 import os
-from flask import Flask, jsonify, render_template, request, redirect, url_for, send_file
+from flask import Flask, jsonify, render_template, request, redirect, url_for
 from flask_login import LoginManager, current_user
-from db import mongo_db
+from db import mongo_db, init_app as init_db, close_client
 
 from routes.write_route import write_bp
 from routes.task_route import task_bp
 from routes.issue_route import issue_bp
 from routes.client_route import client_bp
 from routes.auth_route import auth_bp
+from routes.monitor_route import monitor_bp
 
 from routes.hr.att_route import att_bp
 from routes.hr.vc_route import vacation_bp
@@ -17,9 +18,16 @@ from routes.hr.vc_admin_route import vacation_admin_bp
 from routes.hr.emp_admin_route import emp_admin_bp
 from routes.hr.hr_stats_route import hr_stats_bp
 
-from bson.objectid import ObjectId
 from models.user import User
-from extension import get_fs
+from commands import register_commands
+from services.indexes import ensure_indexes
+from services.profiler import init_profiler
+from services.user_cache import init_user_cache, load_user_record
+from services.file_stream import send_gridfs_file
+from services.avatar import AVATAR_FORMATS, AVATAR_SIZES, find_avatar_file_id
+from services.uploads import init_uploads
+from services.contract_expiry import init_contract_expiry
+from pymongo.errors import PyMongoError
 
 is_debug = os.getenv("FLASK_ENV") != "production"
 
@@ -31,6 +39,14 @@ app.config.update(
     REMEMBER_COOKIE_HTTPONLY=True,
 )
 app.config['REMEMBER_COOKIE_DURATION'] = timedelta(days=30)
+app.config['ENSURE_INDEXES_ON_STARTUP'] = os.getenv("ENSURE_INDEXES_ON_STARTUP", "1") == "1"
+app.config['MONGO_PROFILER_ENABLED'] = is_debug
+init_db(app)
+# 다른 before_request 훅(로그인 확인 등)의 쿼리까지 집계되도록 가장 먼저 등록
+init_profiler(app)
+init_user_cache(app)
+init_uploads(app)
+init_contract_expiry(app)
 
 login_manager = LoginManager(app)
 login_manager.login_view = "auth.login_get"
@@ -38,7 +54,7 @@ login_manager.session_protection = "strong"
 
 @login_manager.user_loader
 def load_user(user_id):
-    user_data = mongo_db.hr.find_one({"_id": ObjectId(user_id)})
+    user_data = load_user_record(user_id)
     if user_data:
         return User(user_data)
     return None
@@ -59,17 +75,21 @@ def home():
 @app.route("/files/<file_id>", methods=['GET'])
 def file_download(file_id):
     try:
-        fs = get_fs()
-        file_obj = fs.get(ObjectId(file_id))
-        return send_file(
-            io.BytesIO(file_obj.read()),
-            mimetype=file_obj.content_type or "application/ocpython app.pytet-stream",
-            download_name=file_obj.filename or "download",
-            as_attachment=True
-        )
+        return send_gridfs_file(file_id, as_attachment=True)
     except Exception:
         return jsonify({"error": "파일을 찾을 수 없습니다."}), 404
 
+# 프로필 썸네일 - URL 에 내용 해시가 들어가므로 1년간 재검증 없이 캐시
+@app.route("/avatars/<digest>/<int:size>.<fmt>", methods=['GET'])
+def avatar(digest, size, fmt):
+    if size not in AVATAR_SIZES or fmt not in AVATAR_FORMATS:
+        return jsonify({"error": "지원하지 않는 크기/형식입니다."}), 404
+    file_id = find_avatar_file_id(digest, size, fmt)
+    if not file_id:
+        return jsonify({"error": "파일을 찾을 수 없습니다."}), 404
+    return send_gridfs_file(file_id, as_attachment=False,
+                            cache_control="private, max-age=31536000, immutable")
+
 app.register_blueprint(write_bp)
 app.register_blueprint(task_bp)
 app.register_blueprint(att_bp)
@@ -80,6 +100,19 @@ app.register_blueprint(hr_stats_bp)
 app.register_blueprint(issue_bp)
 app.register_blueprint(client_bp)
 app.register_blueprint(auth_bp)
+app.register_blueprint(monitor_bp)
+
+register_commands(app)
+
+# 부팅 시 인덱스 동기화 (DB 연결 실패 시 앱 기동은 계속)
+if app.config['ENSURE_INDEXES_ON_STARTUP']:
+    try:
+        ensure_indexes(mongo_db)
+    except PyMongoError as e:
+        logging.warning(f"인덱스 동기화 실패: {e}")
+    finally:
+        # 프리포크 서버의 마스터 프로세스에서 만든 클라이언트는 워커로 넘기지 않는다
+        close_client()
 
 if __name__ == '__main__':
     app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,128 @@
+import click
+from db import mongo_db
+from services.indexes import ensure_indexes, explain_query_shapes
+from services.avatar import backfill_avatars
+from services.file_refs import dedup_report
+from services.counters import backfill_issue_sequences, reconcile_counters
+from services.post_search import rebuild_post_search
+from services.client_autocomplete import rebuild_client_autocomplete
+from services.post_comments import migrate_embedded_comments
+from services.client_list import backfill_client_list
+from services.contract_expiry import scan_contract_expiry
+from services.org_catalogue import rebuild_org_catalogue
+from services.gridfs_gc import DEFAULT_BATCH_SIZE, DEFAULT_GRACE_HOURS, collect_garbage
+
+# 사용법 (src/intranet_team1 에서 실행)
+#   flask --app app ensure-indexes
+#   flask --app app check-indexes
+#   flask --app app backfill-avatars
+#   flask --app app gridfs-dedup-report
+#   flask --app app gridfs-gc [--dry-run] [--grace-hours 24] [--batch-size 500]
+#   flask --app app backfill-issue-seq
+#   flask --app app reconcile-counters [--dry-run]
+#   flask --app app rebuild-post-search
+#   flask --app app rebuild-client-autocomplete
+#   flask --app app migrate-post-comments
+#   flask --app app backfill-client-list
+#   flask --app app contract-expiry-scan
+#   flask --app app rebuild-org-catalogue
+
+
+def register_commands(app):
+    @app.cli.command("ensure-indexes")
+    def ensure_indexes_command():
+        """선언된 인덱스를 생성하고 불일치를 출력"""
+        report = ensure_indexes(mongo_db)
+        for label, key in [("생성", "created"), ("불일치", "drift"), ("미선언", "extra"), ("오류", "errors")]:
+            for item in report[key]:
+                click.echo(f"[{label}] {item}")
+        if report["drift"] or report["errors"]:
+            raise SystemExit(1)
+
+    @app.cli.command("check-indexes")
+    def check_indexes_command():
+        """라우트별 쿼리의 실행계획을 검사하고 COLLSCAN 이 있으면 실패"""
+        results = explain_query_shapes(mongo_db)
+        for r in results:
+            mark = "COLLSCAN" if r["collscan"] else "OK"
+            click.echo(f"[{mark}] {r['route']} ({r['collection']}): {' > '.join(r['stages'])}")
+        if any(r["collscan"] for r in results):
+            raise SystemExit(1)
+
+    @app.cli.command("backfill-avatars")
+    def backfill_avatars_command():
+        """썸네일이 없는 직원 프로필 사진의 썸네일 생성"""
+        result = backfill_avatars()
+        click.echo(f"생성 {result['created']}건, 실패 {result['failed']}건")
+
+    @app.cli.command("gridfs-dedup-report")
+    def gridfs_dedup_report_command():
+        """첨부파일 중복 제거로 절약한 용량 출력"""
+        report = dedup_report()
+        click.echo(f"파일 {report['files']}개 / 참조 {report['references']}개")
+        click.echo(f"저장 용량 {report['stored_bytes'] / 1024 / 1024:.1f}MB, "
+                   f"절약 용량 {report['saved_bytes'] / 1024 / 1024:.1f}MB")
+
+    @app.cli.command("gridfs-gc")
+    @click.option("--dry-run", is_flag=True, help="삭제하지 않고 대상만 집계")
+    @click.option("--grace-hours", default=DEFAULT_GRACE_HOURS, show_default=True, help="이 시간보다 오래된 파일만 정리")
+    @click.option("--batch-size", default=DEFAULT_BATCH_SIZE, show_default=True)
+    def gridfs_gc_command(dry_run, grace_hours, batch_size):
+        """어디에서도 참조하지 않는 GridFS 파일 정리"""
+        report = collect_garbage(grace_hours=grace_hours, batch_size=batch_size, dry_run=dry_run)
+        label = "삭제 대상" if dry_run else "삭제"
+        click.echo(f"검사 {report['scanned']}개, {label} {report['files']}개 "
+                   f"({report['bytes'] / 1024 / 1024:.1f}MB)")
+        click.echo(f"파일 정보 없는 청크: {report['orphan_chunk_files']}개 파일분 "
+                   f"({report['orphan_chunk_bytes'] / 1024 / 1024:.1f}MB)")
+
+    @app.cli.command("backfill-issue-seq")
+    def backfill_issue_seq_command():
+        """기존 이슈에 family 별 글 번호(seq) 부여"""
+        for family_name, count in backfill_issue_sequences(["backend", "frontend", "ui"]).items():
+            click.echo(f"{family_name}: {count}건")
+
+    @app.cli.command("reconcile-counters")
+    @click.option("--dry-run", is_flag=True, help="바로잡지 않고 차이만 출력")
+    def reconcile_counters_command(dry_run):
+        """이슈/업무 대시보드 카운터를 원본 데이터로 다시 계산하고 차이 출력"""
+        report = reconcile_counters(dry_run=dry_run)
+        for item in report["drift"]:
+            click.echo(f"[불일치] {item['id']}: 카운터={item['actual']} 실제={item['expected']}")
+        click.echo(f"검사 {report['checked']}개, 불일치 {len(report['drift'])}개")
+
+    @app.cli.command("rebuild-post-search")
+    def rebuild_post_search_command():
+        """게시판 검색 색인(post_search)을 모든 게시글로 다시 만든다"""
+        click.echo(f"색인 {rebuild_post_search()}건")
+
+    @app.cli.command("rebuild-client-autocomplete")
+    def rebuild_client_autocomplete_command():
+        """고객사 자동완성 색인(client_autocomplete)을 모든 고객사로 다시 만든다"""
+        click.echo(f"색인 {rebuild_client_autocomplete()}건")
+
+    @app.cli.command("migrate-post-comments")
+    def migrate_post_comments_command():
+        """게시글에 들어 있는 댓글 배열을 post_comments bucket 으로 옮긴다 (다시 실행해도 안전)"""
+        posts, comments = migrate_embedded_comments()
+        click.echo(f"게시글 {posts}건, 댓글 {comments}건 이동")
+
+    @app.cli.command("backfill-client-list")
+    def backfill_client_list_command():
+        """기존 고객사에 목록 정렬/검색용 필드(status_order, search_keys)를 채우고 계약일을 datetime 으로 맞춘다"""
+        click.echo(f"고객사 {backfill_client_list()}건 갱신")
+
+    @app.cli.command("contract-expiry-scan")
+    def contract_expiry_scan_command():
+        """계약 만료 검사를 지금 한 번 실행 (스케줄러 잠금과 무관)"""
+        digest = scan_contract_expiry()
+        for item in digest["transitions"]:
+            click.echo(f"[변경] {item['company_name']}: {item['from'] or '정상'} -> {item['to'] or '정상'}")
+        if digest["transitions_total"] > len(digest["transitions"]):
+            click.echo(f"... 외 상태 변경 {digest['transitions_total'] - len(digest['transitions'])}건")
+        click.echo(f"임박 {len(digest['soon'])}건, 최근 만료 {len(digest['recent_expired'])}건, 전체 만료 {digest['expired_total']}건")
+
+    @app.cli.command("rebuild-org-catalogue")
+    def rebuild_org_catalogue_command():
+        """부서/직위/직책 목록과 인원수(org_catalogue)를 직원 정보로 다시 만든다"""
+        click.echo(f"항목 {rebuild_org_catalogue()}개")
@@ -1,4 +1,189 @@
-from pymongo import MongoClient
+import os
+import threading
+from pymongo import MongoClient, monitoring
+from werkzeug.local import LocalProxy
+from services.profiler import query_profiler
 
-mongo_client = MongoClient("mongodb://localhost:27017")
-mongo_db = mongo_client["intranet"]
\ No newline at end of file
+# ========== ⚙️ MongoDB 접속 설정 ==========
+# app.config 에 같은 키로 값을 넣으면 init_app() 에서 덮어쓴다. (환경변수로도 지정 가능)
+DEFAULT_SETTINGS = {
+    "MONGO_URI": os.getenv("MONGO_URI", "mongodb://localhost:27017"),
+    "MONGO_DB_NAME": os.getenv("MONGO_DB_NAME", "intranet"),
+    "MONGO_MAX_POOL_SIZE": int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+    "MONGO_MIN_POOL_SIZE": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000")),
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+    # 설치된 압축 라이브러리만 사용 (zstd: zstandard, snappy: python-snappy 패키지 필요)
+    "MONGO_COMPRESSORS": os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib"),
+    # primary / primaryPreferred / secondary / secondaryPreferred / nearest
+    "MONGO_READ_PREFERENCE": os.getenv("MONGO_READ_PREFERENCE", "primary"),
+}
+
+_settings = dict(DEFAULT_SETTINGS)
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+
+
+# ========== 📊 커넥션 풀 통계 ==========
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """커넥션 체크아웃 횟수/대기시간을 프로세스 단위로 집계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_failures = {}
+            self.total_wait_s = 0.0
+            self.max_wait_s = 0.0
+            self.in_use = 0
+            self.peak_in_use = 0
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.pool_cleared_count = 0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_failures": dict(self.checkout_failures),
+                "avg_wait_ms": round(self.total_wait_s * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_s * 1000, 3),
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "pool_cleared": self.pool_cleared_count,
+            }
+
+    def connection_checked_out(self, event):
+        wait = event.duration or 0.0
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_s += wait
+            self.max_wait_s = max(self.max_wait_s, wait)
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures[event.reason] = self.checkout_failures.get(event.reason, 0) + 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_cleared_count += 1
+
+    # 사용하지 않는 이벤트
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_check_out_started(self, event): pass
+
+
+pool_stats = PoolStatsListener()
+
+
+def _available_compressors(names):
+    # 요청한 압축 방식 중 실제로 import 가능한 것만 남긴다 (없으면 pymongo 가 경고를 낸다)
+    available = []
+    for name in [n.strip() for n in names.split(",") if n.strip()]:
+        try:
+            if name == "zstd":
+                import zstandard  # noqa: F401
+            elif name == "snappy":
+                import snappy  # noqa: F401
+        except ImportError:
+            continue
+        available.append(name)
+    return available
+
+
+def _create_client():
+    kwargs = {
+        "maxPoolSize": _settings["MONGO_MAX_POOL_SIZE"],
+        "minPoolSize": _settings["MONGO_MIN_POOL_SIZE"],
+        "waitQueueTimeoutMS": _settings["MONGO_WAIT_QUEUE_TIMEOUT_MS"],
+        "serverSelectionTimeoutMS": _settings["MONGO_SERVER_SELECTION_TIMEOUT_MS"],
+        "readPreference": _settings["MONGO_READ_PREFERENCE"],
+        "event_listeners": [pool_stats, query_profiler],
+    }
+    compressors = _available_compressors(_settings["MONGO_COMPRESSORS"])
+    if compressors:
+        kwargs["compressors"] = compressors
+    return MongoClient(_settings["MONGO_URI"], **kwargs)
+
+
+def _reset_after_fork():
+    # fork 된 자식 프로세스는 부모의 클라이언트(소켓, 모니터 스레드)를 쓰지 않고 새로 만든다
+    global _lock, _client, _client_pid
+    _lock = threading.Lock()
+    _client = None
+    _client_pid = None
+    pool_stats.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_client():
+    """현재 프로세스 전용 MongoClient 를 반환 (최초 사용 시 생성)"""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _lock:
+            if _client is None or _client_pid != pid:
+                _client = _create_client()
+                _client_pid = pid
+    return _client
+
+
+def get_db():
+    return get_client()[_settings["MONGO_DB_NAME"]]
+
+
+def close_client():
+    global _client, _client_pid
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+def get_pool_stats():
+    return {
+        "pid": os.getpid(),
+        "max_pool_size": _settings["MONGO_MAX_POOL_SIZE"],
+        "wait_queue_timeout_ms": _settings["MONGO_WAIT_QUEUE_TIMEOUT_MS"],
+        **pool_stats.snapshot(),
+    }
+
+
+def init_app(app):
+    """app.config 의 MONGO_* 설정을 반영 (이미 만들어진 클라이언트는 닫고 다음 사용 시 재생성)"""
+    for key, value in DEFAULT_SETTINGS.items():
+        app.config.setdefault(key, value)
+        _settings[key] = app.config[key]
+    close_client()
+    app.extensions["mongo_db"] = mongo_db
+
+
+# 기존 코드와의 호환용: 속성/인덱스 접근 시점에 현재 프로세스의 DB 로 위임된다
+mongo_db = LocalProxy(get_db)
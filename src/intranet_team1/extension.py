@@ -1,39 +1,110 @@
 from db import mongo_db
 import imghdr
-from PIL import Image, ImageSequence
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps, ImageSequence
 from io import BytesIO
 
 def get_fs():
     from gridfs import GridFS
     return GridFS(mongo_db)
 
+# ========== 🖼 업로드 이미지 정제 ==========
+# 디코딩 전에 헤더 정보만으로 크기/프레임 수를 검사하고, 큰 이미지는 줄여서 다시 저장한다.
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", 20 * 1024 * 1024))
+MAX_IMAGE_EDGE = 10000            # 원본 가로/세로 최대 픽셀
+MAX_IMAGE_PIXELS = 50_000_000     # 원본 총 픽셀 수 (약 50MP)
+MAX_GIF_FRAMES = 200
+MAX_GIF_TOTAL_PIXELS = 100_000_000  # 프레임 수 x 프레임 픽셀
+OUTPUT_MAX_EDGE = 2048            # 저장 이미지 긴 변 최대 길이
+OUTPUT_GIF_MAX_EDGE = 512
+# 0 이면 요청 스레드에서 바로 처리, 1 이상이면 별도 프로세스 풀에서 처리
+IMAGE_SANITIZE_WORKERS = int(os.getenv("IMAGE_SANITIZE_WORKERS", "0"))
+IMAGE_SANITIZE_TIMEOUT = 30
+
+_pool = None
+_pool_pid = None
+
+
+def _check_dimensions(image):
+    width, height = image.size
+    if width <= 0 or height <= 0 or width > MAX_IMAGE_EDGE or height > MAX_IMAGE_EDGE:
+        raise ValueError(f"이미지 크기 초과: {width}x{height}")
+    if width * height > MAX_IMAGE_PIXELS:
+        raise ValueError(f"이미지 픽셀 수 초과: {width * height}")
+
+
+def _sanitize_gif(image, output):
+    # n_frames 는 프레임 데이터를 디코딩하지 않고 블록 구조만 읽어서 센다
+    n_frames = getattr(image, "n_frames", 1)
+    width, height = image.size
+    if n_frames > MAX_GIF_FRAMES or n_frames * width * height > MAX_GIF_TOTAL_PIXELS:
+        raise ValueError(f"GIF 프레임 초과: {n_frames}프레임 {width}x{height}")
+
+    durations = []
+    frames = []
+    for frame in ImageSequence.Iterator(image):
+        durations.append(frame.info.get("duration", image.info.get("duration", 100)))
+        copied = frame.convert("RGBA")
+        copied.thumbnail((OUTPUT_GIF_MAX_EDGE, OUTPUT_GIF_MAX_EDGE))
+        frames.append(copied)
+
+    if len(frames) > 1:
+        frames[0].save(output, format="GIF", save_all=True, append_images=frames[1:],
+                       loop=0, duration=durations, disposal=2)
+    else:
+        frames[0].save(output, format="GIF")
+
+
+def _sanitize_bytes(data):
+    """이미지 바이트를 다시 인코딩해 메타데이터/부가 데이터를 제거 (프로세스 풀에서도 호출됨)"""
+    with Image.open(BytesIO(data)) as probe:
+        probe.verify()
+
+    with Image.open(BytesIO(data)) as image:
+        _check_dimensions(image)
+        output = BytesIO()
+
+        if image.format == "GIF":
+            _sanitize_gif(image, output)
+        else:
+            # JPEG 는 축소된 해상도로 바로 디코딩해서 큰 사진의 메모리/시간을 줄인다
+            image.draft("RGB", (OUTPUT_MAX_EDGE, OUTPUT_MAX_EDGE))
+            # EXIF 를 버리기 전에 회전 정보를 실제 픽셀에 반영
+            clean = ImageOps.exif_transpose(image).convert("RGB")
+            clean.thumbnail((OUTPUT_MAX_EDGE, OUTPUT_MAX_EDGE), Image.Resampling.LANCZOS)
+            clean.info = {}
+            clean.save(output, format="JPEG", quality=85)
+
+    return output.getvalue()
+
+
+def _get_pool():
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        # 스레드가 있는 웹 워커를 fork 하지 않도록 spawn 방식으로 생성
+        _pool = ProcessPoolExecutor(max_workers=IMAGE_SANITIZE_WORKERS,
+                                    mp_context=multiprocessing.get_context("spawn"))
+        _pool_pid = os.getpid()
+    return _pool
+
+
 def to_safe_image(file):
     try:
-        Image.open(file).verify()
+        data = file.read(MAX_IMAGE_BYTES + 1)
         file.seek(0)
-        image = Image.open(file)
-        output = BytesIO()
+        if len(data) > MAX_IMAGE_BYTES:
+            raise ValueError(f"이미지 용량 초과: {MAX_IMAGE_BYTES} bytes")
 
-        if image.format == "GIF":
-            frames = [f.copy() for f in ImageSequence.Iterator(image)]
-            if len(frames) > 1:
-                frames[0].save(
-                    output, format="GIF", save_all=True,
-                    append_images=frames[1:], loop=0,
-                    duration=image.info.get("duration", 100),
-                    disposal=image.info.get("disposal", 2)
-                )
-            else:
-                image.save(output, format="GIF")
+        if IMAGE_SANITIZE_WORKERS > 0:
+            sanitized = _get_pool().submit(_sanitize_bytes, data).result(timeout=IMAGE_SANITIZE_TIMEOUT)
         else:
-            image = image.convert("RGB")
-            img = Image.new(image.mode, image.size)
-            img.putdata(list(image.getdata()))
-            img.save(output, format="JPEG", quality=85)
-
-        output.seek(0)
-        return output
-    except:
+            sanitized = _sanitize_bytes(data)
+        return BytesIO(sanitized)
+    except Exception as e:
+        logging.warning(f"이미지 정제 실패: {e}")
         return None
 
 def is_allowed_image(file):
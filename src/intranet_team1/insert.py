@@ -1,9 +1,8 @@
-from pymongo import MongoClient
+from db import get_db
 from datetime import datetime
 import bcrypt
 
-client = MongoClient("mongodb://localhost:27017/")
-db = client["intranet"]
+db = get_db()
 
 password_plain = "123"
 hashed_password = bcrypt.hashpw(password_plain.encode("utf-8"), bcrypt.gensalt())
@@ -7,6 +7,7 @@ class User:
         self.email = user_data["email"]
         self.role = user_data.get("role", "user")
         self.profile_image_id = user_data.get("profile_image_id")
+        self.avatar_digest = user_data.get("profile_avatar_digest")
 
     def is_authenticated(self):
         return True
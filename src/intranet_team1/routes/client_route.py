@@ -1,17 +1,20 @@
 from datetime import datetime, timezone
-import io
+from collections import Counter
 import logging
-import mimetypes
-from flask import Blueprint, redirect, render_template, request, url_for, flash, send_file, jsonify
+from flask import Blueprint, redirect, render_template, request, url_for, flash, jsonify
 from bson.objectid import ObjectId
 from bson.errors import InvalidId
-from extension import get_fs
+from services.file_stream import send_gridfs_file
+from services.uploads import store_upload, stream_uploads
+from services.file_refs import release_file
+from services.client_autocomplete import index_client, remove_client
+from services.client_list import CLIENT_PAGE_SIZE, CLIENT_PAGE_SIZE_MAX, EXPIRY_FILTERS, list_clients, list_fields
+from services.contract_expiry import latest_digest
 from db import mongo_db
 from datetime import datetime, timedelta
 import logging
 
 client_bp = Blueprint("client", __name__, url_prefix="/client")
-fs = get_fs()
 
 # ========== 🔧 유틸 함수 ==========
 def get_clients_collection():
@@ -29,7 +32,7 @@ def save_files(files):
     saved = []
     for file in files:
         if file and file.filename:
-            file_id = fs.put(file, filename=file.filename, content_type=file.content_type)
+            file_id = store_upload(file)
             saved.append({
                 "file_id": file_id,
                 "file_name": file.filename,
@@ -46,6 +49,7 @@ from flask import request, redirect, url_for, flash, render_template
 from datetime import datetime
 
 @client_bp.route("/create", methods=["POST"])
+@stream_uploads
 def create():
     form = request.form
 
@@ -82,8 +86,10 @@ def create():
         "contract_files": contract_files,
         "attachments": save_files(request.files.getlist("attachments"))
     }
+    client_doc.update(list_fields(client_doc))
 
     get_clients_collection().insert_one(client_doc)
+    index_client(client_doc)
     flash("고객사 등록이 완료되었습니다.", "success")
     return redirect(url_for("client.show_list"))
 
@@ -92,50 +98,26 @@ def create():
 @client_bp.route("/list", methods=["GET"])
 def show_list():
     search = request.args.get("search", "").strip()
-    query = {
-        "$or": [
-            {"company_name": {"$regex": search, "$options": "i"}},
-            {"department": {"$regex": search, "$options": "i"}},
-            {"contact_person": {"$regex": search, "$options": "i"}},
-            {"email": {"$regex": search, "$options": "i"}}
-        ]
-    } if search else {}
-
-    pipeline = [
-        {"$match": query},
-        {"$addFields": {
-            "status_order": {
-                "$cond": [{"$eq": ["$contract.status", "Active"]}, 0, 1]
-            }
-        }},
-        {"$sort": {"status_order": 1, "_id": -1}}
-    ]
-
-    docs = list(get_clients_collection().aggregate(pipeline))
-
-    now = datetime.now()
-    for doc in docs:
-        contract = doc.get("contract", {})
-        end_date_raw = contract.get("end_date")
-
-        if isinstance(end_date_raw, str):
-            end_date = parse_date(end_date_raw)
-        elif isinstance(end_date_raw, datetime):
-            end_date = end_date_raw
-        else:
-            end_date = None
-
-        if end_date:
-            if end_date < now:
-                contract["highlight"] = "expired"
-            elif end_date - now <= timedelta(days=7):
-                contract["highlight"] = "soon"
-            else:
-                contract["highlight"] = "normal"
-        else:
-            contract["highlight"] = "unknown"
-
-    return render_template("client/list.html", clients=docs, search=search)
+    expiry = request.args.get("expiry", "").strip()
+    if expiry not in EXPIRY_FILTERS:
+        expiry = ""
+    page = max(request.args.get("page", 1, type=int), 1)
+    page_size = min(max(request.args.get("size", CLIENT_PAGE_SIZE, type=int), 1), CLIENT_PAGE_SIZE_MAX)
+
+    # 정렬/검색/만료 구분은 저장된 필드와 인덱스로 처리 (services/client_list.py)
+    result = list_clients(search, expiry or None, page, page_size)
+
+    return render_template("client/list.html", clients=result["clients"], search=search, expiry=expiry,
+                           page=page, page_size=page_size, has_next=result["has_next"], digest=latest_digest())
+
+
+# ========== ✅ 계약 만료 요약 (스케줄러가 만든 최신 digest) ==========
+@client_bp.route("/api/expiry-digest", methods=["GET"])
+def expiry_digest():
+    digest = latest_digest()
+    if not digest:
+        return jsonify({"error": "아직 만료 검사 결과가 없습니다."}), 404
+    return jsonify(digest)
 
 # ========== ✅ 고객사 상세 ==========
 @client_bp.route("/<id>", methods=["GET"])
@@ -161,6 +143,7 @@ def edit_form(id):
     return render_template("client/edit.html", client_doc=client_doc)
 
 @client_bp.route("/<id>/edit", methods=["POST"])
+@stream_uploads
 def edit(id):
     collection = get_clients_collection()
     try:
@@ -189,16 +172,34 @@ def edit(id):
     delete_contract_ids = request.form.getlist("delete_contract_file_ids")
     contract_files = client_doc.get("contract_files", [])
     contract_files = [f for f in contract_files if str(f["file_id"]) not in delete_contract_ids]
-    contract_files += save_files(request.files.getlist("contract_files"))
+    new_contract_files = save_files(request.files.getlist("contract_files"))
+    contract_files += new_contract_files
     updated_doc["contract_files"] = contract_files
 
     delete_ids = request.form.getlist("delete_file_ids")
     attachments = client_doc.get("attachments", [])
     attachments = [f for f in attachments if str(f["file_id"]) not in delete_ids]
-    attachments += save_files(request.files.getlist("attachments"))
+    new_attachments = save_files(request.files.getlist("attachments"))
+    attachments += new_attachments
     updated_doc["attachments"] = attachments
+    new_files = new_contract_files + new_attachments
+    updated_doc.update(list_fields(updated_doc))
 
     collection.update_one({"_id": ObjectId(id)}, {"$set": updated_doc})
+    index_client({"_id": ObjectId(id), "company_name": updated_doc["company_name"]})
+
+    # 목록 항목 하나가 참조 하나. (기존 목록 + 새로 저장한 파일) 에서 최종 목록에 없는 만큼 참조 해제
+    # 새 파일이 기존 파일과 같은 내용이면 같은 id 로 참조가 늘었으므로 그만큼도 함께 해제된다
+    held = Counter(str(f["file_id"]) for f in
+                   client_doc.get("contract_files", []) + client_doc.get("attachments", []) + new_files)
+    held.subtract(str(f["file_id"]) for f in contract_files + attachments)
+    for file_id, count in held.items():
+        for _ in range(count):
+            try:
+                release_file(ObjectId(file_id))
+            except Exception as e:
+                logging.warning(f"삭제한 파일 정리 실패: {file_id} -> {e}")
+
     flash("고객사 정보가 수정되었습니다.", "success")
     return redirect(url_for("client.detail", id=id))
 
@@ -213,34 +214,51 @@ def delete(id):
     if not client_doc:
         return "해당 고객을 찾을 수 없습니다.", 404
 
+    # 같은 파일을 다른 고객사/업무가 참조하고 있으면 참조 수만 줄인다
     for f in client_doc.get("contract_files", []):
         try:
-            fs.delete(ObjectId(f["file_id"]))
+            release_file(ObjectId(f["file_id"]))
         except Exception as e:
             logging.warning(f"계약서 파일 삭제 실패: {f['file_id']} -> {e}")
 
     for f in client_doc.get("attachments", []):
         try:
-            fs.delete(ObjectId(f["file_id"]))
+            release_file(ObjectId(f["file_id"]))
         except Exception as e:
             logging.warning(f"첨부파일 삭제 실패: {f['file_id']} -> {e}")
 
     collection.delete_one({"_id": ObjectId(id)})
+    remove_client(ObjectId(id))
     flash("고객사가 삭제되었습니다.", "info")
     return redirect(url_for("client.show_list"))
 
-# ========== ✅ 계약서 미리보기 ==========
-@client_bp.route("/files/preview/<file_id>", methods=["GET"])
-def file_preview(file_id):
+# ========== ✅ 첨부파일 다운로드 / 계약서 미리보기 ==========
+# 같은 내용의 파일은 GridFS 에 한 번만 저장되므로 파일명은 이 고객사 문서에 저장된 이름을 사용한다
+def _client_file_name(id, file_id):
+    client_doc = get_clients_collection().find_one(
+        {"_id": ObjectId(id)}, {"contract_files.file_id": 1, "contract_files.file_name": 1,
+                                "attachments.file_id": 1, "attachments.file_name": 1})
+    for f in (client_doc or {}).get("contract_files", []) + (client_doc or {}).get("attachments", []):
+        if str(f["file_id"]) == file_id:
+            return f.get("file_name") or "download"
+    return None
+
+@client_bp.route("/<id>/files/<file_id>", methods=["GET"])
+def file_download(id, file_id):
+    try:
+        file_name = _client_file_name(id, file_id)
+        if file_name:
+            return send_gridfs_file(file_id, as_attachment=True, download_name=file_name)
+    except Exception as e:
+        logging.warning(f"파일 다운로드 실패: {file_id} -> {e}")
+    return jsonify({"error": "파일을 찾을 수 없습니다."}), 404
+
+@client_bp.route("/<id>/files/<file_id>/preview", methods=["GET"])
+def file_preview(id, file_id):
     try:
-        file_obj = fs.get(ObjectId(file_id))
-        mimetype = file_obj.content_type or mimetypes.guess_type(file_obj.filename)[0] or "application/octet-stream"
-        return send_file(
-            io.BytesIO(file_obj.read()),
-            mimetype=mimetype,
-            download_name=file_obj.filename or "preview",
-            as_attachment=False
-        )
+        file_name = _client_file_name(id, file_id)
+        if file_name:
+            return send_gridfs_file(file_id, as_attachment=False, download_name=file_name)
     except Exception as e:
         logging.warning(f"파일 미리보기 실패: {file_id} -> {e}")
-        return jsonify({"error": "파일을 찾을 수 없습니다."}), 404
+    return jsonify({"error": "파일을 찾을 수 없습니다."}), 404
@@ -4,9 +4,15 @@ from flask_login import current_user
 from db import mongo_db
 from datetime import datetime
 import bcrypt
+import logging
 import math
 
-from extension import get_fs, is_allowed_image, to_safe_image
+from extension import MAX_IMAGE_BYTES, get_fs, is_allowed_image, to_safe_image
+from services.user_cache import invalidate_user
+from services.names import bump_names_version
+from services.org_catalogue import EMPLOYEE_CATALOGUE_FIELDS, get_departments, get_job_titles, get_positions, \
+    record_employee_change
+from services.avatar import create_avatar_thumbnails, delete_avatar_thumbnails
 from werkzeug.utils import secure_filename
 
 emp_admin_bp = Blueprint("emp_admin", __name__, url_prefix="/hr/emp")
@@ -15,12 +21,43 @@ def get_hr_collection():
     # HR 컬렉션 (직원 정보) 반환
     return mongo_db["hr"]
 
+# 프로필 사진은 업로드 원본이 아니라 정제(전체 디코딩 후 다시 인코딩)한 이미지를 저장하므로
+# @stream_uploads 로 원본을 GridFS 에 바로 쓰면 버릴 파일을 한 번 더 쓰고 읽게 된다. 그래서 Werkzeug 가 받아두되,
+# 직원 등록/수정 요청은 이미지 최대 크기 + 폼 여유분으로 제한해 큰 요청은 본문을 읽기 전에 413 으로 거절한다.
+PROFILE_FORM_MAX_BYTES = MAX_IMAGE_BYTES + 1024 * 1024
+
+# 프로필 사진 저장 - 정제한 원본과 썸네일을 저장하고 (원본 id, 썸네일 해시) 반환
+def save_profile_image(file):
+    safe_image = to_safe_image(file)
+    if safe_image is None:
+        return None, None
+    image_bytes = safe_image.getvalue()
+    file_id = get_fs().put(image_bytes, filename=secure_filename(file.filename), content_type=file.content_type)
+    return file_id, create_avatar_thumbnails(image_bytes)
+
+# 기존 프로필 사진(원본 + 썸네일) 삭제
+def delete_profile_image(employee, keep_digest=None):
+    if employee.get('profile_image_id'):
+        try:
+            get_fs().delete(ObjectId(employee['profile_image_id']))
+        except Exception as e:
+            logging.warning(f"기존 프로필 사진 삭제 실패: {employee['profile_image_id']} -> {e}")
+    digest = employee.get('profile_avatar_digest')
+    if digest and digest != keep_digest:
+        delete_avatar_thumbnails(digest)
+
 @emp_admin_bp.before_request
 def check_admin():
     # 관리자 및 시스템 권한 체크 데코레이터 대체용 before_request 훅
     if current_user.role not in ['admin', 'system']:
         abort(403)
 
+@emp_admin_bp.before_request
+def limit_profile_upload():
+    # 폼을 읽기 전에 요청별 최대 크기를 정한다 (Flask 3.1+)
+    if request.method == "POST":
+        request.max_content_length = PROFILE_FORM_MAX_BYTES
+
 # 직원 목록 조회, 검색, 필터, 페이징 처리
 @emp_admin_bp.route("/list", methods=["GET"])
 def employee_list():
@@ -77,18 +114,14 @@ def employee_list():
 def employee_edit_form(employee_id):
     employee = get_hr_collection().find_one({"_id": ObjectId(employee_id)})
     if not employee: abort(404)
-    
-    hr_collection = get_hr_collection()
-    
-    # 부서/직위 목록 DB에서 가져오고 빈 값 필터링 후 정렬
-    departments = sorted(filter(None, hr_collection.distinct("department")))
-    positions  = sorted(filter(None, hr_collection.distinct("position")))
 
+    # 부서/직위/직책 목록은 조직 목록 캐시에서 (services/org_catalogue.py)
     return render_template(
         "hr/emp_profile.html", 
         employee=employee,
-        departments=departments,
-        positions=positions
+        departments=get_departments(),
+        positions=get_positions(),
+        job_titles=get_job_titles()
     )
 
 # 직원 정보 수정 처리 (프로필 이미지 및 비밀번호 포함)
@@ -110,25 +143,21 @@ def employee_edit_submit(employee_id):
         "annual_leave_days": request.form.get("annual_leave_days", 15, type=int),
         "updated_at": datetime.now()
     }
-    fs = get_fs()
-
     # 프로필 이미지 처리
     remove_image_flag = request.form.get('remove_profile_image')
     new_image_file = request.files.get('profile_image')
 
     if new_image_file and new_image_file.filename != '' and is_allowed_image(new_image_file):
-        # 기존 이미지 삭제 시도
-        if employee.get('profile_image_id'):
-            try: fs.delete(ObjectId(employee['profile_image_id']))
-            except Exception as e: print(f"기존 파일 삭제 실패: {e}")
-        filename = secure_filename(new_image_file.filename)
-        file_id = fs.put(to_safe_image(new_image_file), filename=filename, content_type=new_image_file.content_type)
-        update_data['profile_image_id'] = file_id
+        file_id, digest = save_profile_image(new_image_file)
+        if file_id:
+            # 새 이미지 저장에 성공한 뒤 기존 이미지 삭제
+            delete_profile_image(employee, keep_digest=digest)
+            update_data['profile_image_id'] = file_id
+            update_data['profile_avatar_digest'] = digest
     elif remove_image_flag:
-        if employee.get('profile_image_id'):
-            try: fs.delete(ObjectId(employee['profile_image_id']))
-            except Exception as e: print(f"기존 파일 삭제 실패: {e}")
+        delete_profile_image(employee)
         update_data['profile_image_id'] = None
+        update_data['profile_avatar_digest'] = None
 
     # 비밀번호 처리
     new_password = request.form.get("password")
@@ -139,23 +168,21 @@ def employee_edit_submit(employee_id):
         update_data["password"] = employee['password']
 
     get_hr_collection().update_one({"_id": ObjectId(employee_id)}, {"$set": update_data})
+    invalidate_user(employee_id)
+    bump_names_version()
+    record_employee_change(employee, {**employee, **update_data})
     flash("✅ 직원 정보가 성공적으로 수정되었습니다.")
     return redirect(url_for("emp_admin.employee_list"))
 
 # 신규 직원 등록 폼 - 부서/직위 목록 전달
 @emp_admin_bp.route("/new", methods=["GET"])
 def employee_create_form():
-    all_departments = get_hr_collection().distinct("department")
-    all_positions = get_hr_collection().distinct("position")
-
-    departments = sorted([d for d in all_departments if d])
-    positions = sorted([p for p in all_positions if p])
-
     return render_template(
         "hr/emp_profile.html", 
         employee=None,
-        departments=departments,
-        positions=positions
+        departments=get_departments(),
+        positions=get_positions(),
+        job_titles=get_job_titles()
     )
 
 # 신규 직원 등록 처리 (비밀번호 해시 및 프로필 이미지 저장 포함)
@@ -175,17 +202,18 @@ def employee_create():
         "role": request.form["role"],
         "annual_leave_days": int(request.form.get("annual_leave_days", 15)),
         "created_at": datetime.now(),
-        "updated_at": datetime.now(), "profile_image_id": None
+        "updated_at": datetime.now(), "profile_image_id": None, "profile_avatar_digest": None
     }
 
     if 'profile_image' in request.files:
         file = request.files['profile_image']
         if file and file.filename != '' and is_allowed_image(file):
-            fs = get_fs()
-            filename = secure_filename(file.filename)
-            file_id = fs.put(to_safe_image(file), filename=filename, content_type=file.content_type)
+            file_id, digest = save_profile_image(file)
             employee_data['profile_image_id'] = file_id
+            employee_data['profile_avatar_digest'] = digest
     get_hr_collection().insert_one(employee_data)
+    bump_names_version()
+    record_employee_change(None, employee_data)
     flash("✅ 새로운 직원이 등록되었습니다.")
     return redirect(url_for("emp_admin.employee_list"))
 
@@ -193,10 +221,13 @@ def employee_create():
 @emp_admin_bp.route("/deactivate/<employee_id>", methods=["POST"])
 def employee_deactivate(employee_id):
     try:
-        result = get_hr_collection().update_one(
-            {"_id": ObjectId(employee_id)}, {"$set": {"status": "퇴사", "updated_at": datetime.now()}}
+        before = get_hr_collection().find_one_and_update(
+            {"_id": ObjectId(employee_id)}, {"$set": {"status": "퇴사", "updated_at": datetime.now()}},
+            projection=EMPLOYEE_CATALOGUE_FIELDS
         )
-        if result.matched_count == 0: abort(404)
+        if before is None: abort(404)
+        invalidate_user(employee_id)
+        record_employee_change(before, {**before, "status": "퇴사"})
         flash("🚫 직원이 비활성화(퇴사) 처리되었습니다.")
     except Exception as e:
         flash(f"처리 중 오류가 발생했습니다: {e}", "error")
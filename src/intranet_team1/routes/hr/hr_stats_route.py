@@ -3,6 +3,7 @@ from flask import Blueprint, jsonify, render_template, abort
 from flask_login import current_user
 from db import mongo_db
 from datetime import date, datetime
+from services.org_catalogue import get_active_counts
 
 hr_stats_bp = Blueprint("hr_stats", __name__, url_prefix="/hr/stats")
 
@@ -20,29 +21,15 @@ def dashboard():
     }
     return render_template("hr/hr_stats.html", **stats)
 
+# 부서/직위/직책별 재직 인원은 조직 목록(org_catalogue)의 인원수를 읽는다
 def get_chart_department():
-    pipeline = [
-        {"$match": {"status": "재직중"}},
-        {"$group": {"_id": "$department", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1, "_id": -1}}
-    ]
-    return list(mongo_db.hr.aggregate(pipeline))
+    return get_active_counts("department")
 
 def get_chart_position():
-    pipeline = [
-        {"$match": {"status": "재직중"}},
-        {"$group": {"_id": "$position", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1, "_id": -1}}
-    ]
-    return list(mongo_db.hr.aggregate(pipeline))
+    return get_active_counts("position")
 
 def get_chart_job_title():
-    pipeline = [
-        {"$match": {"status": "재직중"}},
-        {"$group": {"_id": "$job_title", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1, "_id": -1}}
-    ]
-    return list(mongo_db.hr.aggregate(pipeline))
+    return get_active_counts("job_title")
 
 def get_chart_hires_vs_resignations():
     hires_pipeline = [
@@ -2,6 +2,7 @@ from bson import ObjectId
 from flask import Blueprint, render_template, request, redirect, url_for, abort, flash
 from flask_login import current_user
 from db import mongo_db
+from services.names import resolve
 from datetime import datetime, timezone
 import math
 
@@ -33,14 +34,11 @@ def admin_list():
     total_records = get_vacation_collection().count_documents(query)
     total_pages = max(1, math.ceil(total_records / page_size))
 
-    pipeline = [
-        {"$match": query},
-        {"$lookup": {"from": "hr", "localField": "user_id", "foreignField": "_id", "as": "user_info"}},
-        {"$sort": {"created_at": -1}},
-        {"$skip": skip_count},
-        {"$limit": page_size}
-    ]
-    vacations = list(get_vacation_collection().aggregate(pipeline))
+    vacations = list(get_vacation_collection().find(query).sort("created_at", -1).skip(skip_count).limit(page_size))
+    # 신청자 이름은 현재 페이지 것만 조회
+    names = resolve(v["user_id"] for v in vacations if v.get("user_id"))
+    for v in vacations:
+        v["user_name"] = names.get(v.get("user_id"))
     
     return render_template(
         "hr/vc_admin_list.html", 
@@ -4,17 +4,24 @@ from flask_login import current_user
 from db import mongo_db
 from datetime import datetime
 from bson.objectid import ObjectId
+from services.counters import ISSUE_COUNTER_FIELDS, issue_seq_name, next_sequence, record_issue_change
+from services.names import resolve, resolve_name
+from services.issue_overview import get_issue_overview, invalidate_issue_overview
+from services.issue_stats import get_issue_stats, invalidate_issue_stats
+from services.client_autocomplete import suggest
+from services.keyset import decode_cursor, keyset_page, keyset_query
 
 issue_bp = Blueprint("issue", __name__, url_prefix="/issue")
 
 ISSUE_STATUS = {1: "신규", 2: "진행중", 3: "해결됨"}
+ISSUE_FAMILIES = ["backend", "frontend", "ui"]
 
 def get_issues(): return mongo_db["issues"]
 def get_clients(): return mongo_db["clients"]
 def get_hr_collection(): return mongo_db["hr"]
 
 def is_valid_family(family_name):
-    return family_name in ["backend", "frontend", "ui"]
+    return family_name in ISSUE_FAMILIES
 
 def _to_str_or_default(value, default="없음"):
     return str(value) if value is not None else default
@@ -22,18 +29,13 @@ def _to_str_or_default(value, default="없음"):
 def _format_datetime(dt, default="날짜없음"):
     return dt.strftime("%Y-%m-%d %H:%M") if dt else default
 
+def _invalidate_issue_caches():
+    # 이슈가 바뀌면 메인화면/통계 캐시를 비운다
+    invalidate_issue_overview()
+    invalidate_issue_stats()
+
 def _get_reporter_name(reporter_id_obj):
-    if reporter_id_obj:
-        try:
-            if not isinstance(reporter_id_obj, ObjectId):
-                reporter_id_obj = ObjectId(str(reporter_id_obj))
-            
-            user_doc = get_hr_collection().find_one({"_id": reporter_id_obj}, {"name": 1})
-            
-            return user_doc.get("name", "알 수 없는 사용자") if user_doc else "알 수 없는 사용자"
-        except Exception:
-            return "알 수 없는 사용자"
-    return "알 수 없는 사용자"
+    return resolve_name(reporter_id_obj)
 
 
 @issue_bp.route("/")
@@ -41,23 +43,23 @@ def home():
     family_map = {"Back family": "backend", "Front family": "frontend", "Publisher family": "ui"}
     status_map = {"신규 이슈": ISSUE_STATUS[1], "진행중인 이슈": ISSUE_STATUS[2], "해결된 이슈": ISSUE_STATUS[3]}
 
-    users_map = {str(u["_id"]): u.get("name", "알 수 없는 사용자") 
-                 for u in get_hr_collection().find({}, {"name": 1})}
+    overview = get_issue_overview(list(family_map.values()), list(status_map.values()), limit=3)
 
     result = {}
     for fname, fval in family_map.items():
-        result[fname] = {}
-        for sname, sval in status_map.items():
-            issues = get_issues().find({"project_family": fval, "status": sval}).sort("created_at", -1).limit(3)
-            result[fname][sname] = [{
-                "title": i.get("title", "제목없음"),
-                "mongo_id": _to_str_or_default(i.get("_id")),
-                "family_name": fval,
-                "reporter_name": users_map.get(_to_str_or_default(i.get("reported_by"), None), "알 수 없는 사용자")
-            } for i in issues]
+        result[fname] = {sname: overview[fval][sval] for sname, sval in status_map.items()}
     return render_template("issue/index.html", issues_by_family_and_status=result, family_categories=family_map)
 
 
+ISSUE_PAGE_SIZE = 20
+ISSUE_PAGE_SIZE_MAX = 100
+# 목록에 필요한 필드만 조회 (description 같은 긴 본문은 제외)
+ISSUE_LIST_PROJECTION = {
+    "seq": 1, "title": 1, "category": 1, "status": 1, "reported_by": 1,
+    "client_company_id": 1, "client_company_name": 1, "created_at": 1, "updated_at": 1,
+}
+
+
 @issue_bp.route("/list/<family_name>", methods=['GET'])
 def show_list(family_name):
     if not is_valid_family(family_name): return "Invalid family", 400
@@ -67,6 +69,9 @@ def show_list(family_name):
     selected_status = request.args.get('status', 'all')
     search_query = request.args.get('search', '').strip()
     selected_client_id = request.args.get('client_id', 'all')
+    page_size = min(max(request.args.get('size', ISSUE_PAGE_SIZE, type=int), 1), ISSUE_PAGE_SIZE_MAX)
+    after = decode_cursor(request.args.get('after', ''))
+    before = None if after else decode_cursor(request.args.get('before', ''))
 
     query_conditions = {"project_family": family_name}
 
@@ -82,31 +87,28 @@ def show_list(family_name):
         except Exception:
             pass 
 
-    total_issues_count = main_issue_collection.count_documents(query_conditions)
-
-    issues_cursor = main_issue_collection.find(
-        query_conditions
-    ).sort("created_at", -1)
+    # keyset 페이지네이션: (created_at, _id) 역순 (services/keyset.py)
+    query_conditions, direction = keyset_query(query_conditions, after, before)
+    issues = list(main_issue_collection.find(query_conditions, ISSUE_LIST_PROJECTION)
+                  .sort([("created_at", direction), ("_id", direction)])
+                  .limit(page_size + 1))
+    issues, prev_cursor, next_cursor = keyset_page(issues, page_size, after, before)
 
-    users_map = {str(u["_id"]): u.get("name", "알 수 없는 사용자") 
-                 for u in get_hr_collection().find({}, {"name": 1})}
+    users_map = resolve(i.get("reported_by") for i in issues if i.get("reported_by"))
 
     clients_list = []
-    for client in get_clients().find({}):
+    for client in get_clients().find({}, {"company_name": 1}):
         clients_list.append({"id": str(client["_id"]), "name": client["company_name"]})
 
     posts = []
-    for idx, issue in enumerate(issues_cursor):
-        display_id_reversed = total_issues_count - idx 
-
+    for issue in issues:
         posts.append({
-            "display_id": display_id_reversed, 
+            "display_id": issue.get("seq", "-"),
             "mongo_id": _to_str_or_default(issue.get("_id")),
             "title": issue.get("title", "제목없음"),
-            "description": issue.get("description", "내용없음"),
             "category": issue.get("category", "일반"),
             "status": issue.get("status", "상태없음"),
-            "reporter_name": users_map.get(_to_str_or_default(issue.get("reported_by"), None), "알 수 없는 사용자"),
+            "reporter_name": users_map.get(issue.get("reported_by"), "알 수 없는 사용자"),
             "client_company_id": _to_str_or_default(issue.get("client_company_id")),
             "client_company_name": issue.get("client_company_name", "고객사없음"),
             "created_at": _format_datetime(issue.get("created_at")),
@@ -127,6 +129,9 @@ def show_list(family_name):
                            search_query=search_query,
                            clients_list=clients_list,
                            selected_client_id=selected_client_id,
+                           page_size=page_size,
+                           next_cursor=next_cursor,
+                           prev_cursor=prev_cursor,
                            client_company_display_name_on_top=selected_client_name_from_write)
 
 
@@ -164,6 +169,7 @@ def write_post(family_name):
             return "유효하지 않은 고객사 ID입니다.", 400
 
     issue_data = {
+        "seq": next_sequence(issue_seq_name(family_name)),
         "title": title,
         "description": description,
         "category": "일반", 
@@ -177,6 +183,8 @@ def write_post(family_name):
     }
     
     main_issue_collection.insert_one(issue_data) 
+    record_issue_change(None, issue_data)
+    _invalidate_issue_caches()
     
     return redirect(url_for("issue.show_list", 
                             family_name=family_name,
@@ -262,12 +270,15 @@ def edit_post(family_name, issue_id):
     }
 
     try:
-        result = main_issue_collection.update_one(
+        before = main_issue_collection.find_one_and_update(
             {"_id": ObjectId(issue_id), "project_family": family_name},
-            update_data
+            update_data,
+            projection=ISSUE_COUNTER_FIELDS
         )
-        if result.matched_count == 0:
+        if before is None:
             return "수정할 이슈를 찾을 수 없습니다.", 404
+        record_issue_change(before, {**before, **update_data["$set"]})
+        _invalidate_issue_caches()
 
         return redirect(url_for("issue.detail", family_name=family_name, issue_id=issue_id))
     except Exception:
@@ -283,12 +294,15 @@ def delete(family_name, issue_id):
     try:
         obj_issue_id = ObjectId(issue_id)
         
-        result = main_issue_collection.delete_one(
-            {"_id": obj_issue_id, "project_family": family_name}
+        before = main_issue_collection.find_one_and_delete(
+            {"_id": obj_issue_id, "project_family": family_name},
+            projection=ISSUE_COUNTER_FIELDS
         )
         
-        if result.deleted_count == 0:
+        if before is None:
             return "삭제할 이슈를 찾을 수 없습니다.", 404
+        record_issue_change(before, None)
+        _invalidate_issue_caches()
         
         return redirect(url_for("issue.show_list", family_name=family_name))
 
@@ -304,12 +318,16 @@ def update_status(family_name, issue_id):
 
     try:
         obj_issue_id = ObjectId(issue_id)
-        result = get_issues().update_one(
+        before = get_issues().find_one_and_update(
             {"_id": obj_issue_id, "project_family": family_name},
-            {"$set": {"status": new_status, "updated_at": datetime.now()}}
+            {"$set": {"status": new_status, "updated_at": datetime.now()}},
+            projection=ISSUE_COUNTER_FIELDS
         )
-        if result.matched_count == 0:
+        if before is None:
             pass # No issue matched, but no explicit error needs to be returned for this specific update_status case
+        else:
+            record_issue_change(before, {**before, "status": new_status})
+            _invalidate_issue_caches()
 
         return redirect(url_for("issue.detail", family_name=family_name, issue_id=issue_id))
     except Exception:
@@ -321,87 +339,46 @@ def search_client():
     term = request.json.get("search_term", "").strip()
     if not term: return jsonify([])
 
-    results = get_clients().find({"company_name": {"$regex": term, "$options": "i"}}).limit(10)
-    return jsonify([{"id": _to_str_or_default(c.get("_id")), "name": c.get("company_name", "이름없음")} for c in results])
+    # 접두어 색인 검색 (services/client_autocomplete.py), 같은 검색어는 잠시 캐시
+    return jsonify(suggest(term))
+
+def _stats_filters():
+    # ?since=YYYY-MM-DD&until=YYYY-MM-DD&client_id=... (잘못된 값은 무시)
+    def parse_date(value):
+        try:
+            return datetime.strptime(value, "%Y-%m-%d") if value else None
+        except ValueError:
+            return None
+
+    client_id = request.args.get("client_id", "all")
+    try:
+        client_obj_id = ObjectId(client_id) if client_id != "all" else None
+    except Exception:
+        client_obj_id = None
+    return {
+        "since": parse_date(request.args.get("since", "").strip()),
+        "until": parse_date(request.args.get("until", "").strip()),
+        "client_id": client_obj_id,
+    }
+
 
 @issue_bp.route("/stats")
 def stats():
-    project_families = ["backend", "frontend", "ui"]
-    
-    all_family_stats = {}
-
-    for family_name in project_families:
-        pipeline = [
-            {"$match": {"project_family": family_name}}, 
-            {"$group": {"_id": "$status", "count": {"$sum": 1}}},
-            {"$project": {"_id": 0, "status": "$_id", "count": 1}}
-        ]
-        
-        status_counts_cursor = get_issues().aggregate(pipeline)
-        
-        status_data = {}
-        for item in status_counts_cursor:
-            status_data[item['status']] = item['count']
-                
-        chart_data_for_family = []
-        for status_id, status_name in ISSUE_STATUS.items():
-            count = status_data.get(status_name, 0)
-            chart_data_for_family.append({
-                "label": status_name,
-                "value": count
-            })
-        
-        total_issues_for_family = get_issues().count_documents({"project_family": family_name})
+    filters = _stats_filters()
+    result = get_issue_stats(ISSUE_FAMILIES, list(ISSUE_STATUS.values()), **filters)
 
-        all_family_stats[family_name] = {
-            "chart_data": chart_data_for_family,
-            "total_issues": total_issues_for_family
-        }
-    
-    overall_total_issues = get_issues().count_documents({})
-            
+    clients_list = [{"id": str(c["_id"]), "name": c.get("company_name", "이름없음")}
+                    for c in get_clients().find({}, {"company_name": 1})]
     return render_template(
         "issue/stats.html",
-        all_family_stats_json=json.dumps(all_family_stats), 
-        overall_total_issues=overall_total_issues 
+        all_family_stats_json=json.dumps(result["all_family_stats"]), 
+        overall_total_issues=result["overall_total_issues"],
+        since=request.args.get("since", ""),
+        until=request.args.get("until", ""),
+        clients_list=clients_list,
+        selected_client_id=str(filters["client_id"]) if filters["client_id"] else "all",
     )
 
 @issue_bp.route("/api/stats")
 def api_status_statistics():
-    project_families = ["backend", "frontend", "ui"]
-    all_family_stats = {}
-
-    for family_name in project_families:
-        pipeline = [
-            {"$match": {"project_family": family_name}},
-            {"$group": {"_id": "$status", "count": {"$sum": 1}}},
-            {"$project": {"_id": 0, "status": "$_id", "count": 1}}
-        ]
-        
-        status_counts_cursor = get_issues().aggregate(pipeline)
-        
-        status_data = {}
-        for item in status_counts_cursor:
-            status_data[item['status']] = item['count']
-                
-        chart_data_for_family = []
-        for status_id, status_name in ISSUE_STATUS.items():
-            count = status_data.get(status_name, 0)
-            chart_data_for_family.append({
-                "label": status_name,
-                "value": count
-            })
-        
-        total_issues_for_family = get_issues().count_documents({"project_family": family_name})
-
-        all_family_stats[family_name] = {
-            "chart_data": chart_data_for_family,
-            "total_issues": total_issues_for_family
-        }
-            
-    overall_total_issues = get_issues().count_documents({})
-
-    return jsonify({
-        "all_family_stats": all_family_stats,
-        "overall_total_issues": overall_total_issues
-    })
\ No newline at end of file
+    return jsonify(get_issue_stats(ISSUE_FAMILIES, list(ISSUE_STATUS.values()), **_stats_filters()))
@@ -0,0 +1,49 @@
+from flask import Blueprint, current_app, jsonify, abort
+from flask_login import current_user
+from db import get_pool_stats
+from services.profiler import get_recent_profiles
+from services.user_cache import user_cache
+from services.issue_overview import overview_cache
+from services.names import name_cache
+from services.issue_stats import stats_cache
+from services.client_autocomplete import term_cache
+from services.leaderboard import leaderboard_cache
+from services.org_catalogue import catalogue_cache
+from services.task_chart import chart_cache
+from services.uploads import get_upload_stats
+
+monitor_bp = Blueprint("monitor", __name__, url_prefix="/monitor")
+
+@monitor_bp.before_request
+def check_admin():
+    if current_user.role not in ['admin', 'system']: abort(403)
+
+# 현재 워커 프로세스의 MongoDB 커넥션 풀 체크아웃/대기 통계
+@monitor_bp.route("/db/pool")
+def db_pool_stats():
+    return jsonify(get_pool_stats())
+
+# 최근 요청별 쿼리 프로파일 (MONGO_PROFILER_ENABLED 일 때만, 기본은 디버그 모드)
+@monitor_bp.route("/db/profile")
+def db_profile():
+    if not current_app.config.get("MONGO_PROFILER_ENABLED"): abort(404)
+    return jsonify(get_recent_profiles())
+
+# 프로세스 내 캐시 적중/실패 횟수
+@monitor_bp.route("/cache")
+def cache_stats():
+    return jsonify({
+        "user": user_cache.stats(),
+        "issue_overview": overview_cache.stats(),
+        "names": name_cache.stats(),
+        "issue_stats": stats_cache.stats(),
+        "client_autocomplete": term_cache.stats(),
+        "leaderboard": leaderboard_cache.stats(),
+        "org_catalogue": catalogue_cache.stats(),
+        "task_chart": chart_cache.stats(),
+    })
+
+# 현재 워커 프로세스의 업로드 처리량 통계
+@monitor_bp.route("/uploads")
+def upload_stats():
+    return jsonify(get_upload_stats())
@@ -2,9 +2,13 @@ from flask import Blueprint, jsonify, render_template, request, redirect, url_fo
 from db import mongo_db
 from bson import ObjectId
 from datetime import datetime
-import gridfs
-
-fs = gridfs.GridFS(mongo_db)  # mongo_db는 MongoClient().db
+import logging
+from services.file_stream import send_gridfs_file
+from services.uploads import store_upload, stream_uploads
+from services.file_refs import release_file
+from services.counters import TASK_COUNTER_FIELDS, counters_ready, read_counters, record_task_change
+from services.org_catalogue import get_departments
+from services.task_chart import GRANULARITIES, MAX_RANGE_DAYS, default_range, get_task_chart, invalidate_task_chart
 
 task_bp = Blueprint('task', __name__, url_prefix="/task")
 
@@ -24,6 +28,12 @@ def get_tasks_collection():
     return mongo_db["tasks"]
 
 
+TASK_PAGE_SIZE = 20
+TASK_PAGE_SIZE_MAX = 100
+# 목록에 보여주는 필드만 조회
+TASK_LIST_PROJECTION = {"title": 1, "team": 1, "priority": 1, "status": 1, "due_date": 1, "file_id": 1, "file_name": 1}
+
+
 # 업무 메인화면
 @task_bp.route('/', methods=['GET'])
 def home():
@@ -31,6 +41,8 @@ def home():
     status_filter = request.args.get('status')
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
+    page = max(request.args.get('page', 1, type=int), 1)
+    page_size = min(max(request.args.get('size', TASK_PAGE_SIZE, type=int), 1), TASK_PAGE_SIZE_MAX)
 
     query = {}
     filter_reset = False # 초기화 여부 플래그
@@ -62,18 +74,27 @@ def home():
             query = {}
             filter_reset = True
 
-    task_list = get_tasks_collection().find(query).sort("due_date", -1)
-    departments = mongo_db["hr"].distinct("department")
-    return render_template('task/index.html', tasks=task_list, today=datetime.today().date(), departments=departments, filter_reset=filter_reset)
+    if filter_reset:
+        page = 1
+
+    # 걸린 필터에 맞는 (team/status, due_date, _id) 인덱스로 한 페이지만 읽는다 (services/indexes.py)
+    task_list = list(get_tasks_collection().find(query, TASK_LIST_PROJECTION)
+                     .sort([("due_date", -1), ("_id", -1)])
+                     .skip((page - 1) * page_size)
+                     .limit(page_size + 1))
+    has_next = len(task_list) > page_size
+    task_list = task_list[:page_size]
+    return render_template('task/index.html', tasks=task_list, today=datetime.today().date(), departments=get_departments(),
+                           filter_reset=filter_reset, page=page, page_size=page_size, has_next=has_next)
 
 # 업무 추가 폼
 @task_bp.route('/add', methods=['GET'])
 def add_get():
-    departments = mongo_db["hr"].distinct("department")
-    return render_template('task/add.html', departments=departments)
+    return render_template('task/add.html', departments=get_departments())
 
 # 업무 추가 처리 POST함수
 @task_bp.route('/add', methods=['POST'])
+@stream_uploads
 def add_post():
     # 마감일 처리
     if 'no_due_date' in request.form:
@@ -87,7 +108,7 @@ def add_post():
 
     file = request.files.get('file')
     if file and file.filename:
-        file_id = fs.put(file, filename=file.filename)
+        file_id = store_upload(file)
         file_name = file.filename
     else:
         file_id = None
@@ -106,18 +127,20 @@ def add_post():
     }
 
     get_tasks_collection().insert_one(data)
+    record_task_change(None, data)
+    invalidate_task_chart()
     flash("업무가 등록되었습니다.", "success")
     return redirect(url_for('task.home'))
 
 # 업무 수정 폼
 @task_bp.route('/edit/<task_id>', methods=['GET'])
 def edit_get(task_id):
-    departments = mongo_db["hr"].distinct("department")
     task = get_tasks_collection().find_one({'_id': ObjectId(task_id)})
-    return render_template('task/edit.html', task=task, today=datetime.today().date(), departments=departments)
+    return render_template('task/edit.html', task=task, today=datetime.today().date(), departments=get_departments())
 
 # 업무 수정 처리 POST함수
 @task_bp.route('/edit/<task_id>', methods=['POST'])
+@stream_uploads
 def edit_post(task_id):
     update = {
         'title': request.form['title'],
@@ -140,11 +163,22 @@ def edit_post(task_id):
     # 파일 업로드 처리
     file = request.files.get('file')
     if file and file.filename:
-        file_id = fs.put(file, filename=file.filename)
+        file_id = store_upload(file)
         update['file_id'] = file_id
         update['file_name'] = file.filename
-        
-    get_tasks_collection().update_one({'_id': ObjectId(task_id)}, {'$set': update})
+
+    old_task = get_tasks_collection().find_one_and_update({'_id': ObjectId(task_id)}, {'$set': update},
+                                                          projection={'file_id': 1, **TASK_COUNTER_FIELDS})
+    if old_task:
+        record_task_change(old_task, {**old_task, **update})
+        invalidate_task_chart()
+    # 새 파일을 저장했으면 기존 파일의 참조 해제
+    # (같은 내용이라 같은 id 로 중복 제거된 경우에도 store_upload 가 참조를 하나 늘렸으므로 해제해야 한다)
+    if old_task and 'file_id' in update and old_task.get('file_id'):
+        try:
+            release_file(ObjectId(old_task['file_id']))
+        except Exception as e:
+            logging.warning(f"기존 업무 파일 삭제 실패: {old_task['file_id']} -> {e}")
     flash("업무가 수정되었습니다.", "success")
     return redirect(url_for('task.home'))
 
@@ -153,46 +187,76 @@ def edit_post(task_id):
 def delete(task_id):
     task = get_tasks_collection().find_one({'_id': ObjectId(task_id)})
 
-    # 파일 삭제
+    # 파일 삭제 (다른 곳에서 같은 파일을 참조하면 참조 수만 줄임)
     file_id = task.get('file_id')
     if file_id:
         try:
-            fs.delete(ObjectId(file_id))
+            release_file(ObjectId(file_id))
         except:
             pass  # 파일이 없거나 이미 삭제된 경우 무시
 
     # 업무 삭제
-    get_tasks_collection().delete_one({'_id': ObjectId(task_id)})
+    if get_tasks_collection().delete_one({'_id': ObjectId(task_id)}).deleted_count:
+        record_task_change(task, None)
+        invalidate_task_chart()
     flash("업무가 삭제되었습니다.", "success")
     return redirect(url_for('task.home'))
 
+# 첨부파일 다운로드 - 같은 내용의 파일은 공유되므로 파일명은 이 업무에 저장된 이름을 사용
+@task_bp.route('/<task_id>/file', methods=['GET'])
+def file_download(task_id):
+    try:
+        task = get_tasks_collection().find_one({'_id': ObjectId(task_id)}, {'file_id': 1, 'file_name': 1})
+        if task and task.get('file_id'):
+            return send_gridfs_file(task['file_id'], as_attachment=True, download_name=task.get('file_name') or 'download')
+    except Exception as e:
+        logging.warning(f"업무 파일 다운로드 실패: {task_id} -> {e}")
+    return jsonify({"error": "파일을 찾을 수 없습니다."}), 404
+
 @task_bp.route('/stat')
 def stat():
-    return render_template('task/stat.html')
+    default_from, default_to = default_range()
+    return render_template('task/stat.html',
+                           date_from=request.args.get('from') or default_from.strftime('%Y-%m-%d'),
+                           date_to=request.args.get('to') or default_to.strftime('%Y-%m-%d'),
+                           granularity=request.args.get('granularity', 'day'))
 
 @task_bp.route('/api/chart-data')
 def chart_data():
-    result = list(get_tasks_collection().aggregate([
-        {"$group": {"_id": {"date": "$due_date", "status": "$status"}, "count": {"$sum": 1}}},
-        {"$sort": {"_id.date": 1}}
-    ]))
+    # ?from=YYYY-MM-DD&to=YYYY-MM-DD&granularity=day|week|month (마감일 기준, 기본: 최근 90일 ~ 30일 뒤, day)
+    default_from, default_to = default_range()
+    try:
+        date_from = _parse_chart_date(request.args.get('from'), default_from)
+        date_to = _parse_chart_date(request.args.get('to'), default_to)
+    except ValueError:
+        return jsonify({"error": "날짜 형식은 YYYY-MM-DD 입니다."}), 400
 
-    data = {}
-    for item in result:
-        date = item['_id']['date'].strftime('%Y-%m-%d') if hasattr(item['_id']['date'], 'strftime') else str(item['_id']['date'])
-        status = item['_id']['status']
-        if date not in data:
-            data[date] = {}
-        data[date][status] = item['count']
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        return jsonify({"error": "granularity 는 day, week, month 중 하나입니다."}), 400
+    if date_from > date_to:
+        return jsonify({"error": "시작일이 종료일보다 늦습니다."}), 400
+    if (date_to - date_from).days > MAX_RANGE_DAYS[granularity]:
+        return jsonify({"error": f"{granularity} 단위는 최대 {MAX_RANGE_DAYS[granularity]}일까지 조회할 수 있습니다."}), 400
+
+    return jsonify(get_task_chart(date_from, date_to, granularity))
 
-    return jsonify(data)
+def _parse_chart_date(value, default):
+    value = (value or '').strip()
+    return datetime.strptime(value, '%Y-%m-%d') if value else default
 
 @task_bp.route('/api/chart-by-team')
 def chart_by_team_api():
-    result = list(get_tasks_collection().aggregate([
-        {"$group": {"_id": {"team": "$team", "status": "$status"}, "count": {"$sum": 1}}},
-        {"$sort": {"_id.team": 1}}
-    ]))
+    # 쓰기 시점에 갱신되는 team × status 카운터를 읽는다 (카운터가 아직 없으면 집계)
+    if counters_ready("task_status"):
+        result = [{"_id": {"team": c.get("team"), "status": c.get("status")}, "count": c["value"]}
+                  for c in read_counters("task_status") if c.get("value")]
+        result.sort(key=lambda item: str(item['_id']['team']))
+    else:
+        result = list(get_tasks_collection().aggregate([
+            {"$group": {"_id": {"team": "$team", "status": "$status"}, "count": {"$sum": 1}}},
+            {"$sort": {"_id.team": 1}}
+        ]))
 
     data = {}
     for item in result:
@@ -1,8 +1,16 @@
-from flask import Blueprint, render_template, request, redirect, url_for, abort
+from flask import Blueprint, render_template, request, redirect, url_for, abort, jsonify
 from bson.objectid import ObjectId
 from flask_login import current_user
 from db import mongo_db
+from services.names import resolve
+from services.post_search import index_post, is_searchable, remove_post, search_posts, search_ready
+from services.post_comments import COMMENT_COUNT_EXPR, add_comment as push_comment, comments_page, \
+    delete_comment as pull_comment, find_comment, migrate_post_comments, remove_post_comments
+from services.counters import POST_COUNTER_FIELDS, record_post_change
+from services.leaderboard import LEADERBOARD_PERIODS, get_leaderboard, invalidate_leaderboard
+from services.keyset import decode_cursor, keyset_page, keyset_query
 import datetime
+import re
 
 write_bp = Blueprint("write", __name__, url_prefix="/write")
 
@@ -12,45 +20,61 @@ def get_posts_collection():
 def get_hr_collection():
     return mongo_db["hr"]
 
+POST_PAGE_SIZE = 20
+POST_PAGE_SIZE_MAX = 100
+# 목록에 필요한 필드만 조회 (본문 제외, 댓글은 글에 저장된 댓글 수만)
+POST_LIST_PROJECTION = {"title": 1, "category": 1, "author_id": 1, "created_at": 1, "comment_count": 1}
+# 상세/수정/삭제에서 옛 comments 배열(마이그레이션 전)은 읽지 않는다 (상세보기는 읽기 전에 bucket 으로 옮김)
+POST_DETAIL_PROJECTION = {"comments": 0}
+
+
+def _list_posts(query, after, before, page_size):
+    """(created_at, _id) 역순 keyset 페이지 (services/keyset.py). 반환값: (posts, prev_cursor, next_cursor)"""
+    query, direction = keyset_query(query, after, before)
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"created_at": direction, "_id": direction}},
+        {"$limit": page_size + 1},
+        {"$project": {**POST_LIST_PROJECTION, "comment_count": COMMENT_COUNT_EXPR}},
+    ]
+    return keyset_page(list(get_posts_collection().aggregate(pipeline)), page_size, after, before)
+
+
 @write_bp.route("/")
 def home():
     # 1. 검색어와 카테고리 필터 받기
     q = request.args.get("q", "").strip()
     category = request.args.get("category", "").strip()
 
+    page = max(request.args.get("page", 1, type=int), 1)
+    page_size = min(max(request.args.get("size", POST_PAGE_SIZE, type=int), 1), POST_PAGE_SIZE_MAX)
+    after = decode_cursor(request.args.get("after", ""))
+    before = None if after else decode_cursor(request.args.get("before", ""))
+
     # 2. 쿼리 조건 구성
     query = {}
     if category:
         query["category"] = category
-    if q:
-        query["$or"] = [
-            {"title": {"$regex": q, "$options": "i"}},
-            {"content": {"$regex": q, "$options": "i"}}
-        ]
 
-    # 3. 게시글 조회
-    posts = list(get_posts_collection().find(query).sort("created_at", -1))
+    # 3. 게시글 조회 (두 글자 이상 검색어는 bigram 색인으로 순위 검색, 그 외/색인 준비 전에는 작성일 기준 커서 페이지)
+    has_next = False
+    prev_cursor = next_cursor = None
+    if q and is_searchable(q) and search_ready():
+        result = search_posts(q, category=category or None, page=page, page_size=page_size)
+        posts, has_next = result["posts"], result["has_next"]
+    else:
+        if q:
+            query["$or"] = [
+                {"title": {"$regex": re.escape(q), "$options": "i"}},
+                {"content": {"$regex": re.escape(q), "$options": "i"}}
+            ]
+        posts, prev_cursor, next_cursor = _list_posts(query, after, before, page_size)
 
     # 4. 작성자 매핑
-    author_ids = list(set(post["author_id"] for post in posts))
-    authors = list(get_hr_collection().find({"_id": {"$in": author_ids}}))
-    author_map = {author["_id"]: author["name"] for author in authors}
+    author_map = resolve(post["author_id"] for post in posts)
 
-    # 5. 활동 순위 (전체 기준)
-    pipeline = [
-        {"$group": {"_id": "$author_id", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-        {"$limit": 5}
-    ]
-    agg_result = list(get_posts_collection().aggregate(pipeline))
-    top_users = []
-    if agg_result:
-        top_author_ids = [doc["_id"] for doc in agg_result]
-        top_authors = list(get_hr_collection().find({"_id": {"$in": top_author_ids}}))
-        id_to_name = {a["_id"]: a["name"] for a in top_authors}
-        for doc in agg_result:
-            name = id_to_name.get(doc["_id"], "알 수 없음")
-            top_users.append((name, doc["count"]))
+    # 5. 활동 순위 (전체 기준, 카운터 + 캐시)
+    top_users = [(user["name"], user["count"]) for user in get_leaderboard("all")]
 
     return render_template(
         "write/index.html",
@@ -58,10 +82,24 @@ def home():
         author_map=author_map,
         top_users=top_users,
         request=request,
-        selected_category=category
+        selected_category=category,
+        page=page,
+        has_next=has_next,
+        page_size=page_size,
+        prev_cursor=prev_cursor,
+        next_cursor=next_cursor
     )
 
 
+# 활동 순위 JSON (?period=all|month)
+@write_bp.route("/api/leaderboard")
+def api_leaderboard():
+    period = request.args.get("period", "all")
+    if period not in LEADERBOARD_PERIODS:
+        return jsonify({"error": "period 는 all 또는 month 만 가능합니다."}), 400
+    return jsonify({"period": period, "users": get_leaderboard(period)})
+
+
 # 게시글 작성 폼
 @write_bp.route("/new", methods=["GET"])
 def write_form():
@@ -85,10 +123,13 @@ def save_post():
         "author_id": ObjectId(current_user.id),
         "created_at": datetime.datetime.utcnow(),
         "updated_at": None,
-        "comments": []
+        "comment_count": 0
     }
 
     get_posts_collection().insert_one(post)
+    index_post(post)
+    record_post_change(None, post)
+    invalidate_leaderboard()
     return redirect(url_for("write.home", category=category))  # ✅ 작성 후 해당 카테고리로 리디렉션
 
 
@@ -96,29 +137,36 @@ def save_post():
 # 게시글 상세보기
 @write_bp.route("/post/<post_id>", methods=["GET"])
 def detail(post_id):
-    post = get_posts_collection().find_one({"_id": ObjectId(post_id)})
+    # 댓글을 아직 bucket 으로 옮기지 않은 글이면 먼저 옮긴다
+    migrate_post_comments(ObjectId(post_id))
+    post = get_posts_collection().find_one({"_id": ObjectId(post_id)}, POST_DETAIL_PROJECTION)
     if not post:
         abort(404)
 
-    author_ids = list(set({comment["author_id"] for comment in post.get("comments", [])}))
-    authors = get_hr_collection().find({"_id": {"$in": author_ids}})
-    author_map = {author["_id"]: author["name"] for author in authors}
-    
-    post_author = get_hr_collection().find_one({"_id": post["author_id"]})
-    user_name = post_author["name"] if post_author else "알 수 없음"
+    # 댓글은 bucket 단위(50개)로 한 페이지씩
+    comment_page = max(request.args.get("comment_page", 1, type=int), 1)
+    comments = comments_page(post["_id"], comment_page)
+
+    # 게시글 작성자와 댓글 작성자 이름을 한 번에 조회
+    author_ids = {comment["author_id"] for comment in comments["comments"]}
+    author_map = resolve(author_ids | {post["author_id"]})
+    user_name = author_map.get(post["author_id"], "알 수 없음")
 
     return render_template(
         "write/detail.html",
         post=post, 
         author_map=author_map,
-        user_name=user_name
+        user_name=user_name,
+        comments=comments["comments"],
+        comment_page=comment_page,
+        comments_has_next=comments["has_next"]
                         )
 
 
 # 댓글 작성 POST처리
 @write_bp.route("/post/<post_id>/comment", methods=["POST"])
 def add_comment(post_id):
-    post = get_posts_collection().find_one({"_id": ObjectId(post_id)})
+    post = get_posts_collection().find_one({"_id": ObjectId(post_id)}, {"_id": 1})
     if not post:
         abort(404)
     
@@ -133,27 +181,22 @@ def add_comment(post_id):
         "created_at": datetime.datetime.utcnow()
     }
 
-    get_posts_collection().update_one(
-        {"_id": ObjectId(post_id)},
-        {"$push": {"comments": comment}}
-    )
+    push_comment(post["_id"], comment)
     return redirect(url_for("write.detail", post_id=post_id))
 
 # 댓글 삭제 기능 
 @write_bp.route("/post/<post_id>/comment/delete", methods=["POST"])
 def delete_comment(post_id):
-    post = get_posts_collection().find_one({"_id": ObjectId(post_id)})
+    post = get_posts_collection().find_one({"_id": ObjectId(post_id)}, {"author_id": 1})
     if not post:
         abort(404)
 
-    comment_id = request.form.get("comment_id")
-
-    # 댓글 찾기
-    target_comment = None
-    for c in post.get("comments", []):
-        if str(c["comment_id"]) == comment_id:
-            target_comment = c
-            break
+    # 댓글 찾기 (해당 댓글이 든 bucket 에서 그 댓글만 읽음)
+    try:
+        comment_id = ObjectId(request.form.get("comment_id"))
+    except Exception:
+        abort(404)
+    target_comment = find_comment(post["_id"], comment_id)
     if not target_comment:
         abort(404)
 
@@ -165,10 +208,7 @@ def delete_comment(post_id):
     if not (is_comment_author or is_post_author or is_admin):
         abort(403)
 
-    get_posts_collection().update_one(
-        {"_id": ObjectId(post_id)},
-        {"$pull": {"comments": {"comment_id": ObjectId(comment_id)}}}
-    ) 
+    pull_comment(post["_id"], comment_id)
 
     return redirect(url_for("write.detail", post_id=post_id))
 
@@ -177,7 +217,7 @@ def delete_comment(post_id):
 # 게시글 수정 폼
 @write_bp.route("/edit/<post_id>", methods=["GET"])
 def edit_form(post_id):
-    post = get_posts_collection().find_one({"_id": ObjectId(post_id)})
+    post = get_posts_collection().find_one({"_id": ObjectId(post_id)}, POST_DETAIL_PROJECTION)
     if not post:
         abort(404)
 
@@ -192,7 +232,7 @@ def edit_form(post_id):
 # 게시글 수정 POST처리
 @write_bp.route("/edit/<post_id>", methods=["POST"])
 def edit_post(post_id):
-    post = get_posts_collection().find_one({"_id": ObjectId(post_id)})
+    post = get_posts_collection().find_one({"_id": ObjectId(post_id)}, {"author_id": 1, "created_at": 1})
     if not post:
         abort(404)
 
@@ -219,6 +259,7 @@ def edit_post(post_id):
             }
         }
     )
+    index_post({**post, "title": title, "content": content, "category": category})
     return redirect(url_for("write.detail", post_id=post_id))
 
 
@@ -226,7 +267,7 @@ def edit_post(post_id):
 # 게시글 삭제 POST처리
 @write_bp.route("/delete/<post_id>", methods=["POST"])
 def delete(post_id):
-    post = get_posts_collection().find_one({"_id": ObjectId(post_id)})
+    post = get_posts_collection().find_one({"_id": ObjectId(post_id)}, POST_COUNTER_FIELDS)
     if not post:
         abort(404)
 
@@ -239,5 +280,9 @@ def delete(post_id):
     result = get_posts_collection().delete_one({"_id": ObjectId(post_id)})
     if result.deleted_count == 0:
         abort(404)
+    remove_post(post["_id"])
+    remove_post_comments(post["_id"])
+    record_post_change(post, None)
+    invalidate_leaderboard()
 
     return redirect(url_for("write.home"))
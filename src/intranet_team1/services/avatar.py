@@ -0,0 +1,78 @@
+import hashlib
+import logging
+from io import BytesIO
+from PIL import Image, ImageOps
+from db import mongo_db
+from extension import get_fs
+
+# 헤더(40px)와 목록(30px)에서 1x/2x 로 쓰는 썸네일 크기
+AVATAR_SIZES = (32, 64, 128)
+AVATAR_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+}
+
+
+def _fs_files():
+    return mongo_db["fs.files"]
+
+
+def create_avatar_thumbnails(image_bytes):
+    """정제된 원본 이미지로 크기/포맷별 정사각형 썸네일을 GridFS 에 저장하고 내용 해시를 반환"""
+    digest = hashlib.sha256(image_bytes).hexdigest()[:20]
+    fs = get_fs()
+
+    # 같은 이미지로 이미 만들어 둔 썸네일이 있으면 재사용
+    if _fs_files().find_one({"metadata.kind": "avatar", "metadata.digest": digest}, {"_id": 1}):
+        return digest
+
+    with Image.open(BytesIO(image_bytes)) as source:
+        source.seek(0)  # 움직이는 GIF 는 첫 프레임만 사용
+        base = source.convert("RGB")
+
+    for size in AVATAR_SIZES:
+        thumb = ImageOps.fit(base, (size, size), Image.Resampling.LANCZOS)
+        for fmt, (pil_format, content_type) in AVATAR_FORMATS.items():
+            output = BytesIO()
+            thumb.save(output, format=pil_format, quality=85)
+            output.seek(0)
+            fs.put(output, filename=f"avatar-{digest}-{size}.{fmt}", content_type=content_type,
+                   metadata={"kind": "avatar", "digest": digest, "size": size, "format": fmt})
+    return digest
+
+
+def delete_avatar_thumbnails(digest):
+    # 같은 사진을 쓰는 다른 직원이 있으면 썸네일을 남겨둔다
+    if not digest or mongo_db.hr.count_documents({"profile_avatar_digest": digest}, limit=2) > 1:
+        return
+    fs = get_fs()
+    for doc in _fs_files().find({"metadata.kind": "avatar", "metadata.digest": digest}, {"_id": 1}):
+        try:
+            fs.delete(doc["_id"])
+        except Exception as e:
+            logging.warning(f"썸네일 삭제 실패: {doc['_id']} -> {e}")
+
+
+def find_avatar_file_id(digest, size, fmt):
+    doc = _fs_files().find_one(
+        {"metadata.kind": "avatar", "metadata.digest": digest, "metadata.size": size, "metadata.format": fmt},
+        {"_id": 1}
+    )
+    return doc["_id"] if doc else None
+
+
+def backfill_avatars():
+    """썸네일이 없는 기존 직원의 프로필 사진으로 썸네일을 만들어 채운다"""
+    fs = get_fs()
+    created, failed = 0, 0
+    query = {"profile_image_id": {"$ne": None}, "profile_avatar_digest": None}
+    for emp in mongo_db.hr.find(query, {"profile_image_id": 1}):
+        try:
+            image_bytes = fs.get(emp["profile_image_id"]).read()
+            digest = create_avatar_thumbnails(image_bytes)
+            mongo_db.hr.update_one({"_id": emp["_id"]}, {"$set": {"profile_avatar_digest": digest}})
+            created += 1
+        except Exception as e:
+            logging.warning(f"썸네일 생성 실패: {emp['_id']} -> {e}")
+            failed += 1
+    return {"created": created, "failed": failed}
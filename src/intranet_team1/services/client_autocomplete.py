@@ -0,0 +1,126 @@
+import re
+import unicodedata
+from pymongo import UpdateOne
+from db import mongo_db
+from services.cache import TTLCache
+
+# ========== 🔤 고객사 자동완성 ==========
+# 고객사 이름의 앞부분(prefix)들을 client_autocomplete 컬렉션의 keys 배열에 미리 넣어두고
+# 입력값과 정확히 일치하는 key 를 멀티키 인덱스로 찾는다. (매 입력마다 clients 를 $regex 로 훑지 않음)
+#   - 소문자 + NFC 정규화, 공백/기호를 뺀 전체 이름과 단어별 prefix
+#   - 한글 초성 prefix ("ㅎㅂㅅㅍㅌ" → "한빛소프트")
+# 같은 검색어가 연달아 들어오는 경우(타이핑 중 재요청 등)를 위해 짧은 TTL 캐시를 둔다.
+# rebuild_client_autocomplete() 를 한 번도 돌리지 않았으면 clients 의 이름 앞부분 $regex 로 찾는다.
+
+MAX_PREFIX_LENGTH = 20
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_META_ID = "client_autocomplete_meta"
+
+term_cache = TTLCache(maxsize=1024, ttl=10)
+
+_ready = {"value": False}
+
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_WORD_RE = re.compile(r"\w+")
+
+
+def get_autocomplete_collection():
+    return mongo_db["client_autocomplete"]
+
+
+def normalize(text):
+    return unicodedata.normalize("NFC", text or "").lower().strip()
+
+
+def _words(text):
+    return _WORD_RE.findall(normalize(text))
+
+
+def choseong(text):
+    # 한글 음절은 초성으로, 나머지 글자는 그대로
+    result = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        result.append(_CHOSEONG[code // 588] if 0 <= code < 11172 else ch)
+    return "".join(result)
+
+
+def _prefixes(text):
+    return {text[:i] for i in range(1, min(len(text), MAX_PREFIX_LENGTH) + 1)}
+
+
+def build_keys(company_name):
+    words = _words(company_name)
+    keys = set()
+    # 공백/기호를 뺀 전체 이름 + 단어별 시작 위치 (예: "(주) 한빛 소프트" 를 "소프트" 로도 찾음)
+    for i in range(len(words)):
+        tail = "".join(words[i:])
+        keys |= _prefixes(tail)
+        keys |= _prefixes(choseong(tail))
+    return sorted(keys)
+
+
+def search_key(term):
+    """검색어를 key 형태로 (공백/기호 제거, 정규화). 빈 문자열이면 검색하지 않는다"""
+    return "".join(_words(term))[:MAX_PREFIX_LENGTH]
+
+
+def _entry(client):
+    return {"name": client.get("company_name", ""), "name_sort": normalize(client.get("company_name")),
+            "keys": build_keys(client.get("company_name"))}
+
+
+def index_client(client):
+    """고객사 등록/수정 후 호출 (client 는 _id, company_name 을 포함)"""
+    get_autocomplete_collection().replace_one({"_id": client["_id"]}, _entry(client), upsert=True)
+    term_cache.clear()
+
+
+def remove_client(client_id):
+    get_autocomplete_collection().delete_one({"_id": client_id})
+    term_cache.clear()
+
+
+def rebuild_client_autocomplete(batch_size=1000):
+    """모든 고객사의 자동완성 key 를 다시 만든다. 처리한 고객사 수 반환"""
+    count, ops = 0, []
+    for client in mongo_db["clients"].find({}, {"company_name": 1}).batch_size(batch_size):
+        ops.append(UpdateOne({"_id": client["_id"]}, {"$set": _entry(client)}, upsert=True))
+        count += 1
+        if len(ops) >= batch_size:
+            get_autocomplete_collection().bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        get_autocomplete_collection().bulk_write(ops, ordered=False)
+    get_autocomplete_collection().update_one({"_id": AUTOCOMPLETE_META_ID}, {"$set": {"ready": True}}, upsert=True)
+    term_cache.clear()
+    return count
+
+
+def autocomplete_ready():
+    """rebuild_client_autocomplete() 가 끝났으면 True (한 번 준비되면 다시 확인하지 않는다)"""
+    if not _ready["value"]:
+        _ready["value"] = get_autocomplete_collection().find_one({"_id": AUTOCOMPLETE_META_ID}, {"_id": 1}) is not None
+    return _ready["value"]
+
+
+def suggest(term, limit=AUTOCOMPLETE_LIMIT):
+    """입력값으로 시작하는 고객사 [{"id", "name"}] 를 이름순으로 최대 limit 개"""
+    key = search_key(term)
+    if not key:
+        return []
+
+    def load():
+        cursor = get_autocomplete_collection().find({"keys": key}, {"name": 1}).sort("name_sort", 1).limit(limit)
+        return [{"id": str(doc["_id"]), "name": doc.get("name") or "이름없음"} for doc in cursor]
+
+    def load_without_index():
+        # 색인 준비 전: 입력값으로 시작하는 이름만 (초성/단어 중간 검색은 지원하지 않음)
+        pattern = "^" + re.escape(normalize(term))
+        cursor = (mongo_db["clients"].find({"company_name": {"$regex": pattern, "$options": "i"}}, {"company_name": 1})
+                  .sort("company_name", 1).limit(limit))
+        return [{"id": str(doc["_id"]), "name": doc.get("company_name") or "이름없음"} for doc in cursor]
+
+    if not autocomplete_ready():
+        return term_cache.get_or_set(("regex", normalize(term), limit), load_without_index)
+    return term_cache.get_or_set((key, limit), load)
@@ -0,0 +1,148 @@
+import re
+from datetime import datetime, timedelta
+from pymongo import DESCENDING, UpdateOne
+from db import mongo_db
+from services.client_autocomplete import build_keys, search_key
+from services.counters import get_counters_collection
+
+# ========== 📋 고객사 목록 ==========
+# 목록 정렬/검색/만료 표시에 쓰는 값을 고객사 문서에 미리 저장해두고 인덱스로 조회한다.
+#   status_order : 계약 상태 Active 는 0, 나머지는 1 (정렬 키)
+#   search_keys  : 고객사명/부서/담당자/이메일의 단어별 접두어 (services/client_autocomplete.py 와 같은 규칙)
+#   contract.end_date : 문자열로 저장된 옛 데이터도 datetime 으로 맞춤
+# 만료 구분(expired/soon/normal/unknown)은 조회한 페이지에 대해서만 쿼리에서 계산한다.
+# backfill_client_list() 를 돌리기 전에는 기존 고객사에 이 필드들이 없으므로 예전처럼 전체를 읽어 계산한다.
+
+CLIENT_PAGE_SIZE = 20
+CLIENT_PAGE_SIZE_MAX = 100
+EXPIRY_SOON_DAYS = 7
+EXPIRY_FILTERS = ["expired", "soon"]
+
+SEARCH_FIELDS = ["company_name", "department", "contact_person", "email"]
+# 목록에 필요한 필드만 (계약서/첨부파일 목록 제외)
+CLIENT_LIST_PROJECTION = {"company_name": 1, "department": 1, "contract": 1}
+BACKFILL_META_ID = "client_list_meta"
+
+_ready = {"value": False}
+
+
+def get_clients_collection():
+    return mongo_db["clients"]
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.strptime(value.strip()[:10], "%Y-%m-%d")
+        except ValueError:
+            return None
+    return None
+
+
+def list_fields(client):
+    """고객사 등록/수정 시 문서에 함께 넣을 목록용 필드 (contract 는 날짜를 맞춘 전체 값)"""
+    contract = client.get("contract") or {}
+    search_keys = set()
+    for field in SEARCH_FIELDS:
+        search_keys.update(build_keys(client.get(field)))
+    return {
+        "status_order": 0 if contract.get("status") == "Active" else 1,
+        "search_keys": sorted(search_keys),
+        "contract": {**contract, "start_date": _to_datetime(contract.get("start_date")),
+                     "end_date": _to_datetime(contract.get("end_date"))},
+    }
+
+
+def backfill_client_list(batch_size=500):
+    """기존 고객사에 목록용 필드를 채운다. 처리한 고객사 수 반환"""
+    count, ops = 0, []
+    cursor = get_clients_collection().find({}, {field: 1 for field in SEARCH_FIELDS + ["contract"]})
+    for client in cursor.batch_size(batch_size):
+        ops.append(UpdateOne({"_id": client["_id"]}, {"$set": list_fields(client)}))
+        count += 1
+        if len(ops) >= batch_size:
+            get_clients_collection().bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        get_clients_collection().bulk_write(ops, ordered=False)
+    get_counters_collection().update_one({"_id": BACKFILL_META_ID}, {"$set": {"ready": True}}, upsert=True)
+    return count
+
+
+def client_list_ready():
+    """backfill_client_list() 가 끝났으면 True (한 번 준비되면 다시 확인하지 않는다)"""
+    if not _ready["value"]:
+        _ready["value"] = get_counters_collection().find_one({"_id": BACKFILL_META_ID}, {"_id": 1}) is not None
+    return _ready["value"]
+
+
+def _highlight_expr(now):
+    end_date = "$contract.end_date"
+    return {"$switch": {
+        "branches": [
+            # 종료일은 datetime 으로 맞춰져 있으므로 (backfill-client-list) 없을 때만 unknown
+            {"case": {"$eq": [{"$ifNull": [end_date, None]}, None]}, "then": "unknown"},
+            {"case": {"$lt": [end_date, now]}, "then": "expired"},
+            {"case": {"$lte": [end_date, now + timedelta(days=EXPIRY_SOON_DAYS)]}, "then": "soon"},
+        ],
+        "default": "normal",
+    }}
+
+
+def _highlight(end_date, now):
+    if end_date is None:
+        return "unknown"
+    if end_date < now:
+        return "expired"
+    if end_date <= now + timedelta(days=EXPIRY_SOON_DAYS):
+        return "soon"
+    return "normal"
+
+
+def _list_clients_without_backfill(search, expiry, page, page_size, now):
+    # 목록용 필드가 없는 고객사도 섞여 있으므로 예전 방식(부분 일치 $regex, 정렬 키/만료 구분은 읽으면서 계산)
+    match = {"$or": [{field: {"$regex": re.escape(search), "$options": "i"}} for field in SEARCH_FIELDS]} if search else {}
+    pipeline = [
+        {"$match": match},
+        {"$project": CLIENT_LIST_PROJECTION},
+        {"$addFields": {"status_order": {"$cond": [{"$eq": ["$contract.status", "Active"]}, 0, 1]}}},
+        {"$sort": {"status_order": 1, "_id": DESCENDING}},
+    ]
+    clients = []
+    for client in get_clients_collection().aggregate(pipeline):
+        client["highlight"] = _highlight(_to_datetime((client.get("contract") or {}).get("end_date")), now)
+        if not expiry or client["highlight"] == expiry:
+            clients.append(client)
+    start = (page - 1) * page_size
+    return {"clients": clients[start:start + page_size], "has_next": len(clients) > start + page_size}
+
+
+def list_clients(search="", expiry=None, page=1, page_size=CLIENT_PAGE_SIZE):
+    """Active 먼저, 최근 등록순 한 페이지. 반환값: {"clients": [...], "has_next": bool}
+
+    search 는 단어 앞부분 일치, expiry 는 "expired"(종료일 지남) / "soon"(EXPIRY_SOON_DAYS 안에 종료)
+    """
+    now = datetime.now()
+    if not client_list_ready():
+        return _list_clients_without_backfill(search, expiry, page, page_size, now)
+
+    match = {}
+    key = search_key(search)
+    if key:
+        match["search_keys"] = key
+    if expiry == "expired":
+        match["contract.end_date"] = {"$lt": now}
+    elif expiry == "soon":
+        match["contract.end_date"] = {"$gte": now, "$lte": now + timedelta(days=EXPIRY_SOON_DAYS)}
+
+    pipeline = [
+        {"$match": match},
+        {"$sort": {"status_order": 1, "_id": DESCENDING}},
+        {"$skip": (page - 1) * page_size},
+        {"$limit": page_size + 1},
+        {"$project": {**CLIENT_LIST_PROJECTION, "highlight": _highlight_expr(now)}},
+    ]
+    clients = list(get_clients_collection().aggregate(pipeline))
+    return {"clients": clients[:page_size], "has_next": len(clients) > page_size}
@@ -0,0 +1,147 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import request
+from pymongo import DESCENDING
+from db import mongo_db
+from services.client_list import EXPIRY_SOON_DAYS
+from services.locks import acquire_lock
+
+# ========== ⏰ 계약 만료 스케줄러 ==========
+# 워커마다 백그라운드 스레드를 하나 두고 CONTRACT_EXPIRY_INTERVAL_SECONDS 마다 깨어나지만,
+# locks 컬렉션의 잠금을 가진 한 프로세스만 실제로 검사한다. (services/locks.py)
+# 검사는 종료일이 최근 RECENT_EXPIRED_DAYS 일 ~ 임박 기준 사이인 고객사와, 표시가 더 이상 맞지 않을 수 있는
+# 고객사(임박 표시, 또는 만료 표시인데 종료일이 연장/삭제된 경우)만 인덱스로 읽는다.
+#   - 상태가 바뀐 고객사의 expiry_state("soon"/"expired", 정상이면 필드 없음)를 갱신하고
+#   - 결과를 contract_expiry_digest 에 한 건 남긴다. (화면/API 는 최신 digest 만 읽음)
+# 그보다 오래 전에 만료된 고객사는 읽지 않으며 (전체 만료 수는 count 로만 셈), 처음 배포할 때 이미 오래 전에
+# 만료된 고객사에는 expiry_state 를 남기지 않는다.
+
+LOCK_NAME = "contract_expiry"
+DEFAULT_INTERVAL_SECONDS = 3600
+RECENT_EXPIRED_DAYS = 30
+EXPIRY_STATES = ["soon", "expired"]
+MAX_DIGEST_TRANSITIONS = 100  # digest 에 남기는 상태 변경 수 (전체 수는 transitions_total)
+
+_scheduler_pid = None
+_scheduler_lock = threading.Lock()
+
+
+def get_clients_collection():
+    return mongo_db["clients"]
+
+
+def get_digest_collection():
+    return mongo_db["contract_expiry_digest"]
+
+
+def _state(end_date, now):
+    if not isinstance(end_date, datetime):
+        return None
+    if end_date < now:
+        return "expired"
+    if end_date <= now + timedelta(days=EXPIRY_SOON_DAYS):
+        return "soon"
+    return None
+
+
+def _summary(client):
+    return {"id": str(client["_id"]), "company_name": client.get("company_name", ""),
+            "end_date": (client.get("contract") or {}).get("end_date")}
+
+
+def scan_contract_expiry(now=None):
+    """만료/임박 상태를 다시 계산하고 바뀐 고객사를 기록한 뒤 digest 를 저장해 반환"""
+    now = now or datetime.now()
+    soon_cutoff = now + timedelta(days=EXPIRY_SOON_DAYS)
+    recent_cutoff = now - timedelta(days=RECENT_EXPIRED_DAYS)
+    projection = {"company_name": 1, "contract.end_date": 1, "expiry_state": 1}
+
+    # 종료일이 최근 만료 ~ 임박 기준 사이인 고객사
+    candidates = {c["_id"]: c for c in get_clients_collection().find(
+        {"contract.end_date": {"$gte": recent_cutoff, "$lte": soon_cutoff}}, projection)}
+    # 지난번 표시가 풀렸을 수 있는 고객사 (계약 연장/종료일 삭제, 검사가 오래 멈췄던 경우의 임박 표시)
+    stale = {"$or": [
+        {"expiry_state": "soon"},
+        {"expiry_state": "expired", "contract.end_date": {"$gt": soon_cutoff}},
+        {"expiry_state": "expired", "contract.end_date": None},
+    ]}
+    for c in get_clients_collection().find(stale, projection):
+        candidates.setdefault(c["_id"], c)
+
+    transitions, soon, recent_expired = [], [], []
+    for client in candidates.values():
+        end_date = (client.get("contract") or {}).get("end_date")
+        state = _state(end_date, now)
+        if state != client.get("expiry_state"):
+            update = {"$set": {"expiry_state": state}} if state else {"$unset": {"expiry_state": ""}}
+            get_clients_collection().update_one({"_id": client["_id"]}, update)
+            transitions.append({**_summary(client), "from": client.get("expiry_state"), "to": state})
+        if state == "soon":
+            soon.append(_summary(client))
+        elif state == "expired" and end_date >= recent_cutoff:
+            recent_expired.append(_summary(client))
+
+    digest = {
+        "generated_at": now,
+        "soon": sorted(soon, key=lambda c: c["end_date"]),
+        "recent_expired": sorted(recent_expired, key=lambda c: c["end_date"], reverse=True),
+        "expired_total": get_clients_collection().count_documents({"contract.end_date": {"$lt": now}}),
+        "transitions": transitions[:MAX_DIGEST_TRANSITIONS],
+        "transitions_total": len(transitions),
+    }
+    get_digest_collection().insert_one(digest)
+    return digest
+
+
+def latest_digest():
+    """가장 최근 digest (없으면 None)"""
+    return get_digest_collection().find_one({}, {"_id": 0}, sort=[("generated_at", DESCENDING)])
+
+
+def run_if_leader(interval_seconds):
+    """잠금을 얻은 경우에만 검사. 검사했으면 digest, 아니면 None"""
+    # 잠금은 주기의 2배 동안 유지해서 주인 프로세스가 살아 있는 동안 다른 워커가 가져가지 않게 한다
+    if not acquire_lock(LOCK_NAME, ttl_seconds=interval_seconds * 2):
+        return None
+    return scan_contract_expiry()
+
+
+def _scheduler_loop(app, interval_seconds):
+    while True:
+        try:
+            with app.app_context():
+                digest = run_if_leader(interval_seconds)
+            if digest:
+                logging.info(f"계약 만료 검사: 임박 {len(digest['soon'])}건, 상태 변경 {digest['transitions_total']}건")
+        except Exception as e:
+            logging.warning(f"계약 만료 검사 실패: {e}")
+        time.sleep(interval_seconds)
+
+
+def _start_scheduler(app):
+    # 프리포크 서버에서는 포크 전에 만든 스레드가 워커로 넘어가지 않으므로 워커별로 첫 요청 때 시작
+    global _scheduler_pid
+    if _scheduler_pid == os.getpid():
+        return
+    with _scheduler_lock:
+        if _scheduler_pid == os.getpid():
+            return
+        _scheduler_pid = os.getpid()
+        interval = app.config["CONTRACT_EXPIRY_INTERVAL_SECONDS"]
+        threading.Thread(target=_scheduler_loop, args=(app, interval), name="contract-expiry", daemon=True).start()
+
+
+def init_contract_expiry(app):
+    app.config.setdefault("CONTRACT_EXPIRY_SCHEDULER_ENABLED", os.getenv("CONTRACT_EXPIRY_SCHEDULER", "1") == "1")
+    app.config.setdefault("CONTRACT_EXPIRY_INTERVAL_SECONDS",
+                          int(os.getenv("CONTRACT_EXPIRY_INTERVAL_SECONDS", DEFAULT_INTERVAL_SECONDS)))
+    if not app.config["CONTRACT_EXPIRY_SCHEDULER_ENABLED"]:
+        return
+
+    @app.before_request
+    def start_contract_expiry_scheduler():
+        if request.endpoint != "static":
+            _start_scheduler(app)
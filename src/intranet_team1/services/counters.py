@@ -0,0 +1,222 @@
+from datetime import datetime
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from db import mongo_db
+
+# ========== 🔢 카운터 ==========
+# counters 컬렉션에 이름별 값을 두고 $inc 로 원자적으로 증가시킨다.
+#   issue_seq:<family> : 이슈 목록에 표시하는 family 별 글 번호
+#   hr_names_version   : 직원 이름 캐시 버전 (services/names.py)
+#   issue_status|... 등  : 대시보드 카운터 (아래 참고)
+
+
+def get_counters_collection():
+    return mongo_db["counters"]
+
+
+def next_sequence(name):
+    """이름별 일련번호를 1 증가시키고 새 값을 반환"""
+    doc = get_counters_collection().find_one_and_update(
+        {"_id": name}, {"$inc": {"value": 1}}, upsert=True, return_document=ReturnDocument.AFTER
+    )
+    return doc["value"]
+
+
+def issue_seq_name(family_name):
+    return f"issue_seq:{family_name}"
+
+
+def backfill_issue_sequences(families, batch_size=1000):
+    """기존 이슈에 작성 순서대로 seq 를 다시 매기고 카운터를 맞춘다. family 별 매긴 개수 반환"""
+    issues = mongo_db["issues"]
+    result = {}
+    for family_name in families:
+        cursor = issues.find({"project_family": family_name}, {"_id": 1}).sort(
+            [("created_at", ASCENDING), ("_id", ASCENDING)])
+        ops, seq = [], 0
+        for doc in cursor:
+            seq += 1
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"seq": seq}}))
+            if len(ops) >= batch_size:
+                issues.bulk_write(ops, ordered=False)
+                ops = []
+        if ops:
+            issues.bulk_write(ops, ordered=False)
+        # 작업 중 새로 작성된 이슈가 받은 번호보다 작아지지 않도록 $max
+        get_counters_collection().update_one({"_id": issue_seq_name(family_name)}, {"$max": {"value": seq}},
+                                             upsert=True)
+        result[family_name] = seq
+    return result
+
+
+# ========== 📈 대시보드 카운터 (쓰기 시점에 갱신) ==========
+# 이슈/업무/게시글이 바뀔 때 변경 전후 문서를 비교해 해당 카운터만 $inc 한다.
+#   issue_status : family × status          issue_day : family × status × 작성일
+#   task_status  : team × status            task_day  : team × status × 마감일
+#   post_author  : period("all" 또는 작성월 "YYYY-MM") × 작성자  (게시판 활동 순위)
+# 통계 화면은 집계 대신 이 문서들을 읽는다. 처음 배포하거나 어긋났을 때는 reconcile_counters() 로 다시 만든다.
+
+DASHBOARD_SCOPES = ["issue_status", "issue_day", "task_status", "task_day", "post_author"]
+COUNTERS_META_ID = "dashboard_counters_meta"
+# reconciled_scopes 를 기록하기 전의 reconcile 이 맞춘 scope
+LEGACY_SCOPES = ["issue_status", "issue_day", "task_status", "task_day"]
+
+ISSUE_COUNTER_FIELDS = {"project_family": 1, "status": 1, "created_at": 1}
+TASK_COUNTER_FIELDS = {"team": 1, "status": 1, "due_date": 1}
+POST_COUNTER_FIELDS = {"author_id": 1, "created_at": 1}
+
+
+def _day(value):
+    return datetime(value.year, value.month, value.day) if isinstance(value, datetime) else None
+
+
+def _counter_id(scope, dims):
+    parts = [v.strftime("%Y-%m-%d") if isinstance(v, datetime) else str(v) for v in dims.values()]
+    return "|".join([scope] + parts)
+
+
+def _issue_keys(issue):
+    if not issue or not issue.get("project_family"):
+        return []
+    dims = {"family": issue["project_family"], "status": issue.get("status")}
+    keys = [("issue_status", dims)]
+    day = _day(issue.get("created_at"))
+    if day:
+        keys.append(("issue_day", {**dims, "day": day}))
+    return keys
+
+
+def _task_keys(task):
+    if not task:
+        return []
+    dims = {"team": task.get("team"), "status": task.get("status")}
+    keys = [("task_status", dims)]
+    day = _day(task.get("due_date"))
+    if day:
+        keys.append(("task_day", {**dims, "day": day}))
+    return keys
+
+
+def month_period(value):
+    return value.strftime("%Y-%m")
+
+
+def _post_keys(post):
+    if not post or not post.get("author_id"):
+        return []
+    keys = [("post_author", {"period": "all", "author": post["author_id"]})]
+    if isinstance(post.get("created_at"), datetime):
+        keys.append(("post_author", {"period": month_period(post["created_at"]), "author": post["author_id"]}))
+    return keys
+
+
+def _apply_change(before_keys, after_keys):
+    deltas, dims_by_id = {}, {}
+    for sign, keys in ((-1, before_keys), (1, after_keys)):
+        for scope, dims in keys:
+            counter_id = _counter_id(scope, dims)
+            deltas[counter_id] = deltas.get(counter_id, 0) + sign
+            dims_by_id[counter_id] = (scope, dims)
+
+    ops = [
+        UpdateOne({"_id": counter_id},
+                  {"$inc": {"value": delta}, "$setOnInsert": {"scope": dims_by_id[counter_id][0], **dims_by_id[counter_id][1]}},
+                  upsert=True)
+        for counter_id, delta in deltas.items() if delta
+    ]
+    if ops:
+        get_counters_collection().bulk_write(ops, ordered=False)
+
+
+def record_issue_change(before, after):
+    """이슈 작성(before=None)/수정/삭제(after=None) 후 호출"""
+    _apply_change(_issue_keys(before), _issue_keys(after))
+
+
+def record_task_change(before, after):
+    """업무 추가(before=None)/수정/삭제(after=None) 후 호출"""
+    _apply_change(_task_keys(before), _task_keys(after))
+
+
+def record_post_change(before, after):
+    """게시글 작성(before=None)/삭제(after=None) 후 호출"""
+    _apply_change(_post_keys(before), _post_keys(after))
+
+
+def counters_ready(scope):
+    # 해당 scope 를 reconcile 한 적이 없으면 카운터가 불완전하므로 호출자가 집계로 대신한다.
+    # (scope 를 나중에 추가한 경우 예전에 reconcile 했더라도 그 scope 는 아직 준비되지 않은 것)
+    meta = get_counters_collection().find_one({"_id": COUNTERS_META_ID}, {"reconciled_scopes": 1})
+    if meta is None:
+        return False
+    return scope in meta.get("reconciled_scopes", LEGACY_SCOPES)
+
+
+def read_counters(scope, since=None, until=None):
+    """scope 의 카운터 문서 목록. *_day scope 는 since/until(포함) 로 범위를 줄일 수 있다"""
+    query = {"scope": scope}
+    if since or until:
+        query["day"] = {}
+        if since:
+            query["day"]["$gte"] = _day(since)
+        if until:
+            query["day"]["$lte"] = _day(until)
+    return list(get_counters_collection().find(query, {"_id": 0, "scope": 0}))
+
+
+def _expected_counters():
+    # 원본 컬렉션에서 카운터 값을 다시 계산
+    day_expr = lambda field: {"$dateToString": {"format": "%Y-%m-%d", "date": f"${field}"}}
+    sources = [
+        ("issue_status", "issues", {"project_family": {"$nin": [None, ""]}},
+         {"family": "$project_family", "status": "$status"}),
+        ("issue_day", "issues", {"project_family": {"$nin": [None, ""]}, "created_at": {"$type": "date"}},
+         {"family": "$project_family", "status": "$status", "day": day_expr("created_at")}),
+        ("task_status", "tasks", {}, {"team": "$team", "status": "$status"}),
+        ("task_day", "tasks", {"due_date": {"$type": "date"}},
+         {"team": "$team", "status": "$status", "day": day_expr("due_date")}),
+        ("post_author", "posts", {"author_id": {"$nin": [None, ""]}},
+         {"period": {"$literal": "all"}, "author": "$author_id"}),
+        ("post_author", "posts", {"author_id": {"$nin": [None, ""]}, "created_at": {"$type": "date"}},
+         {"period": {"$dateToString": {"format": "%Y-%m", "date": "$created_at"}}, "author": "$author_id"}),
+    ]
+    expected = {}
+    for scope, collection, match, group_id in sources:
+        pipeline = [{"$match": match}, {"$group": {"_id": group_id, "value": {"$sum": 1}}}]
+        for doc in mongo_db[collection].aggregate(pipeline, allowDiskUse=True):
+            # $group 결과에서 빠진 필드(None)도 원래 순서대로 채운다
+            dims = {k: doc["_id"].get(k) for k in group_id}
+            if "day" in dims:
+                dims["day"] = datetime.strptime(dims["day"], "%Y-%m-%d")
+            expected[_counter_id(scope, dims)] = (scope, dims, doc["value"])
+    return expected
+
+
+def reconcile_counters(dry_run=False):
+    """원본 데이터로 대시보드 카운터를 다시 계산해 차이를 보고하고, dry_run 이 아니면 바로잡는다
+
+    작업 중 들어온 쓰기는 차이로 보고될 수 있으므로 한가한 시간에 실행한다.
+    """
+    expected = _expected_counters()
+    actual = {doc["_id"]: doc.get("value", 0)
+              for doc in get_counters_collection().find({"scope": {"$in": DASHBOARD_SCOPES}}, {"value": 1})}
+
+    drift = []
+    ops = []
+    for counter_id, (scope, dims, value) in expected.items():
+        if actual.get(counter_id) != value:
+            drift.append({"id": counter_id, "actual": actual.get(counter_id), "expected": value})
+            ops.append(UpdateOne({"_id": counter_id}, {"$set": {"scope": scope, **dims, "value": value}}, upsert=True))
+    extra_ids = [counter_id for counter_id in actual if counter_id not in expected]
+    for counter_id in extra_ids:
+        if actual[counter_id]:
+            drift.append({"id": counter_id, "actual": actual[counter_id], "expected": 0})
+
+    if not dry_run:
+        if ops:
+            get_counters_collection().bulk_write(ops, ordered=False)
+        if extra_ids:
+            get_counters_collection().delete_many({"_id": {"$in": extra_ids}})
+        get_counters_collection().update_one(
+            {"_id": COUNTERS_META_ID},
+            {"$set": {"reconciled_at": datetime.now(), "reconciled_scopes": DASHBOARD_SCOPES}}, upsert=True)
+    return {"checked": len(expected), "drift": drift, "dry_run": dry_run}
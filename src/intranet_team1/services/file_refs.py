@@ -0,0 +1,74 @@
+from pymongo import ReturnDocument
+from db import mongo_db
+
+# ========== ♻️ 첨부파일 중복 제거 / 참조 카운트 ==========
+# 같은 내용(SHA-256 + 크기)의 파일은 GridFS 에 한 번만 저장하고 metadata.refcount 로 참조 수를 관리한다.
+# refcount 가 없는 기존 파일(프로필 사진 등)은 참조 1개로 간주한다.
+
+
+def _files():
+    return mongo_db["fs.files"]
+
+
+def _chunks():
+    return mongo_db["fs.chunks"]
+
+
+def deduplicate(file_id, sha256, size):
+    """방금 저장한 파일과 같은 내용이 있으면 기존 파일의 참조를 늘리고 새 파일은 지운다
+
+    반환값: (사용할 file_id, 중복 여부)
+    """
+    existing = _files().find_one_and_update(
+        # refcount 가 0 이 된(삭제 중인) 파일은 재사용하지 않는다
+        {"metadata.sha256": sha256, "length": size, "metadata.refcount": {"$gte": 1}, "_id": {"$ne": file_id}},
+        {"$inc": {"metadata.refcount": 1}},
+        projection={"_id": 1},
+    )
+    if existing:
+        _files().delete_one({"_id": file_id})
+        _chunks().delete_many({"files_id": file_id})
+        return existing["_id"], True
+
+    _files().update_one({"_id": file_id}, {"$set": {"metadata.sha256": sha256, "metadata.refcount": 1}})
+    return file_id, False
+
+
+def release_file(file_id):
+    """참조를 하나 줄이고 마지막 참조였으면 파일(fs.files + fs.chunks)을 삭제. 삭제했으면 True"""
+    doc = _files().find_one_and_update(
+        {"_id": file_id, "metadata.refcount": {"$exists": True}},
+        {"$inc": {"metadata.refcount": -1}},
+        projection={"metadata.refcount": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if doc is not None and doc["metadata"]["refcount"] > 0:
+        return False
+
+    result = _files().delete_one({
+        "_id": file_id,
+        "$or": [{"metadata.refcount": {"$lte": 0}}, {"metadata.refcount": {"$exists": False}}],
+    })
+    if result.deleted_count:
+        _chunks().delete_many({"files_id": file_id})
+        return True
+    return False
+
+
+def dedup_report():
+    """중복 제거로 절약한 용량 집계"""
+    pipeline = [
+        {"$match": {"metadata.refcount": {"$gte": 1}}},
+        {"$group": {
+            "_id": None,
+            "files": {"$sum": 1},
+            "stored_bytes": {"$sum": "$length"},
+            "references": {"$sum": "$metadata.refcount"},
+            "saved_bytes": {"$sum": {"$multiply": ["$length", {"$subtract": ["$metadata.refcount", 1]}]}},
+        }},
+    ]
+    result = list(_files().aggregate(pipeline))
+    if not result:
+        return {"files": 0, "stored_bytes": 0, "references": 0, "saved_bytes": 0}
+    result[0].pop("_id")
+    return result[0]
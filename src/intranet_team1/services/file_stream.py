@@ -0,0 +1,104 @@
+import mimetypes
+import unicodedata
+from urllib.parse import quote
+from bson.objectid import ObjectId
+from flask import Response, request
+from extension import get_fs
+
+
+def _content_disposition(disposition, filename):
+    # 한글 파일명은 filename* (RFC 5987) 로, 구형 브라우저용 ASCII 이름도 함께 넣는다
+    ascii_name = unicodedata.normalize("NFKD", filename).encode("ascii", "ignore").decode("ascii")
+    ascii_name = ascii_name.replace('"', "").replace("\\", "") or "download"
+    if ascii_name == filename:
+        return f'{disposition}; filename="{ascii_name}"'
+    return f"{disposition}; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+def _etag_for(grid_out):
+    # 업로드 시 계산한 내용 해시(services/file_refs.py)가 있으면 사용하고,
+    # 없으면 GridFS 파일은 수정되지 않으므로 _id/길이/업로드 시각으로 충분히 식별된다
+    sha256 = (grid_out.metadata or {}).get("sha256")
+    if sha256:
+        return sha256
+    uploaded = int(grid_out.upload_date.timestamp()) if grid_out.upload_date else 0
+    return f"{grid_out._id}-{grid_out.length}-{uploaded}"
+
+
+def _iter_chunks(grid_out, start, length):
+    # 청크 단위로 읽어 내보내므로 파일 크기와 관계없이 메모리 사용량이 일정하다
+    grid_out.seek(start)
+    remaining = length
+    while remaining > 0:
+        data = grid_out.read(min(grid_out.chunk_size, remaining))
+        if not data:
+            break
+        remaining -= len(data)
+        yield data
+
+
+def _requested_range(length, etag, last_modified):
+    rng = request.range
+    if rng is None or rng.units != "bytes" or len(rng.ranges) != 1:
+        return None, False
+
+    # If-Range 가 현재 파일과 다르면 Range 를 무시하고 전체를 보낸다
+    if_range = request.if_range
+    if if_range.etag is not None and if_range.etag != etag:
+        return None, False
+    if if_range.date is not None and (last_modified is None or last_modified.replace(microsecond=0) > if_range.date.replace(tzinfo=None)):
+        return None, False
+
+    bounds = rng.range_for_length(length)
+    if bounds is None:
+        return None, True
+    return bounds, False
+
+
+def send_gridfs_file(file_id, as_attachment=True, fallback_name="download", mimetype=None,
+                     cache_control="private, no-cache", download_name=None):
+    """GridFS 파일을 스트리밍으로 전송 (Range / ETag / 조건부 GET 지원)
+
+    중복 제거된 파일은 처음 올린 사람의 파일명/형식을 가지고 있으므로,
+    업무/고객사 첨부파일은 download_name 으로 그 문서에 저장된 파일명을 넘긴다.
+    파일이 없거나 id 가 잘못되면 gridfs.errors.NoFile / bson.errors.InvalidId 를 그대로 던진다.
+    """
+    grid_out = get_fs().get(ObjectId(file_id))
+    filename = download_name or grid_out.filename or fallback_name
+    # download_name 이 있으면 형식도 그 이름 기준으로 정한다
+    mimetype = (mimetype or (download_name and mimetypes.guess_type(download_name)[0])
+                or grid_out.content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream")
+    etag = _etag_for(grid_out)
+    last_modified = grid_out.upload_date
+    length = grid_out.length
+
+    response = Response(mimetype=mimetype, direct_passthrough=True)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers["Accept-Ranges"] = "bytes"
+    response.headers["Cache-Control"] = cache_control
+    response.headers["Content-Disposition"] = _content_disposition(
+        "attachment" if as_attachment else "inline", filename)
+
+    if request.if_none_match:
+        if request.if_none_match.contains(etag):
+            response.status_code = 304
+            return response
+    elif request.if_modified_since and last_modified:
+        if last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None):
+            response.status_code = 304
+            return response
+
+    bounds, unsatisfiable = _requested_range(length, etag, last_modified)
+    if unsatisfiable:
+        response.status_code = 416
+        response.headers["Content-Range"] = f"bytes */{length}"
+        return response
+
+    start, stop = bounds if bounds else (0, length)
+    if bounds:
+        response.status_code = 206
+        response.headers["Content-Range"] = f"bytes {start}-{stop - 1}/{length}"
+    response.content_length = stop - start
+    response.response = _iter_chunks(grid_out, start, stop - start)
+    return response
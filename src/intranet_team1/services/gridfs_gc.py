@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta, timezone
+from bson.objectid import ObjectId
+from db import mongo_db
+
+# ========== 🧹 GridFS 고아 파일 정리 (mark & sweep) ==========
+# 1) mark  : tasks / clients / hr 에서 참조 중인 file_id 와 프로필 썸네일 해시를 모은다
+# 2) sweep : 참조되지 않고 유예 기간(grace)보다 오래된 fs.files 를 배치 단위로 지운다
+# 업로드 중이거나 방금 올라와 아직 문서에 연결되지 않은 파일은 유예 기간 덕분에 지워지지 않는다.
+
+DEFAULT_GRACE_HOURS = 24
+DEFAULT_BATCH_SIZE = 500
+
+
+def _as_object_id(value):
+    if isinstance(value, ObjectId):
+        return value
+    if isinstance(value, str) and ObjectId.is_valid(value):
+        return ObjectId(value)
+    return None
+
+
+def collect_references():
+    """참조 중인 GridFS file_id 집합과 사용 중인 썸네일 해시 집합 반환"""
+    sources = [
+        ("tasks", "file_id"),
+        ("clients", "contract_files.file_id"),
+        ("clients", "attachments.file_id"),
+        ("hr", "profile_image_id"),
+    ]
+    referenced = set()
+    for collection, field in sources:
+        for value in mongo_db[collection].distinct(field):
+            file_id = _as_object_id(value)
+            if file_id is not None:
+                referenced.add(file_id)
+
+    digests = {d for d in mongo_db.hr.distinct("profile_avatar_digest") if d}
+    return referenced, digests
+
+
+def _is_referenced(doc, referenced, digests):
+    metadata = doc.get("metadata") or {}
+    if metadata.get("kind") == "avatar":
+        return metadata.get("digest") in digests
+    return doc["_id"] in referenced
+
+
+def _delete_batch(batch):
+    # 스캔 이후 중복 제거로 참조가 늘어난 파일은 refcount 조건에 걸려 지워지지 않는다
+    deleted_ids, reclaimed = [], 0
+    for doc in batch:
+        refcount = (doc.get("metadata") or {}).get("refcount")
+        condition = {"_id": doc["_id"], "metadata.refcount": refcount if refcount is not None else {"$exists": False}}
+        if mongo_db["fs.files"].delete_one(condition).deleted_count:
+            deleted_ids.append(doc["_id"])
+            reclaimed += doc.get("length", 0)
+    if deleted_ids:
+        mongo_db["fs.chunks"].delete_many({"files_id": {"$in": deleted_ids}})
+    return len(deleted_ids), reclaimed
+
+
+def _orphan_chunk_file_ids(cutoff):
+    # fs.files 없이 남은 청크 (업로드 중 중단 등). 진행 중인 업로드를 건드리지 않도록
+    # files_id(ObjectId) 생성 시각이 유예 기간보다 오래된 것만 대상으로 한다.
+    # files_id 만으로 묶으므로 files_id_1_n_1 인덱스만 읽고 청크의 data 는 읽지 않는다
+    pipeline = [
+        {"$match": {"files_id": {"$lt": ObjectId.from_datetime(cutoff)}}},
+        {"$group": {"_id": "$files_id"}},
+        {"$lookup": {"from": "fs.files", "localField": "_id", "foreignField": "_id", "as": "file"}},
+        {"$match": {"file": []}},
+        {"$project": {"_id": 1}},
+    ]
+    return [doc["_id"] for doc in mongo_db["fs.chunks"].aggregate(pipeline, allowDiskUse=True)]
+
+
+def _chunk_bytes(file_ids):
+    pipeline = [
+        {"$match": {"files_id": {"$in": file_ids}}},
+        {"$group": {"_id": None, "bytes": {"$sum": {"$binarySize": "$data"}}}},
+    ]
+    result = list(mongo_db["fs.chunks"].aggregate(pipeline))
+    return result[0]["bytes"] if result else 0
+
+
+def _sweep_orphan_chunks(cutoff, dry_run, batch_size):
+    # 고아로 확인된 files_id 의 청크만 크기를 재고 지운다
+    orphan_ids, reclaimed = _orphan_chunk_file_ids(cutoff), 0
+    for i in range(0, len(orphan_ids), batch_size):
+        batch = orphan_ids[i:i + batch_size]
+        reclaimed += _chunk_bytes(batch)
+        if not dry_run:
+            mongo_db["fs.chunks"].delete_many({"files_id": {"$in": batch}})
+    return len(orphan_ids), reclaimed
+
+
+def collect_garbage(grace_hours=DEFAULT_GRACE_HOURS, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """참조되지 않는 GridFS 파일 정리. dry_run 이면 삭제하지 않고 대상만 집계"""
+    # 마크보다 먼저 기준 시각을 정해야 마크 도중 올라온 파일이 대상에 들어가지 않는다
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=grace_hours)
+    referenced, digests = collect_references()
+
+    report = {"scanned": 0, "files": 0, "bytes": 0, "orphan_chunk_files": 0, "orphan_chunk_bytes": 0,
+              "dry_run": dry_run}
+    cursor = mongo_db["fs.files"].find(
+        {"uploadDate": {"$lt": cutoff}},
+        {"length": 1, "metadata.kind": 1, "metadata.digest": 1, "metadata.refcount": 1},
+    ).batch_size(batch_size)
+
+    batch = []
+    for doc in cursor:
+        report["scanned"] += 1
+        if _is_referenced(doc, referenced, digests):
+            continue
+        if dry_run:
+            report["files"] += 1
+            report["bytes"] += doc.get("length", 0)
+            continue
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            deleted, reclaimed = _delete_batch(batch)
+            report["files"] += deleted
+            report["bytes"] += reclaimed
+            batch = []
+    if batch:
+        deleted, reclaimed = _delete_batch(batch)
+        report["files"] += deleted
+        report["bytes"] += reclaimed
+
+    report["orphan_chunk_files"], report["orphan_chunk_bytes"] = _sweep_orphan_chunks(cutoff, dry_run, batch_size)
+    return report
@@ -0,0 +1,280 @@
+import logging
+from datetime import datetime
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+# ========== 📇 컬렉션별 인덱스 선언 ==========
+# 각 블루프린트가 사용하는 조회/정렬 패턴에 맞춰 인덱스를 선언한다.
+# 이름을 고정해두면 부팅 시 기존 인덱스와 비교해 누락/변경(drift)을 찾을 수 있다.
+INDEXES = {
+    # issue_route.home / show_list : project_family + status 필터, (created_at, _id) 역순 keyset 페이지네이션
+    "issues": [
+        IndexModel([("project_family", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING),
+                    ("_id", DESCENDING)], name="family_status_created_id"),
+        IndexModel([("project_family", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="family_created_id"),
+        # 고객사별 이슈 통계 (issue_route.stats ?client_id=)
+        IndexModel([("client_company_id", ASCENDING), ("created_at", DESCENDING)], name="client_created"),
+    ],
+    # att_route : user_id + date 조회 및 기간 조회
+    "attendance": [
+        IndexModel([("user_id", ASCENDING), ("date", DESCENDING)], name="user_date"),
+    ],
+    # vc_route / vc_admin_route : 본인 신청 내역, 상태별 관리자 목록
+    "vacation": [
+        IndexModel([("user_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING)],
+                   name="user_status_created"),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING)], name="status_created"),
+    ],
+    # write_route.home : category 필터 + (created_at, _id) 역순 keyset 페이지네이션, 활동 순위 집계(카운터 준비 전)
+    "posts": [
+        IndexModel([("category", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="category_created_id"),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_id"),
+        IndexModel([("author_id", ASCENDING)], name="author"),
+    ],
+    # auth_route.login_post : email 로그인, emp_admin_route 목록 정렬
+    "hr": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("hire_date", DESCENDING)], name="hire_date"),
+        IndexModel([("status", ASCENDING)], name="status"),
+    ],
+    # client_route.show_list : Active 먼저 + 최근 등록순, 단어 접두어 검색, 계약 만료 필터 (services/client_list.py)
+    "clients": [
+        IndexModel([("status_order", ASCENDING), ("_id", DESCENDING)], name="status_order_id"),
+        IndexModel([("search_keys", ASCENDING), ("status_order", ASCENDING), ("_id", DESCENDING)],
+                   name="search_keys"),
+        IndexModel([("contract.end_date", ASCENDING)], name="contract_end_date"),
+        # services/contract_expiry.py : 지난 검사에서 임박이었거나, 만료였는데 종료일이 바뀐 고객사
+        IndexModel([("expiry_state", ASCENDING), ("contract.end_date", ASCENDING)], name="expiry_state_end_date",
+                   partialFilterExpression={"expiry_state": {"$exists": True}}),
+    ],
+    # services/contract_expiry.py : 최신 digest 조회, 90일 지난 digest 자동 삭제
+    "contract_expiry_digest": [
+        IndexModel([("generated_at", DESCENDING)], name="generated_at_ttl", expireAfterSeconds=90 * 24 * 3600),
+    ],
+    # task_route.home : team/status 필터 + (due_date, _id) 역순 페이지, 필터 없을 때 (due_date, _id) 역순
+    #   팀/상태는 따로 걸 수 있으므로 (팀+상태, 팀만, 상태만) 각각 정렬까지 인덱스로 처리되게 둔다
+    # services/task_chart.py : 마감일 범위 조회도 due_date_id 를 사용
+    "tasks": [
+        IndexModel([("due_date", DESCENDING), ("_id", DESCENDING)], name="due_date_id"),
+        IndexModel([("team", ASCENDING), ("status", ASCENDING), ("due_date", DESCENDING), ("_id", DESCENDING)],
+                   name="team_status_due_id"),
+        IndexModel([("team", ASCENDING), ("due_date", DESCENDING), ("_id", DESCENDING)], name="team_due_id"),
+        IndexModel([("status", ASCENDING), ("due_date", DESCENDING), ("_id", DESCENDING)], name="status_due_id"),
+    ],
+    # services/post_search.py : 게시판 검색 bigram 역색인 (멀티키)
+    "post_search": [
+        IndexModel([("grams", ASCENDING)], name="grams"),
+    ],
+    # services/post_comments.py : 글별 bucket 을 작성순으로, 댓글 id 로 bucket 찾기
+    "post_comments": [
+        IndexModel([("post_id", ASCENDING), ("_id", ASCENDING)], name="post_bucket"),
+        IndexModel([("comments.comment_id", ASCENDING)], name="comment_id"),
+    ],
+    # services/org_catalogue.py : kind 별 부서/직위/직책 목록
+    "org_catalogue": [
+        IndexModel([("kind", ASCENDING), ("value", ASCENDING)], name="kind_value"),
+    ],
+    # services/client_autocomplete.py : 접두어 key 일치 + 이름순 top-k
+    "client_autocomplete": [
+        IndexModel([("keys", ASCENDING), ("name_sort", ASCENDING)], name="keys_name"),
+    ],
+    # services/counters.py : scope 별 카운터 조회, 일별 카운터 기간 조회
+    "counters": [
+        IndexModel([("scope", ASCENDING), ("day", ASCENDING)], name="scope_day", sparse=True),
+        # services/leaderboard.py : 기간별 게시글 수 상위 작성자
+        IndexModel([("scope", ASCENDING), ("period", ASCENDING), ("value", DESCENDING)], name="scope_period_value",
+                   sparse=True),
+    ],
+    # GridFS 기본 인덱스 + 프로필 썸네일 조회 (services/avatar.py)
+    "fs.files": [
+        IndexModel([("filename", ASCENDING), ("uploadDate", ASCENDING)], name="filename_1_uploadDate_1"),
+        IndexModel([("metadata.digest", ASCENDING), ("metadata.size", ASCENDING), ("metadata.format", ASCENDING)],
+                   name="avatar_lookup", sparse=True),
+        # 첨부파일 중복 제거 (services/file_refs.py)
+        IndexModel([("metadata.sha256", ASCENDING), ("length", ASCENDING)], name="content_hash", sparse=True),
+    ],
+}
+
+
+# ========== 🔍 라우트별 대표 쿼리 형태 ==========
+# explain() 으로 실행계획을 검사할 쿼리들. 값은 형태만 맞추면 되므로 임의값을 사용한다.
+QUERY_SHAPES = [
+    {"route": "issue.home", "collection": "issues",
+     "filter": {"project_family": "backend", "status": "신규"}, "sort": [("created_at", DESCENDING)]},
+    {"route": "issue.show_list", "collection": "issues",
+     "filter": {"project_family": "backend"}, "sort": [("created_at", DESCENDING), ("_id", DESCENDING)]},
+    {"route": "issue.show_list (다음 페이지)", "collection": "issues",
+     "filter": {"$and": [{"project_family": "backend", "status": "신규"},
+                         {"$or": [{"created_at": {"$lt": datetime(2000, 1, 1)}},
+                                  {"created_at": datetime(2000, 1, 1), "_id": {"$lt": ObjectId()}}]}]},
+     "sort": [("created_at", DESCENDING), ("_id", DESCENDING)]},
+    {"route": "att.show_list", "collection": "attendance",
+     "filter": {"user_id": ObjectId(), "date": {"$gte": "2000-01-01", "$lte": "2000-01-31"}},
+     "sort": [("date", DESCENDING)]},
+    {"route": "att.clock_in", "collection": "attendance",
+     "filter": {"user_id": ObjectId(), "date": "2000-01-01"}},
+    {"route": "vacation.show_list", "collection": "vacation",
+     "filter": {"user_id": ObjectId()}, "sort": [("created_at", DESCENDING)]},
+    {"route": "vacation_admin.admin_list", "collection": "vacation",
+     "filter": {"status": "대기"}, "sort": [("created_at", DESCENDING)]},
+    {"route": "write.home", "collection": "posts",
+     "filter": {"category": "free"}, "sort": [("created_at", DESCENDING), ("_id", DESCENDING)]},
+    {"route": "write.home (다음 페이지)", "collection": "posts",
+     "filter": {"$or": [{"created_at": {"$lt": datetime(2000, 1, 1)}},
+                        {"created_at": datetime(2000, 1, 1), "_id": {"$lt": ObjectId()}}]},
+     "sort": [("created_at", DESCENDING), ("_id", DESCENDING)]},
+    {"route": "write.home (검색)", "collection": "post_search",
+     "filter": {"grams": {"$all": ["개발", "발팀"]}}},
+    {"route": "write.detail (댓글)", "collection": "post_comments",
+     "filter": {"post_id": ObjectId(), "count": {"$gt": 0}}, "sort": [("_id", ASCENDING)]},
+    {"route": "write.delete_comment", "collection": "post_comments",
+     "filter": {"post_id": ObjectId(), "comments.comment_id": ObjectId()}},
+    {"route": "client.show_list", "collection": "clients",
+     "filter": {}, "sort": [("status_order", ASCENDING), ("_id", DESCENDING)]},
+    {"route": "client.show_list (검색)", "collection": "clients",
+     "filter": {"search_keys": "한빛"}, "sort": [("status_order", ASCENDING), ("_id", DESCENDING)]},
+    {"route": "client.show_list (만료)", "collection": "clients",
+     "filter": {"contract.end_date": {"$lt": datetime(2000, 1, 1)}}},
+    {"route": "contract_expiry (스케줄러)", "collection": "clients",
+     "filter": {"contract.end_date": {"$gte": datetime(2000, 1, 1), "$lte": datetime(2000, 2, 7)}}},
+    {"route": "contract_expiry (지난 표시)", "collection": "clients",
+     "filter": {"expiry_state": "expired", "contract.end_date": {"$gt": datetime(2000, 1, 8)}}},
+    {"route": "client.expiry_digest", "collection": "contract_expiry_digest",
+     "filter": {}, "sort": [("generated_at", DESCENDING)]},
+    {"route": "issue.search_client", "collection": "client_autocomplete",
+     "filter": {"keys": "한빛"}, "sort": [("name_sort", ASCENDING)]},
+    {"route": "write.api_leaderboard", "collection": "counters",
+     "filter": {"scope": "post_author", "period": "all", "value": {"$gt": 0}}, "sort": [("value", DESCENDING)]},
+    {"route": "auth.login_post", "collection": "hr",
+     "filter": {"email": "someone@example.com"}},
+    {"route": "task.home", "collection": "tasks",
+     "filter": {}, "sort": [("due_date", DESCENDING), ("_id", DESCENDING)]},
+    {"route": "task.home (팀/상태)", "collection": "tasks",
+     "filter": {"team": "개발팀", "status": "진행중", "due_date": {"$gte": datetime(2000, 1, 1), "$lte": datetime(2000, 1, 31)}},
+     "sort": [("due_date", DESCENDING), ("_id", DESCENDING)]},
+    {"route": "task.home (팀)", "collection": "tasks",
+     "filter": {"team": "개발팀", "due_date": {"$gte": datetime(2000, 1, 1), "$lte": datetime(2000, 1, 31)}},
+     "sort": [("due_date", DESCENDING), ("_id", DESCENDING)]},
+    {"route": "task.home (상태)", "collection": "tasks",
+     "filter": {"status": "진행중"}, "sort": [("due_date", DESCENDING), ("_id", DESCENDING)]},
+    {"route": "task.chart_data", "collection": "tasks",
+     "filter": {"due_date": {"$gte": datetime(2000, 1, 1), "$lt": datetime(2000, 4, 1)}}},
+    {"route": "avatar", "collection": "fs.files",
+     "filter": {"metadata.kind": "avatar", "metadata.digest": "0", "metadata.size": 64, "metadata.format": "webp"}},
+]
+
+
+# key 외에 불일치로 보고할 인덱스 옵션 (바뀌면 같은 이름이라도 다른 인덱스)
+SIGNATURE_OPTIONS = ["unique", "sparse", "partialFilterExpression", "expireAfterSeconds"]
+
+
+def _plain(value):
+    # 서버가 숫자를 1.0 처럼 실수로, 문서를 SON 으로 돌려주는 경우가 있어 비교 가능한 형태로 맞춘다
+    if isinstance(value, dict):
+        return tuple(sorted((k, _plain(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_plain(v) for v in value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _index_signature(spec):
+    """model.document / index_information() 항목에서 비교할 부분 (key 순서는 유지)"""
+    key = spec["key"].items() if isinstance(spec["key"], dict) else spec["key"]
+    options = {
+        "unique": bool(spec.get("unique")),
+        "sparse": bool(spec.get("sparse")),
+        "partialFilterExpression": _plain(spec.get("partialFilterExpression")),
+        "expireAfterSeconds": _plain(spec.get("expireAfterSeconds")),
+    }
+    return (tuple((field, _plain(direction)) for field, direction in key),
+            tuple(options[name] for name in SIGNATURE_OPTIONS))
+
+
+def _describe(spec):
+    key = spec["key"].items() if isinstance(spec["key"], dict) else spec["key"]
+    options = {name: spec[name] for name in SIGNATURE_OPTIONS if spec.get(name) not in (None, False)}
+    return f"{list(key)} {options}" if options else f"{list(key)}"
+
+
+def ensure_indexes(db):
+    """선언된 인덱스를 생성하고 기존 인덱스와의 차이를 보고 (연결 오류는 호출자에게 전달)"""
+    report = {"created": [], "drift": [], "extra": [], "errors": []}
+
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        try:
+            existing = collection.index_information()
+        except OperationFailure as e:
+            report["errors"].append(f"{collection_name}: {e}")
+            continue
+
+        declared_names = set()
+        missing = []
+        for model in models:
+            spec = model.document
+            name = spec["name"]
+            declared_names.add(name)
+            wanted = _index_signature(spec)
+
+            current = existing.get(name)
+            if current is None:
+                missing.append(model)
+            elif _index_signature(current) != wanted:
+                report["drift"].append(f"{collection_name}.{name}: 선언={_describe(spec)} 실제={_describe(current)}")
+
+        for model in missing:
+            name = model.document["name"]
+            try:
+                collection.create_indexes([model])
+                report["created"].append(f"{collection_name}.{name}")
+            except OperationFailure as e:
+                report["errors"].append(f"{collection_name}.{name}: {e}")
+
+        for name in existing:
+            if name != "_id_" and name not in declared_names:
+                report["extra"].append(f"{collection_name}.{name}")
+
+    for item in report["created"]:
+        logging.info(f"인덱스 생성: {item}")
+    for item in report["drift"]:
+        logging.warning(f"인덱스 불일치: {item}")
+    for item in report["errors"]:
+        logging.warning(f"인덱스 생성 실패: {item}")
+    return report
+
+
+def _find_stages(plan):
+    # 실행계획 트리(inputStage/inputStages/queryPlan 등)를 순회하며 stage 이름 수집
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_find_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_find_stages(item))
+    return stages
+
+
+def explain_query_shapes(db):
+    """각 라우트 쿼리의 winning plan 을 검사해 COLLSCAN 여부를 반환"""
+    results = []
+    for shape in QUERY_SHAPES:
+        cursor = db[shape["collection"]].find(shape["filter"])
+        if shape.get("sort"):
+            cursor = cursor.sort(shape["sort"])
+        plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+        stages = _find_stages(plan)
+        results.append({
+            "route": shape["route"],
+            "collection": shape["collection"],
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+        })
+    return results
@@ -0,0 +1,53 @@
+from flask import current_app
+from db import mongo_db
+from services.cache import TTLCache
+from services.names import resolve
+
+# ========== 🗂 이슈 메인화면 (family × status 별 최신 N건) ==========
+# family/status 조합마다 find 를 보내는 대신 한 번의 aggregate 로 모두 가져온다.
+# $facet 의 하위 파이프라인은 인덱스를 쓰지 못해 issues 전체를 읽게 되므로,
+# 조합별 파이프라인을 $unionWith 로 이어 붙여 각각 family_status_created_id 인덱스를 타게 한다.
+
+overview_cache = TTLCache(maxsize=8, ttl=30)
+
+OVERVIEW_PROJECTION = {"title": 1, "project_family": 1, "status": 1, "reported_by": 1}
+
+
+def _bucket_pipeline(family, status, limit):
+    return [
+        {"$match": {"project_family": family, "status": status}},
+        {"$sort": {"created_at": -1, "_id": -1}},
+        {"$limit": limit},
+        {"$project": OVERVIEW_PROJECTION},
+    ]
+
+
+def _load_overview(families, statuses, limit):
+    buckets = [_bucket_pipeline(f, s, limit) for f in families for s in statuses]
+    pipeline = buckets[0] + [{"$unionWith": {"coll": "issues", "pipeline": b}} for b in buckets[1:]]
+
+    docs = list(mongo_db["issues"].aggregate(pipeline))
+    # 최대 family × status × limit 건의 작성자 이름만 조회
+    names = resolve(d["reported_by"] for d in docs if d.get("reported_by"))
+
+    overview = {f: {s: [] for s in statuses} for f in families}
+    for doc in docs:
+        overview[doc["project_family"]][doc["status"]].append({
+            "title": doc.get("title", "제목없음"),
+            "mongo_id": str(doc["_id"]),
+            "family_name": doc["project_family"],
+            "reporter_name": names.get(doc.get("reported_by"), "알 수 없는 사용자"),
+        })
+    return overview
+
+
+def get_issue_overview(families, statuses, limit=3):
+    """{family: {status: [이슈, ...]}} 반환. ISSUE_OVERVIEW_CACHE_TTL(초) 동안 캐시"""
+    key = (tuple(families), tuple(statuses), limit)
+    ttl = current_app.config.get("ISSUE_OVERVIEW_CACHE_TTL", overview_cache.ttl)
+    return overview_cache.get_or_set(key, lambda: _load_overview(families, statuses, limit), ttl=ttl)
+
+
+def invalidate_issue_overview():
+    # 이슈 작성/수정/삭제/상태변경 시 호출 (다른 워커 프로세스는 TTL 이 지나면 갱신됨)
+    overview_cache.clear()
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from flask import current_app
+from db import mongo_db
+from services.cache import TTLCache
+from services.counters import counters_ready, read_counters
+
+# ========== 📊 이슈 통계 ==========
+# 통계 페이지와 JSON API 가 같은 함수/캐시를 사용한다.
+# 고객사 조건이 없으면 services/counters.py 의 카운터 문서를 읽고,
+# 고객사 조건이 있거나 카운터가 아직 만들어지지 않았으면 $group 한 번으로 계산한다.
+
+stats_cache = TTLCache(maxsize=64, ttl=60)
+
+
+def _count_from_counters(families, since, until):
+    # 기간이 없으면 family × status 카운터, 있으면 일별 카운터를 더한다 (issues 를 읽지 않음)
+    docs = read_counters("issue_day", since, until) if since or until else read_counters("issue_status")
+    counts = {f: {} for f in families}
+    for doc in docs:
+        if doc.get("family") in counts:
+            status_counts = counts[doc["family"]]
+            status_counts[doc.get("status")] = status_counts.get(doc.get("status"), 0) + doc.get("value", 0)
+    return counts
+
+
+def _count_from_issues(families, since, until, client_id):
+    match = {"project_family": {"$in": list(families)}}
+    if since or until:
+        match["created_at"] = {}
+        if since:
+            match["created_at"]["$gte"] = since
+        if until:
+            # until 은 그날 하루를 포함
+            match["created_at"]["$lt"] = until + timedelta(days=1)
+    if client_id:
+        match["client_company_id"] = client_id
+
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": {"family": "$project_family", "status": "$status"}, "count": {"$sum": 1}}},
+    ]
+    counts = {f: {} for f in families}
+    for doc in mongo_db["issues"].aggregate(pipeline):
+        counts[doc["_id"]["family"]][doc["_id"].get("status")] = doc["count"]
+    return counts
+
+
+def _load_stats(families, statuses, since, until, client_id):
+    if not client_id and counters_ready("issue_day" if since or until else "issue_status"):
+        counts = _count_from_counters(families, since, until)
+    else:
+        counts = _count_from_issues(families, since, until, client_id)
+
+    all_family_stats = {}
+    for family_name in families:
+        status_data = counts[family_name]
+        all_family_stats[family_name] = {
+            "chart_data": [{"label": s, "value": status_data.get(s, 0)} for s in statuses],
+            # 목록에 없는 상태값도 합계에는 포함
+            "total_issues": sum(status_data.values()),
+        }
+    return {
+        "all_family_stats": all_family_stats,
+        "overall_total_issues": sum(f["total_issues"] for f in all_family_stats.values()),
+    }
+
+
+def get_issue_stats(families, statuses, since=None, until=None, client_id=None):
+    """family 별 상태 건수/합계. since/until(날짜), client_id 로 범위를 좁힐 수 있다
+
+    ISSUE_STATS_CACHE_TTL(초, 기본 60) 동안 조건별로 캐시한다.
+    """
+    key = (tuple(families), tuple(statuses), since, until, client_id)
+    ttl = current_app.config.get("ISSUE_STATS_CACHE_TTL", stats_cache.ttl)
+    return stats_cache.get_or_set(key, lambda: _load_stats(families, statuses, since, until, client_id), ttl=ttl)
+
+
+def invalidate_issue_stats():
+    stats_cache.clear()
@@ -0,0 +1,56 @@
+from datetime import datetime
+from bson.objectid import ObjectId
+
+# ========== ↕️ keyset 페이지네이션 ==========
+# (created_at, _id) 역순 목록을 skip 없이 기준점(cursor) 다음/이전으로 읽는다. (이슈 목록, 게시판)
+#   1. keyset_query() 로 조건과 정렬 방향을 만들고
+#   2. 그 방향으로 정렬해 page_size + 1 건을 읽은 뒤
+#   3. keyset_page() 로 한 페이지와 이전/다음 cursor 를 얻는다.
+
+
+def encode_cursor(doc):
+    # (created_at, _id) 를 문자열로 묶어 다음/이전 페이지 기준점으로 사용
+    return f"{doc['created_at'].isoformat()}_{doc['_id']}"
+
+
+def decode_cursor(value):
+    """잘못된 값이면 None (첫 페이지)"""
+    try:
+        created_at, doc_id = value.split("_", 1)
+        return datetime.fromisoformat(created_at), ObjectId(doc_id)
+    except Exception:
+        return None
+
+
+def _keyset_condition(cursor, op):
+    created_at, doc_id = cursor
+    return {"$or": [
+        {"created_at": {op: created_at}},
+        {"created_at": created_at, "_id": {op: doc_id}},
+    ]}
+
+
+def keyset_query(query, after=None, before=None):
+    """기준점 조건을 붙인 쿼리와 정렬 방향(-1 역순, 이전 페이지는 1 정순). 반환값: (query, direction)"""
+    if after:
+        query = {"$and": [query, _keyset_condition(after, "$lt")]}
+    elif before:
+        query = {"$and": [query, _keyset_condition(before, "$gt")]}
+    return query, 1 if before else -1
+
+
+def keyset_page(docs, page_size, after=None, before=None):
+    """page_size + 1 건까지 읽은 docs 를 한 페이지로. 반환값: (docs, prev_cursor, next_cursor)"""
+    has_more = len(docs) > page_size
+    docs = docs[:page_size]
+    if before:
+        docs.reverse()
+
+    # 읽어온 방향은 has_more 로 판단하고, 반대 방향은 기준점을 타고 왔으면 페이지가 있다고 본다
+    if before:
+        has_prev, has_next = has_more, True
+    else:
+        has_prev, has_next = after is not None, has_more
+    next_cursor = encode_cursor(docs[-1]) if docs and has_next else None
+    prev_cursor = encode_cursor(docs[0]) if docs and has_prev else None
+    return docs, prev_cursor, next_cursor
@@ -0,0 +1,62 @@
+from datetime import datetime
+from flask import current_app
+from db import mongo_db
+from services.cache import TTLCache
+from services.counters import counters_ready, get_counters_collection, month_period
+from services.names import resolve
+
+# ========== 🏆 게시판 활동 순위 ==========
+# 작성자별 게시글 수는 글 작성/삭제 시 counters 의 post_author 카운터로 갱신된다 (services/counters.py).
+# 순위는 카운터 몇 개만 읽고, LEADERBOARD_CACHE_TTL(초, 기본 60) 동안 기간별로 캐시한다.
+# reconcile-counters 로 post_author 카운터를 맞추기 전에는 posts 를 집계한다.
+
+LEADERBOARD_LIMIT = 5
+LEADERBOARD_PERIODS = ["all", "month"]
+
+leaderboard_cache = TTLCache(maxsize=16, ttl=60)
+
+
+def _period_key(period):
+    # "month" 는 이번 달(UTC, 게시글 created_at 과 같은 기준)
+    return month_period(datetime.utcnow()) if period == "month" else "all"
+
+
+def _top_from_counters(period_key, limit):
+    cursor = (get_counters_collection()
+              .find({"scope": "post_author", "period": period_key, "value": {"$gt": 0}}, {"author": 1, "value": 1})
+              .sort("value", -1)
+              .limit(limit))
+    return [(doc["author"], doc["value"]) for doc in cursor]
+
+
+def _top_from_posts(period_key, limit):
+    match = {"author_id": {"$nin": [None, ""]}}
+    if period_key != "all":
+        start = datetime.strptime(period_key, "%Y-%m")
+        end = datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+        match["created_at"] = {"$gte": start, "$lt": end}
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": "$author_id", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+        {"$limit": limit},
+    ]
+    return [(doc["_id"], doc["count"]) for doc in mongo_db["posts"].aggregate(pipeline)]
+
+
+def _load_leaderboard(period_key, limit):
+    top = _top_from_counters(period_key, limit) if counters_ready("post_author") else _top_from_posts(period_key, limit)
+    names = resolve(author for author, _ in top)
+    return [{"author_id": str(author), "name": names.get(author) or "알 수 없음", "count": count}
+            for author, count in top]
+
+
+def get_leaderboard(period="all", limit=LEADERBOARD_LIMIT):
+    """작성자별 게시글 수 상위 limit 명. period: "all"(전체) / "month"(이번 달)"""
+    period_key = _period_key(period)
+    ttl = current_app.config.get("LEADERBOARD_CACHE_TTL", leaderboard_cache.ttl)
+    return leaderboard_cache.get_or_set((period_key, limit), lambda: _load_leaderboard(period_key, limit), ttl=ttl)
+
+
+def invalidate_leaderboard():
+    leaderboard_cache.clear()
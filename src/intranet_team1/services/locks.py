@@ -0,0 +1,39 @@
+import os
+import socket
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+from db import mongo_db
+
+# ========== 🔒 작업 잠금 (locks 컬렉션) ==========
+# 여러 워커/서버 중 한 곳에서만 주기 작업을 돌리기 위한 잠금 문서.
+#   {_id: 작업 이름, owner: "host:pid", expires_at}
+# 잠금을 가진 프로세스는 주기마다 다시 acquire 해서 만료 시각을 늘리고,
+# 그 프로세스가 죽으면 expires_at 이 지난 뒤 다른 프로세스가 가져간다.
+
+
+def get_locks_collection():
+    return mongo_db["locks"]
+
+
+def lock_owner():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def acquire_lock(name, ttl_seconds, owner=None):
+    """잠금을 얻거나(만료됐거나 내 것이면) 연장한다. 얻었으면 True"""
+    owner = owner or lock_owner()
+    now = datetime.utcnow()
+    try:
+        get_locks_collection().find_one_and_update(
+            {"_id": name, "$or": [{"expires_at": {"$lt": now}}, {"owner": owner}]},
+            {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=ttl_seconds), "renewed_at": now}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # 다른 프로세스가 유효한 잠금을 가지고 있어 upsert 가 _id 충돌
+        return False
+    return True
+
+
+def release_lock(name, owner=None):
+    get_locks_collection().delete_one({"_id": name, "owner": owner or lock_owner()})
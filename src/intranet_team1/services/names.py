@@ -0,0 +1,86 @@
+import time
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from db import mongo_db
+from services.cache import TTLCache
+from services.counters import get_counters_collection, next_sequence
+
+# ========== 🪪 직원 id → 이름 조회 ==========
+# 여러 화면에서 작성자/신청자 이름을 찾을 때 사용하는 공용 모듈.
+# resolve(ids) 는 캐시에 없는 id 만 모아 $in 한 번으로 조회한다.
+# 직원 정보가 바뀌면 counters 의 버전 값을 올리고, 다른 워커는 VERSION_CHECK_INTERVAL 마다 버전을 확인해 캐시를 비운다.
+
+NAMES_VERSION_KEY = "hr_names_version"
+VERSION_CHECK_INTERVAL = 5  # 초
+
+name_cache = TTLCache(maxsize=4096, ttl=600)
+_NOT_FOUND = ""  # 없는 직원도 캐시해서 반복 조회를 막는다
+
+_version = {"value": None, "checked_at": 0.0}
+
+
+def _sync_version():
+    now = time.monotonic()
+    if now - _version["checked_at"] < VERSION_CHECK_INTERVAL:
+        return
+    doc = get_counters_collection().find_one({"_id": NAMES_VERSION_KEY})
+    value = doc["value"] if doc else 0
+    if value != _version["value"]:
+        name_cache.clear()
+        _version["value"] = value
+    _version["checked_at"] = now
+
+
+def _to_object_id(value):
+    if isinstance(value, ObjectId):
+        return value
+    try:
+        return ObjectId(str(value))
+    except (InvalidId, TypeError):
+        return None
+
+
+def resolve(ids):
+    """직원 id 목록을 {ObjectId: 이름} 으로 변환 (없는 직원은 결과에서 빠짐)
+
+    문자열로 저장된 옛 id 는 넘겨받은 문자열 그대로도 키로 넣어 호출자가 원래 값으로 찾을 수 있게 한다.
+    """
+    _sync_version()
+    pairs = [(value, _to_object_id(value)) for value in ids]
+    object_ids = {oid for _, oid in pairs if oid is not None}
+
+    names, missing = {}, []
+    for oid in object_ids:
+        name = name_cache.get(str(oid))
+        if name is None:
+            missing.append(oid)
+        elif name != _NOT_FOUND:
+            names[oid] = name
+
+    if missing:
+        found = {u["_id"]: u.get("name") or _NOT_FOUND
+                 for u in mongo_db.hr.find({"_id": {"$in": missing}}, {"name": 1})}
+        for oid in missing:
+            name = found.get(oid, _NOT_FOUND)
+            name_cache.set(str(oid), name)
+            if name != _NOT_FOUND:
+                names[oid] = name
+
+    for value, oid in pairs:
+        if oid in names and not isinstance(value, ObjectId):
+            names[value] = names[oid]
+    return names
+
+
+def resolve_name(user_id, default="알 수 없는 사용자"):
+    oid = _to_object_id(user_id) if user_id else None
+    if oid is None:
+        return default
+    return resolve([oid]).get(oid, default)
+
+
+def bump_names_version():
+    # 직원 등록/수정 시 호출. 이 워커는 바로, 다른 워커는 VERSION_CHECK_INTERVAL 안에 캐시를 비운다
+    _version["value"] = next_sequence(NAMES_VERSION_KEY)
+    _version["checked_at"] = time.monotonic()
+    name_cache.clear()
@@ -0,0 +1,153 @@
+import time
+from flask import current_app
+from pymongo import UpdateOne
+from db import mongo_db
+from services.cache import TTLCache
+from services.counters import get_counters_collection, next_sequence
+
+# ========== 🏢 조직 목록 (부서 / 직위 / 직책) ==========
+# 직원들의 부서/직위/직책 값과 인원수를 org_catalogue 컬렉션에 미리 모아둔다.
+#   {_id: "department|개발팀", kind: "department", value: "개발팀", total: 전체 인원, active: 재직중 인원}
+# 직원 등록/수정/퇴사 시 변경 전후를 비교해 해당 값만 $inc 하고 버전을 올린다.
+# 각 워커는 목록을 ORG_CATALOGUE_CACHE_TTL(초, 기본 300) 동안 캐시하되,
+# VERSION_CHECK_INTERVAL 마다 버전을 확인해 다른 워커에서 바뀐 내용도 반영한다. (services/names.py 와 같은 방식)
+# rebuild_org_catalogue() 를 한 번도 돌리지 않았으면 hr 를 직접 집계한다.
+
+ORG_KINDS = ["department", "position", "job_title"]
+ACTIVE_STATUS = "재직중"
+EMPLOYEE_CATALOGUE_FIELDS = {"department": 1, "position": 1, "job_title": 1, "status": 1}
+
+CATALOGUE_META_ID = "org_catalogue_meta"
+CATALOGUE_VERSION_KEY = "org_catalogue_version"
+VERSION_CHECK_INTERVAL = 5  # 초
+
+catalogue_cache = TTLCache(maxsize=8, ttl=300)
+
+_version = {"value": None, "checked_at": 0.0}
+
+
+def get_catalogue_collection():
+    return mongo_db["org_catalogue"]
+
+
+def _sync_version():
+    now = time.monotonic()
+    if now - _version["checked_at"] < VERSION_CHECK_INTERVAL:
+        return
+    doc = get_counters_collection().find_one({"_id": CATALOGUE_VERSION_KEY})
+    value = doc["value"] if doc else 0
+    if value != _version["value"]:
+        catalogue_cache.clear()
+        _version["value"] = value
+    _version["checked_at"] = now
+
+
+def _normalize(value):
+    return value.strip() if isinstance(value, str) else ""
+
+
+def _entry_keys(employee):
+    if not employee:
+        return []
+    active = employee.get("status") == ACTIVE_STATUS
+    return [(kind, _normalize(employee.get(kind)), active) for kind in ORG_KINDS]
+
+
+def record_employee_change(before, after):
+    """직원 등록(before=None)/수정/퇴사 후 호출. 바뀐 부서/직위/직책 인원수만 갱신"""
+    deltas = {}
+    for sign, entries in ((-1, _entry_keys(before)), (1, _entry_keys(after))):
+        for kind, value, active in entries:
+            total, active_count = deltas.get((kind, value), (0, 0))
+            deltas[(kind, value)] = (total + sign, active_count + (sign if active else 0))
+
+    ops = [
+        UpdateOne({"_id": f"{kind}|{value}"},
+                  {"$inc": {"total": total, "active": active}, "$setOnInsert": {"kind": kind, "value": value}},
+                  upsert=True)
+        for (kind, value), (total, active) in deltas.items() if total or active
+    ]
+    if ops:
+        get_catalogue_collection().bulk_write(ops, ordered=False)
+        invalidate_org_catalogue()
+
+
+def invalidate_org_catalogue():
+    """모든 워커의 목록 캐시를 비운다 (버전 증가)"""
+    next_sequence(CATALOGUE_VERSION_KEY)
+    catalogue_cache.clear()
+
+
+def _aggregate_entries():
+    # hr 에서 직접 계산 (rebuild / 카탈로그가 준비되기 전)
+    entries = []
+    for kind in ORG_KINDS:
+        pipeline = [{"$group": {
+            "_id": f"${kind}",
+            "total": {"$sum": 1},
+            "active": {"$sum": {"$cond": [{"$eq": ["$status", ACTIVE_STATUS]}, 1, 0]}},
+        }}]
+        merged = {}
+        for doc in mongo_db["hr"].aggregate(pipeline):
+            # 앞뒤 공백만 다른 값은 하나로 합친다
+            value = _normalize(doc["_id"])
+            total, active = merged.get(value, (0, 0))
+            merged[value] = (total + doc["total"], active + doc["active"])
+        entries += [{"kind": kind, "value": value, "total": total, "active": active}
+                    for value, (total, active) in merged.items()]
+    return entries
+
+
+def rebuild_org_catalogue():
+    """org_catalogue 를 hr 로 다시 만든다. 항목 수 반환"""
+    entries = _aggregate_entries()
+    ids = [f"{e['kind']}|{e['value']}" for e in entries]
+    ops = [UpdateOne({"_id": _id}, {"$set": entry}, upsert=True) for _id, entry in zip(ids, entries)]
+    if ops:
+        get_catalogue_collection().bulk_write(ops, ordered=False)
+    get_catalogue_collection().delete_many({"_id": {"$nin": ids + [CATALOGUE_META_ID]}})
+    get_catalogue_collection().update_one({"_id": CATALOGUE_META_ID}, {"$set": {"ready": True}}, upsert=True)
+    invalidate_org_catalogue()
+    return len(entries)
+
+
+def _load_entries():
+    if get_catalogue_collection().find_one({"_id": CATALOGUE_META_ID}, {"_id": 1}) is None:
+        return _aggregate_entries()
+    return list(get_catalogue_collection().find({"kind": {"$in": ORG_KINDS}}, {"_id": 0}))
+
+
+def get_catalogue():
+    """{kind: [{"value", "total", "active"}, ...]} (인원 0 인 값 제외, 이름순)"""
+    _sync_version()
+    ttl = current_app.config.get("ORG_CATALOGUE_CACHE_TTL", catalogue_cache.ttl)
+    entries = catalogue_cache.get_or_set("entries", _load_entries, ttl=ttl)
+    catalogue = {kind: [] for kind in ORG_KINDS}
+    for entry in sorted(entries, key=lambda e: e["value"]):
+        if entry.get("total", 0) > 0:
+            catalogue[entry["kind"]].append(entry)
+    return catalogue
+
+
+def get_values(kind):
+    """폼 선택 목록용 값 (빈 값 제외)"""
+    return [entry["value"] for entry in get_catalogue()[kind] if entry["value"]]
+
+
+def get_departments():
+    return get_values("department")
+
+
+def get_positions():
+    return get_values("position")
+
+
+def get_job_titles():
+    return get_values("job_title")
+
+
+def get_active_counts(kind):
+    """재직중 인원수 차트용 [{"_id": 값 (없으면 None), "count"}] 인원 많은 순"""
+    result = [{"_id": entry["value"] or None, "count": entry["active"]}
+              for entry in get_catalogue()[kind] if entry.get("active", 0) > 0]
+    return sorted(result, key=lambda d: (d["count"], d["_id"] or ""), reverse=True)
@@ -0,0 +1,112 @@
+from db import mongo_db
+
+# ========== 💬 게시글 댓글 (bucket 저장) ==========
+# 댓글을 posts 문서의 comments 배열에 계속 쌓으면 인기글 문서가 끝없이 커지고
+# 글을 읽을 때마다 모든 댓글을 함께 읽게 된다.
+# 댓글은 post_comments 컬렉션에 글별로 최대 BUCKET_SIZE 개씩 묶어 저장하고 (bucket 하나 = 댓글 한 페이지),
+# 글에는 댓글 수(comment_count)만 둔다.
+#   bucket: {post_id, comments: [...], count: 현재 댓글 수, pushed: 지금까지 넣은 수}
+#   pushed 가 BUCKET_SIZE 에 도달한 bucket 은 닫히고 다음 댓글은 새 bucket 에 들어간다 (삭제로 빈자리가 생겨도 순서 유지)
+# 예전처럼 comments 배열을 가진 글은 댓글을 읽거나 쓸 때 그 글만 먼저 옮긴다 (migrate-post-comments 로 한 번에 옮길 수도 있음)
+
+BUCKET_SIZE = 50
+
+# 글 목록/검색의 댓글 수. 아직 옮기지 않은 글은 comments 배열 길이를 더한다 (옮긴 뒤에는 comment_count 만 남음)
+COMMENT_COUNT_EXPR = {"$add": [{"$ifNull": ["$comment_count", 0]}, {"$size": {"$ifNull": ["$comments", []]}}]}
+
+
+def get_comments_collection():
+    return mongo_db["post_comments"]
+
+
+def get_posts_collection():
+    return mongo_db["posts"]
+
+
+def add_comment(post_id, comment):
+    """열려 있는 bucket 에 댓글을 추가하고 글의 댓글 수를 올린다 (없으면 새 bucket)"""
+    migrate_post_comments(post_id)
+    get_comments_collection().update_one(
+        {"post_id": post_id, "pushed": {"$lt": BUCKET_SIZE}},
+        {"$push": {"comments": comment}, "$inc": {"count": 1, "pushed": 1}},
+        upsert=True,
+    )
+    get_posts_collection().update_one({"_id": post_id}, {"$inc": {"comment_count": 1}})
+
+
+def find_comment(post_id, comment_id):
+    migrate_post_comments(post_id)
+    bucket = get_comments_collection().find_one(
+        {"post_id": post_id, "comments.comment_id": comment_id},
+        {"comments": {"$elemMatch": {"comment_id": comment_id}}})
+    return bucket["comments"][0] if bucket else None
+
+
+def delete_comment(post_id, comment_id):
+    """댓글을 지우고 글의 댓글 수를 내린다. 지웠으면 True"""
+    migrate_post_comments(post_id)
+    result = get_comments_collection().update_one(
+        {"post_id": post_id, "comments.comment_id": comment_id},
+        {"$pull": {"comments": {"comment_id": comment_id}}, "$inc": {"count": -1}},
+    )
+    if not result.modified_count:
+        return False
+    get_posts_collection().update_one({"_id": post_id}, {"$inc": {"comment_count": -1}})
+    # 닫힌 bucket 이 비면 정리
+    get_comments_collection().delete_many({"post_id": post_id, "count": {"$lte": 0},
+                                           "pushed": {"$gte": BUCKET_SIZE}})
+    return True
+
+
+def remove_post_comments(post_id):
+    get_comments_collection().delete_many({"post_id": post_id})
+
+
+def comments_page(post_id, page=1):
+    """page 번째 bucket 의 댓글 (작성순). 반환값: {"comments": [...], "has_next": bool}"""
+    buckets = list(get_comments_collection()
+                   .find({"post_id": post_id, "count": {"$gt": 0}}, {"comments": 1})
+                   .sort("_id", 1)
+                   .skip(page - 1)
+                   .limit(2))
+    if not buckets:
+        return {"comments": [], "has_next": False}
+    return {"comments": buckets[0]["comments"], "has_next": len(buckets) > 1}
+
+
+def _migrate_post(post):
+    comments = sorted(post.get("comments") or [], key=lambda c: c["created_at"])
+    for i in range(0, len(comments), BUCKET_SIZE):
+        chunk = comments[i:i + BUCKET_SIZE]
+        # 옮긴 bucket 은 닫아두고 새 댓글은 새 bucket 으로
+        get_comments_collection().replace_one(
+            {"_id": chunk[0]["comment_id"]},
+            {"post_id": post["_id"], "comments": chunk, "count": len(chunk), "pushed": BUCKET_SIZE},
+            upsert=True,
+        )
+    # 배포 이후 새 bucket 에 달린 댓글은 이미 comment_count 에 들어 있으므로 옮긴 수만 더한다.
+    # comments 가 남아 있는 경우에만 갱신하므로 동시에 옮겨도 한 번만 더해진다
+    get_posts_collection().update_one({"_id": post["_id"], "comments": {"$exists": True}},
+                                      {"$inc": {"comment_count": len(comments)}, "$unset": {"comments": ""}})
+    return len(comments)
+
+
+def migrate_post_comments(post_id):
+    """아직 comments 배열이 남은 글이면 bucket 으로 옮긴다 (댓글을 읽거나 쓰기 전에 호출)"""
+    post = get_posts_collection().find_one({"_id": post_id, "comments": {"$exists": True}}, {"comments": 1})
+    if post:
+        _migrate_post(post)
+
+
+def migrate_embedded_comments(batch_size=200):
+    """posts.comments 배열을 post_comments bucket 으로 옮기고 comment_count 를 채운다
+
+    bucket _id 는 첫 댓글의 comment_id 를 쓰므로 중간에 멈춘 뒤 다시 실행해도 중복되지 않는다.
+    반환값: (옮긴 글 수, 옮긴 댓글 수)
+    """
+    posts_moved = comments_moved = 0
+    cursor = get_posts_collection().find({"comments": {"$exists": True}}, {"comments": 1})
+    for post in cursor.batch_size(batch_size):
+        comments_moved += _migrate_post(post)
+        posts_moved += 1
+    return posts_moved, comments_moved
@@ -0,0 +1,197 @@
+import re
+import unicodedata
+from markupsafe import Markup, escape
+from pymongo import UpdateOne
+from db import mongo_db
+from services.post_comments import COMMENT_COUNT_EXPR
+
+# ========== 🔎 게시판 검색 (bigram 역색인) ==========
+# MongoDB 기본 text 인덱스는 한글을 형태소로 나누지 못해 "개발팀" 으로 "발팀" 을 찾지 못한다.
+# 제목/본문을 단어별 2글자 조각(bigram)으로 나눠 post_search 컬렉션에 저장하고,
+# 검색어의 bigram 을 모두 포함하는 글을 grams 멀티키 인덱스로 찾은 뒤 제목 일치 수로 순위를 매긴다.
+# bigram 이 모두 있어도 실제로 이어져 있지 않을 수 있으므로("가나" + "나다" ≠ "가나다") 후보는 원문으로 다시 확인한다.
+# 확인은 순위순 후보를 조금씩(VERIFY_BATCH_FACTOR 페이지분) 읽어 가며 한 페이지가 찰 때까지만 한다.
+# rebuild_post_search() 를 한 번도 돌리지 않았으면 색인이 비어 있으므로 호출자는 기존 $regex 검색을 쓴다 (search_ready).
+
+SEARCH_PAGE_SIZE = 20
+SNIPPET_RADIUS = 40
+SEARCH_META_ID = "post_search_meta"
+VERIFY_BATCH_FACTOR = 2
+# 원문 확인과 화면 표시에 쓰는 게시글 필드
+SEARCH_POST_PROJECTION = {"title": 1, "content": 1, "category": 1, "author_id": 1, "comment_count": COMMENT_COUNT_EXPR}
+
+_ready = {"value": False}
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def get_post_search_collection():
+    return mongo_db["post_search"]
+
+
+def _normalize(text):
+    return unicodedata.normalize("NFC", text or "").lower()
+
+
+def _words(text):
+    return _WORD_RE.findall(_normalize(text))
+
+
+def tokenize(text):
+    """bigram 집합. 한 글자 단어는 그대로 사용"""
+    grams = set()
+    for word in _words(text):
+        if len(word) == 1:
+            grams.add(word)
+        else:
+            grams.update(word[i:i + 2] for i in range(len(word) - 1))
+    return grams
+
+
+def search_ready():
+    """rebuild_post_search() 가 끝났으면 True (한 번 준비되면 다시 확인하지 않는다)"""
+    if not _ready["value"]:
+        _ready["value"] = get_post_search_collection().find_one({"_id": SEARCH_META_ID}, {"_id": 1}) is not None
+    return _ready["value"]
+
+
+def is_searchable(query):
+    # 한 글자 검색어만 있으면 bigram 으로 찾을 수 없으므로 호출자가 기존 방식으로 검색한다
+    return any(len(word) > 1 for word in _words(query))
+
+
+def _search_doc(post):
+    title_grams = tokenize(post.get("title"))
+    return {
+        "title_grams": sorted(title_grams),
+        "grams": sorted(title_grams | tokenize(post.get("content"))),
+        "category": post.get("category"),
+        "created_at": post.get("created_at"),
+    }
+
+
+def index_post(post):
+    """게시글 작성/수정 후 호출 (post 는 title, content, category, created_at 을 포함)"""
+    get_post_search_collection().replace_one({"_id": post["_id"]}, _search_doc(post), upsert=True)
+
+
+def remove_post(post_id):
+    get_post_search_collection().delete_one({"_id": post_id})
+
+
+def rebuild_post_search(batch_size=1000):
+    """모든 게시글의 검색 색인을 다시 만든다. 색인한 글 수 반환"""
+    count, ops = 0, []
+    cursor = mongo_db["posts"].find({}, {"title": 1, "content": 1, "category": 1, "created_at": 1})
+    for post in cursor.batch_size(batch_size):
+        ops.append(UpdateOne({"_id": post["_id"]}, {"$set": _search_doc(post)}, upsert=True))
+        count += 1
+        if len(ops) >= batch_size:
+            get_post_search_collection().bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        get_post_search_collection().bulk_write(ops, ordered=False)
+    get_post_search_collection().update_one({"_id": SEARCH_META_ID}, {"$set": {"ready": True}}, upsert=True)
+    return count
+
+
+def _highlight(text, terms, radius=None):
+    # 검색어를 <mark> 로 감싼다. radius 가 있으면 첫 번째 일치 위치 주변만 잘라낸다
+    if not text:
+        return Markup("")
+    text = unicodedata.normalize("NFC", text)
+    pattern = re.compile("|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    start, end = 0, len(text)
+    if radius:
+        first = pattern.search(text)
+        start = max(0, first.start() - radius) if first else 0
+        end = min(len(text), (first.end() if first else 0) + radius * 2)
+    window = text[start:end]
+
+    parts, last = [], 0
+    for m in pattern.finditer(window):
+        parts.append(escape(window[last:m.start()]))
+        parts.append(Markup("<mark>") + escape(m.group()) + Markup("</mark>"))
+        last = m.end()
+    parts.append(escape(window[last:]))
+    snippet = Markup("").join(parts)
+    if start > 0:
+        snippet = Markup("…") + snippet
+    if end < len(text):
+        snippet = snippet + Markup("…")
+    return snippet
+
+
+def _contains_terms(post, terms):
+    text = _normalize(post.get("title")) + "\n" + _normalize(post.get("content"))
+    return all(term in text for term in terms)
+
+
+def _verified_posts(candidates, terms, batch_size):
+    # 순위순 후보를 batch_size 개씩 원문과 함께 읽어 검색어가 실제로 들어 있는 글만 순서대로 내보낸다
+    batch = []
+    for candidate in candidates:
+        batch.append(candidate)
+        if len(batch) < batch_size:
+            continue
+        yield from _verify_batch(batch, terms)
+        batch = []
+    if batch:
+        yield from _verify_batch(batch, terms)
+
+
+def _verify_batch(batch, terms):
+    ids = [candidate["_id"] for candidate in batch]
+    posts = {post["_id"]: post for post in mongo_db["posts"].aggregate([
+        {"$match": {"_id": {"$in": ids}}},
+        {"$project": SEARCH_POST_PROJECTION},
+    ])}
+    for candidate in batch:
+        post = posts.get(candidate["_id"])
+        if post and _contains_terms(post, terms):
+            yield {**post, "score": candidate["score"], "created_at": candidate["created_at"]}
+
+
+def search_posts(query, category=None, page=1, page_size=SEARCH_PAGE_SIZE):
+    """검색어의 단어를 모두 포함하는 글을 순위순으로 반환 (bigram 색인으로 후보를 찾고 원문으로 확인)
+
+    반환값: {"posts": [...], "has_next": bool}. 각 글에는 title_html / snippet(강조 표시) 이 붙는다.
+    """
+    grams = sorted(tokenize(query))
+    if not grams:
+        return {"posts": [], "has_next": False}
+
+    terms = set(_words(query))
+    match = {"grams": {"$all": grams}}
+    if category:
+        match["category"] = category
+    pipeline = [
+        {"$match": match},
+        # 제목에 검색어 조각이 많을수록 위로, 같으면 최신순
+        {"$project": {"created_at": 1,
+                      "score": {"$size": {"$filter": {"input": "$title_grams",
+                                                      "cond": {"$in": ["$$this", grams]}}}}}},
+        {"$sort": {"score": -1, "created_at": -1, "_id": -1}},
+    ]
+    batch_size = (page_size + 1) * VERIFY_BATCH_FACTOR
+    candidates = get_post_search_collection().aggregate(pipeline, batchSize=batch_size)
+
+    # 앞 페이지의 글도 원문으로 확인해야 페이지 경계가 어긋나지 않는다
+    skip, posts = (page - 1) * page_size, []
+    try:
+        for post in _verified_posts(candidates, terms, batch_size):
+            if skip:
+                skip -= 1
+                continue
+            posts.append(post)
+            if len(posts) > page_size:
+                break
+    finally:
+        candidates.close()
+    has_next = len(posts) > page_size
+    posts = posts[:page_size]
+
+    for post in posts:
+        post["title_html"] = _highlight(post.get("title"), terms)
+        post["snippet"] = _highlight(post.pop("content", ""), terms, radius=SNIPPET_RADIUS)
+    return {"posts": posts, "has_next": has_next}
@@ -0,0 +1,150 @@
+import logging
+import threading
+import time
+from collections import Counter, deque
+import bson
+from flask import g, has_request_context, request
+from pymongo import monitoring
+
+# 드라이버 내부 명령(핸드셰이크, 세션 정리 등)은 집계하지 않는다
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart",
+                    "saslContinue", "killCursors", "buildInfo", "getLastError"}
+
+_recent = deque(maxlen=50)
+_recent_lock = threading.Lock()
+
+
+def _shape(value):
+    # 쿼리 값은 지우고 구조(필드/연산자)만 남겨 같은 형태의 쿼리를 묶는다
+    if isinstance(value, dict):
+        return {k: _shape(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_shape(value[0])] if value else []
+    return "?"
+
+
+def _command_shape(name, command):
+    collection = command.get(name)
+    if name == "find":
+        detail = {"filter": _shape(command.get("filter", {})), "sort": list(command.get("sort", {}) or {})}
+    elif name == "aggregate":
+        detail = {"pipeline": [_shape(stage) for stage in command.get("pipeline", [])]}
+    elif name in ("count", "distinct"):
+        detail = {"query": _shape(command.get("query", {})), "key": command.get("key")}
+    elif name in ("update", "delete"):
+        key = "updates" if name == "update" else "deletes"
+        detail = {"q": [_shape(op.get("q", {})) for op in command.get(key, [])]}
+    else:
+        detail = {}
+    return f"{name} {collection} {detail}"
+
+
+def _returned_docs(reply):
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+    if "values" in reply:
+        return len(reply["values"])
+    return reply.get("n", 0)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.pending = {}
+        self.commands = []
+
+    def summary(self, n1_threshold):
+        shapes = Counter(c["shape"] for c in self.commands)
+        return {
+            "command_count": len(self.commands),
+            "total_ms": round(sum(c["ms"] for c in self.commands), 3),
+            "docs_returned": sum(c["docs"] for c in self.commands),
+            "reply_bytes": sum(c["bytes"] for c in self.commands),
+            "request_ms": round((time.perf_counter() - self.started_at) * 1000, 3),
+            "repeated_shapes": [{"shape": s, "count": n} for s, n in shapes.items() if n >= n1_threshold],
+            "commands": self.commands,
+        }
+
+
+class QueryProfiler(monitoring.CommandListener):
+    """요청 컨텍스트(g.mongo_profile)가 있을 때만 명령별 소요시간/반환 문서/바이트를 기록"""
+
+    def _profile(self):
+        if not has_request_context():
+            return None
+        return g.get("mongo_profile")
+
+    def started(self, event):
+        profile = self._profile()
+        if profile is None or event.command_name in IGNORED_COMMANDS:
+            return
+        profile.pending[event.request_id] = (event.command_name,
+                                             _command_shape(event.command_name, event.command))
+
+    def succeeded(self, event):
+        profile = self._profile()
+        if profile is None:
+            return
+        started = profile.pending.pop(event.request_id, None)
+        if started is None:
+            return
+        name, shape = started
+        profile.commands.append({
+            "command": name,
+            "shape": shape,
+            "ms": event.duration_micros / 1000,
+            "docs": _returned_docs(event.reply),
+            "bytes": len(bson.encode(event.reply)),
+        })
+
+    def failed(self, event):
+        profile = self._profile()
+        if profile is None:
+            return
+        started = profile.pending.pop(event.request_id, None)
+        if started is None:
+            return
+        name, shape = started
+        profile.commands.append({"command": name, "shape": shape, "ms": event.duration_micros / 1000,
+                                 "docs": 0, "bytes": 0, "failed": True})
+
+
+query_profiler = QueryProfiler()
+
+
+def get_recent_profiles():
+    with _recent_lock:
+        return list(_recent)
+
+
+def init_profiler(app):
+    """MONGO_PROFILER_ENABLED 일 때 요청마다 쿼리를 기록하고 Server-Timing 헤더로 요약"""
+    app.config.setdefault("MONGO_PROFILER_ENABLED", app.debug)
+    app.config.setdefault("MONGO_PROFILER_N1_THRESHOLD", 3)
+    if not app.config["MONGO_PROFILER_ENABLED"]:
+        return
+
+    @app.before_request
+    def start_profile():
+        g.mongo_profile = RequestProfile()
+
+    @app.after_request
+    def finish_profile(response):
+        profile = g.pop("mongo_profile", None)
+        if profile is None:
+            return response
+
+        summary = profile.summary(app.config["MONGO_PROFILER_N1_THRESHOLD"])
+        summary["endpoint"] = request.endpoint
+        summary["path"] = request.full_path
+        with _recent_lock:
+            _recent.append(summary)
+
+        timing = f'mongo;dur={summary["total_ms"]};desc="{summary["command_count"]} cmds, {summary["docs_returned"]} docs"'
+        if summary["repeated_shapes"]:
+            timing += f', mongo-n1;desc="{len(summary["repeated_shapes"])} repeated shapes"'
+            for item in summary["repeated_shapes"]:
+                logging.warning(f"N+1 의심 쿼리 ({request.endpoint}) x{item['count']}: {item['shape']}")
+        response.headers.add("Server-Timing", timing)
+        return response
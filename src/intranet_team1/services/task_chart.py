@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from db import mongo_db
+from services.cache import TTLCache
+from services.counters import counters_ready, read_counters
+
+# ========== 📅 마감일 기준 업무 차트 ==========
+# from ~ to 기간의 업무를 마감일 기준 day/week(월요일 시작)/month 단위로 묶어 상태별 건수를 센다.
+# 카운터(task_day, services/counters.py)가 준비돼 있으면 기간 안의 일별 카운터만 읽어 묶고,
+# 아니면 due_date 인덱스 범위 조회 + $dateTrunc 로 집계한다. 결과는 조건별로 TASK_CHART_CACHE_TTL(초, 기본 60) 캐시.
+
+GRANULARITIES = ["day", "week", "month"]
+DEFAULT_PAST_DAYS = 90
+DEFAULT_FUTURE_DAYS = 30
+# 단위별 최대 조회 기간 (일) - 막대 수가 너무 많아지지 않도록
+MAX_RANGE_DAYS = {"day": 366, "week": 366 * 3, "month": 366 * 10}
+
+chart_cache = TTLCache(maxsize=64, ttl=60)
+
+
+def default_range(today=None):
+    today = today or datetime.today()
+    today = datetime(today.year, today.month, today.day)
+    return today - timedelta(days=DEFAULT_PAST_DAYS), today + timedelta(days=DEFAULT_FUTURE_DAYS)
+
+
+def _bucket(day, granularity):
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _label(bucket, granularity):
+    return bucket.strftime("%Y-%m" if granularity == "month" else "%Y-%m-%d")
+
+
+def _count_from_counters(date_from, date_to, granularity):
+    counts = {}
+    for doc in read_counters("task_day", date_from, date_to):
+        if not doc.get("value"):
+            continue
+        key = (_bucket(doc["day"], granularity), doc.get("status"))
+        counts[key] = counts.get(key, 0) + doc["value"]
+    return counts
+
+
+def _count_from_tasks(date_from, date_to, granularity):
+    trunc = {"date": "$due_date", "unit": granularity}
+    if granularity == "week":
+        trunc["startOfWeek"] = "monday"
+    pipeline = [
+        # to 는 그날 하루를 포함
+        {"$match": {"due_date": {"$gte": date_from, "$lt": date_to + timedelta(days=1)}}},
+        {"$group": {"_id": {"bucket": {"$dateTrunc": trunc}, "status": "$status"}, "count": {"$sum": 1}}},
+    ]
+    return {(doc["_id"]["bucket"], doc["_id"].get("status")): doc["count"]
+            for doc in mongo_db["tasks"].aggregate(pipeline)}
+
+
+def _load_chart(date_from, date_to, granularity):
+    if counters_ready("task_day"):
+        counts = _count_from_counters(date_from, date_to, granularity)
+    else:
+        counts = _count_from_tasks(date_from, date_to, granularity)
+
+    data = {}
+    for (bucket, status), count in sorted(counts.items(), key=lambda item: item[0][0]):
+        data.setdefault(_label(bucket, granularity), {})[str(status)] = count
+    return data
+
+
+def get_task_chart(date_from, date_to, granularity="day"):
+    """{구간 라벨: {상태: 건수}}. 마감일이 없는 업무는 포함하지 않는다"""
+    key = (date_from, date_to, granularity)
+    ttl = current_app.config.get("TASK_CHART_CACHE_TTL", chart_cache.ttl)
+    return chart_cache.get_or_set(key, lambda: _load_chart(date_from, date_to, granularity), ttl=ttl)
+
+
+def invalidate_task_chart():
+    chart_cache.clear()
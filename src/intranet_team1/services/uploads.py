@@ -0,0 +1,195 @@
+import hashlib
+import logging
+import threading
+import time
+from flask import Request, current_app, request
+from werkzeug.exceptions import RequestEntityTooLarge
+from extension import get_fs
+from services.file_refs import deduplicate
+
+_stats_lock = threading.Lock()
+_stats = {"uploads": 0, "bytes": 0, "seconds": 0.0, "max_mb_per_s": 0.0, "rejected": 0,
+          "dedup_hits": 0, "dedup_bytes": 0}
+
+
+def _record_upload(size, seconds):
+    with _stats_lock:
+        _stats["uploads"] += 1
+        _stats["bytes"] += size
+        _stats["seconds"] += seconds
+        if seconds > 0:
+            _stats["max_mb_per_s"] = max(_stats["max_mb_per_s"], size / seconds / 1024 / 1024)
+
+
+def _record_dedup(size):
+    with _stats_lock:
+        _stats["dedup_hits"] += 1
+        _stats["dedup_bytes"] += size
+
+
+def _store_deduplicated(file_id, sha256, size):
+    file_id, duplicated = deduplicate(file_id, sha256, size)
+    if duplicated:
+        _record_dedup(size)
+    return file_id
+
+
+def get_upload_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["avg_mb_per_s"] = round(stats["bytes"] / stats["seconds"] / 1024 / 1024, 3) if stats["seconds"] else 0.0
+    stats["max_mb_per_s"] = round(stats["max_mb_per_s"], 3)
+    return stats
+
+
+class GridFSUploadStream:
+    """multipart 파일 파트를 임시파일 없이 GridFS 로 바로 쓰는 스트림 (werkzeug stream_factory 용)
+
+    werkzeug 는 파트를 다 받으면 seek(0) 을 호출하므로 그때 GridFS 파일을 닫는다.
+    뷰에서 claim() 하지 않은 파일은 요청이 끝날 때 삭제된다.
+    """
+
+    def __init__(self, filename, content_type, chunk_size, max_file_size):
+        self.filename = filename
+        self.content_type = content_type
+        self.chunk_size = chunk_size
+        self.max_file_size = max_file_size
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        self.file_id = None
+        self.claimed = False
+        self._grid_in = None
+        self._reader = None
+        self._started = None
+
+    def _open(self):
+        self._started = time.perf_counter()
+        self._grid_in = get_fs().new_file(filename=self.filename, content_type=self.content_type,
+                                          chunk_size=self.chunk_size)
+
+    def write(self, data):
+        if not data:
+            return 0
+        self.size += len(data)
+        if self.max_file_size and self.size > self.max_file_size:
+            self.discard()
+            with _stats_lock:
+                _stats["rejected"] += 1
+            raise RequestEntityTooLarge(f"파일 하나의 최대 크기({self.max_file_size} bytes)를 초과했습니다.")
+        if self._grid_in is None:
+            self._open()
+        self.sha256.update(data)
+        self._grid_in.write(data)
+        return len(data)
+
+    def _finish(self):
+        if self.file_id is not None:
+            return
+        if self._grid_in is None:
+            # 0바이트 파일도 빈 GridFS 파일로 남긴다
+            self._open()
+        self._grid_in.close()
+        self.file_id = self._grid_in._id
+        _record_upload(self.size, time.perf_counter() - self._started)
+
+    def seek(self, pos, whence=0):
+        if pos == 0 and whence == 0:
+            if self._grid_in is not None:
+                self._finish()
+            self._reader = None
+        return 0
+
+    def tell(self):
+        return self._reader.tell() if self._reader else 0
+
+    def read(self, size=-1):
+        if self.file_id is None:
+            return b""
+        if self._reader is None:
+            self._reader = get_fs().get(self.file_id)
+        return self._reader.read(size)
+
+    def readline(self, size=-1):
+        if self.file_id is None:
+            return b""
+        if self._reader is None:
+            self._reader = get_fs().get(self.file_id)
+        return self._reader.readline(size)
+
+    def close(self):
+        pass
+
+    def claim(self):
+        """뷰에서 저장하기로 한 파일의 GridFS id 를 반환 (같은 내용의 파일이 있으면 그 id)"""
+        self._finish()
+        self.claimed = True
+        self.file_id = _store_deduplicated(self.file_id, self.sha256.hexdigest(), self.size)
+        self._reader = None
+        return self.file_id
+
+    def discard(self):
+        try:
+            if self.file_id is not None:
+                get_fs().delete(self.file_id)
+            elif self._grid_in is not None:
+                self._grid_in.abort()
+        except Exception as e:
+            logging.warning(f"업로드 정리 실패: {self.filename} -> {e}")
+        self.file_id = None
+        self._grid_in = None
+
+
+class UploadRequest(Request):
+    """@stream_uploads 가 붙은 뷰의 파일 파트를 GridFSUploadStream 으로 받는 Request"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        view = current_app.view_functions.get(self.endpoint)
+        if not filename or not getattr(view, "stream_uploads", False):
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
+        stream = GridFSUploadStream(filename, content_type,
+                                    chunk_size=current_app.config["GRIDFS_CHUNK_SIZE_BYTES"],
+                                    max_file_size=current_app.config["UPLOAD_MAX_FILE_BYTES"])
+        if not hasattr(self, "upload_streams"):
+            self.upload_streams = []
+        self.upload_streams.append(stream)
+        return stream
+
+
+def stream_uploads(view):
+    # 이 데코레이터가 붙은 뷰는 업로드 파일이 임시파일을 거치지 않고 GridFS 로 바로 저장된다
+    view.stream_uploads = True
+    return view
+
+
+def store_upload(file):
+    """업로드 파일을 GridFS 에 저장하고 file_id 반환 (스트리밍으로 이미 저장된 경우 그대로 사용)"""
+    if isinstance(file.stream, GridFSUploadStream):
+        return file.stream.claim()
+
+    # 스트리밍 대상이 아닌 뷰: 해시를 먼저 계산한 뒤 저장
+    sha256, size = hashlib.sha256(), 0
+    for block in iter(lambda: file.stream.read(1024 * 1024), b""):
+        sha256.update(block)
+        size += len(block)
+    file.stream.seek(0)
+    file_id = get_fs().put(file, filename=file.filename, content_type=file.content_type,
+                           chunk_size=current_app.config["GRIDFS_CHUNK_SIZE_BYTES"])
+    return _store_deduplicated(file_id, sha256.hexdigest(), size)
+
+
+def init_uploads(app):
+    app.config.setdefault("MAX_CONTENT_LENGTH", 256 * 1024 * 1024)   # 요청 전체 최대 크기
+    app.config.setdefault("UPLOAD_MAX_FILE_BYTES", 200 * 1024 * 1024)  # 파일 하나 최대 크기
+    app.config.setdefault("GRIDFS_CHUNK_SIZE_BYTES", 1024 * 1024)
+    app.request_class = UploadRequest
+
+    @app.teardown_request
+    def discard_unclaimed_uploads(exc):
+        for stream in getattr(request, "upload_streams", []):
+            if not stream.claimed:
+                stream.discard()
+
+    @app.errorhandler(RequestEntityTooLarge)
+    def upload_too_large(e):
+        return "업로드 용량이 너무 큽니다.", 413
@@ -0,0 +1,38 @@
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from db import mongo_db
+from services.cache import TTLCache
+
+# Flask-Login 의 User 객체에 필요한 필드만 조회 (비밀번호 해시 등은 제외)
+USER_PROJECTION = {"name": 1, "email": 1, "role": 1, "profile_image_id": 1, "profile_avatar_digest": 1}
+
+user_cache = TTLCache(maxsize=2048, ttl=300)
+
+
+def init_user_cache(app):
+    app.config.setdefault("USER_CACHE_MAXSIZE", 2048)
+    app.config.setdefault("USER_CACHE_TTL", 300)
+    user_cache.maxsize = app.config["USER_CACHE_MAXSIZE"]
+    user_cache.ttl = app.config["USER_CACHE_TTL"]
+    user_cache.clear()
+
+
+def load_user_record(user_id):
+    """user_id 에 해당하는 축약 사용자 정보를 캐시에서 찾고, 없으면 DB 에서 읽어 캐시"""
+    key = str(user_id)
+    record = user_cache.get(key)
+    if record is not None:
+        return record
+
+    try:
+        record = mongo_db.hr.find_one({"_id": ObjectId(key)}, USER_PROJECTION)
+    except InvalidId:
+        return None
+    if record:
+        user_cache.set(key, record)
+    return record
+
+
+def invalidate_user(user_id):
+    # 직원 정보가 바뀌면 호출 (다른 워커 프로세스는 TTL 이 지나면 갱신됨)
+    user_cache.invalidate(str(user_id))
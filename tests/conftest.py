@@ -0,0 +1,64 @@
+import os
+import sys
+
+import mongomock
+import mongomock.collection
+import mongomock.gridfs
+import pytest
+from pymongo import MongoClient
+
+# 모듈들이 src/intranet_team1 기준 import (from db import ..., from services ...) 를 쓰므로 경로에 추가
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src", "intranet_team1"))
+
+# 실제 MongoDB 로 돌리려면 TEST_MONGO_URI 를 준다 (TEST_MONGO_DB_NAME DB 를 테스트마다 비운다. 운영 DB 이름을 주지 말 것)
+# 없으면 mongomock 으로 돌린다
+TEST_MONGO_URI = os.environ.get("TEST_MONGO_URI")
+TEST_MONGO_DB_NAME = os.environ.get("TEST_MONGO_DB_NAME", "intranet_test")
+
+# pymongo 4.11+ 의 UpdateOne 은 bulk_write 에서 sort 인자를 넘기는데 mongomock 4.3 은 받지 못한다.
+# 우리 코드는 sort 를 쓰지 않으므로 값이 없을 때만 떼고 넘긴다
+_add_update = mongomock.collection.BulkOperationBuilder.add_update
+
+
+def _add_update_without_sort(self, *args, sort=None, **kwargs):
+    if sort is not None:
+        raise NotImplementedError("mongomock 은 bulk_write 의 sort 를 지원하지 않습니다")
+    return _add_update(self, *args, **kwargs)
+
+
+mongomock.collection.BulkOperationBuilder.add_update = _add_update_without_sort
+
+
+# mongomock 의 create_indexes 는 IndexModel 의 partialFilterExpression 을 버리므로 create_index 로 하나씩 만든다
+def _create_indexes_with_options(self, indexes, session=None, **kwargs):
+    return [self.create_index(list(model.document["key"].items()),
+                              **{k: v for k, v in model.document.items() if k != "key"})
+            for model in indexes]
+
+
+mongomock.collection.Collection.create_indexes = _create_indexes_with_options
+
+# GridFS(mongo_db) 가 mongomock DB 도 받도록
+mongomock.gridfs.enable_gridfs_integration()
+
+
+def _test_client():
+    if TEST_MONGO_URI:
+        return MongoClient(TEST_MONGO_URI, serverSelectionTimeoutMS=3000)
+    return mongomock.MongoClient()
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    """테스트용 DB. mongo_db 프록시가 이 DB 를 가리키도록 db 모듈의 클라이언트를 바꿔 끼운다"""
+    import db
+
+    client = _test_client()
+    client.drop_database(TEST_MONGO_DB_NAME)
+    db.close_client()
+    monkeypatch.setattr(db, "_create_client", lambda: client)
+    monkeypatch.setitem(db._settings, "MONGO_DB_NAME", TEST_MONGO_DB_NAME)
+    yield db.get_db()
+    client.drop_database(TEST_MONGO_DB_NAME)
+    db.close_client()
@@ -0,0 +1,41 @@
+from services.client_autocomplete import MAX_PREFIX_LENGTH, build_keys, choseong, search_key
+
+
+def test_choseong():
+    assert choseong("한빛") == "ㅎㅂ"
+    assert choseong("a한1") == "aㅎ1"
+
+
+def test_build_keys_prefixes_of_whole_name():
+    keys = build_keys("한빛소프트")
+    assert {"한", "한빛", "한빛소프트"} <= set(keys)
+    assert keys == sorted(keys)
+
+
+def test_build_keys_each_word_start_and_choseong():
+    keys = set(build_keys("(주) 한빛 소프트"))
+    # 공백/기호를 뺀 전체 이름, 뒤쪽 단어로 시작하는 이름, 초성
+    assert {"주한빛소프트", "한빛소프트", "소프트", "ㅎㅂㅅㅍㅌ", "ㅅㅍ"} <= keys
+    assert "빛소" not in keys
+
+
+def test_build_keys_limits_prefix_length():
+    keys = build_keys("가" * (MAX_PREFIX_LENGTH + 5))
+    assert max(len(key) for key in keys) == MAX_PREFIX_LENGTH
+
+
+def test_build_keys_empty():
+    assert build_keys("") == []
+    assert build_keys(None) == []
+
+
+def test_search_key_matches_build_keys():
+    assert search_key(" 한빛 소프트 ") == "한빛소프트"
+    assert search_key("HanBit") == "hanbit"
+    assert search_key("한빛 소") in build_keys("한빛소프트")
+
+
+def test_search_key_blank_and_long_terms():
+    assert search_key("  ") == ""
+    assert search_key("-- !!") == ""
+    assert len(search_key("가" * 50)) == MAX_PREFIX_LENGTH
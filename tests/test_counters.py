@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from services.counters import _apply_change, _counter_id, _post_keys, _task_keys
+
+
+def _values(mongo):
+    return {doc["_id"]: doc["value"] for doc in mongo["counters"].find()}
+
+
+def test_post_keys_all_time_and_month():
+    post = {"author_id": "u1", "created_at": datetime(2025, 7, 16, 9)}
+    assert _post_keys(post) == [
+        ("post_author", {"period": "all", "author": "u1"}),
+        ("post_author", {"period": "2025-07", "author": "u1"}),
+    ]
+
+
+def test_post_keys_without_date_or_author():
+    assert _post_keys({"author_id": "u1"}) == [("post_author", {"period": "all", "author": "u1"})]
+    assert _post_keys({"created_at": datetime(2025, 7, 16)}) == []
+    assert _post_keys(None) == []
+
+
+def test_counter_id_formats_dates():
+    dims = {"team": "개발팀", "status": "완료", "day": datetime(2025, 7, 16)}
+    assert _counter_id("task_day", dims) == "task_day|개발팀|완료|2025-07-16"
+
+
+def test_apply_change_insert_update_delete(mongo):
+    task = {"team": "개발팀", "status": "대기중", "due_date": datetime(2025, 7, 16, 18)}
+    _apply_change([], _task_keys(task))
+    assert _values(mongo) == {"task_status|개발팀|대기중": 1, "task_day|개발팀|대기중|2025-07-16": 1}
+
+    done = {**task, "status": "완료"}
+    _apply_change(_task_keys(task), _task_keys(done))
+    assert _values(mongo) == {
+        "task_status|개발팀|대기중": 0, "task_day|개발팀|대기중|2025-07-16": 0,
+        "task_status|개발팀|완료": 1, "task_day|개발팀|완료|2025-07-16": 1,
+    }
+
+    _apply_change(_task_keys(done), [])
+    assert set(_values(mongo).values()) == {0}
+
+
+def test_apply_change_without_difference_writes_nothing(mongo):
+    keys = _task_keys({"team": "개발팀", "status": "완료", "due_date": datetime(2025, 7, 16)})
+    _apply_change(keys, keys)
+    assert mongo["counters"].count_documents({}) == 0
+
+
+def test_apply_change_sets_dimensions_on_insert(mongo):
+    _apply_change([], _post_keys({"author_id": "u1", "created_at": datetime(2025, 7, 1)}))
+    doc = mongo["counters"].find_one({"_id": "post_author|2025-07|u1"})
+    assert doc == {"_id": "post_author|2025-07|u1", "value": 1, "scope": "post_author", "period": "2025-07", "author": "u1"}
@@ -0,0 +1,74 @@
+from bson.objectid import ObjectId
+
+from services.file_refs import deduplicate, release_file
+
+SHA = "ab" * 32
+
+
+def _store(mongo, sha256=SHA, length=10, metadata=None):
+    # GridFS 에 방금 저장된 파일처럼 fs.files / fs.chunks 문서를 만든다
+    file_id = ObjectId()
+    mongo["fs.files"].insert_one({"_id": file_id, "length": length, "metadata": metadata or {}})
+    mongo["fs.chunks"].insert_one({"files_id": file_id, "n": 0, "data": b"x" * length})
+    return file_id
+
+
+def _refcount(mongo, file_id):
+    doc = mongo["fs.files"].find_one({"_id": file_id})
+    return doc["metadata"]["refcount"] if doc else None
+
+
+def test_first_upload_gets_refcount_one(mongo):
+    file_id = _store(mongo)
+    assert deduplicate(file_id, SHA, 10) == (file_id, False)
+    assert _refcount(mongo, file_id) == 1
+
+
+def test_duplicate_reuses_existing_file_and_drops_new_one(mongo):
+    first = _store(mongo)
+    deduplicate(first, SHA, 10)
+    second = _store(mongo)
+
+    assert deduplicate(second, SHA, 10) == (first, True)
+    assert _refcount(mongo, first) == 2
+    assert mongo["fs.files"].find_one({"_id": second}) is None
+    assert mongo["fs.chunks"].count_documents({"files_id": second}) == 0
+
+
+def test_same_hash_with_different_size_is_not_duplicate(mongo):
+    first = _store(mongo)
+    deduplicate(first, SHA, 10)
+    other = _store(mongo, length=11)
+    assert deduplicate(other, SHA, 11) == (other, False)
+    assert _refcount(mongo, first) == 1
+
+
+def test_release_deletes_only_after_last_reference(mongo):
+    first = _store(mongo)
+    deduplicate(first, SHA, 10)
+    deduplicate(_store(mongo), SHA, 10)
+
+    assert release_file(first) is False
+    assert _refcount(mongo, first) == 1
+    assert release_file(first) is True
+    assert mongo["fs.files"].find_one({"_id": first}) is None
+    assert mongo["fs.chunks"].count_documents({"files_id": first}) == 0
+
+
+def test_released_file_is_not_reused(mongo):
+    # refcount 가 0 이 된(삭제 중인) 파일에는 참조를 붙이지 않는다
+    stale = _store(mongo, metadata={"sha256": SHA, "refcount": 0})
+    new = _store(mongo)
+    assert deduplicate(new, SHA, 10) == (new, False)
+    assert _refcount(mongo, stale) == 0
+
+
+def test_release_legacy_file_without_refcount(mongo):
+    # refcount 가 없는 기존 파일(프로필 사진 등)은 참조 1개로 보고 바로 삭제
+    legacy = _store(mongo)
+    assert release_file(legacy) is True
+    assert mongo["fs.files"].find_one({"_id": legacy}) is None
+
+
+def test_release_missing_file(mongo):
+    assert release_file(ObjectId()) is False
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+from werkzeug.http import http_date
+
+from extension import get_fs
+from services.file_stream import send_gridfs_file
+
+BODY = b"0123456789" * 10
+
+
+@pytest.fixture
+def app(mongo):
+    app = Flask(__name__)
+
+    @app.route("/files/<file_id>")
+    def download(file_id):
+        return send_gridfs_file(file_id, download_name=app.config.get("DOWNLOAD_NAME"))
+
+    return app
+
+
+@pytest.fixture
+def file_id(mongo):
+    # 청크 여러 개에 걸친 Range 를 확인하도록 작은 청크로 저장
+    return get_fs().put(BODY, filename="report.txt", content_type="text/plain", chunk_size=16)
+
+
+def _get(app, file_id, **headers):
+    return app.test_client().get(f"/files/{file_id}", headers=headers)
+
+
+def test_full_download(app, file_id):
+    res = _get(app, file_id)
+    assert res.status_code == 200
+    assert res.data == BODY
+    assert res.headers["Accept-Ranges"] == "bytes"
+    assert res.headers["Content-Length"] == str(len(BODY))
+    assert res.headers["ETag"]
+    assert res.headers["Content-Disposition"] == 'attachment; filename="report.txt"'
+
+
+def test_range_across_chunks(app, file_id):
+    res = _get(app, file_id, Range="bytes=10-39")
+    assert res.status_code == 206
+    assert res.data == BODY[10:40]
+    assert res.headers["Content-Range"] == f"bytes 10-39/{len(BODY)}"
+    assert res.headers["Content-Length"] == "30"
+
+
+def test_suffix_range(app, file_id):
+    res = _get(app, file_id, Range="bytes=-5")
+    assert res.status_code == 206
+    assert res.data == BODY[-5:]
+
+
+def test_unsatisfiable_range(app, file_id):
+    res = _get(app, file_id, Range=f"bytes={len(BODY)}-")
+    assert res.status_code == 416
+    assert res.headers["Content-Range"] == f"bytes */{len(BODY)}"
+
+
+def test_if_none_match_returns_304(app, file_id):
+    etag = _get(app, file_id).headers["ETag"]
+    res = _get(app, file_id, **{"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.data == b""
+    assert _get(app, file_id, **{"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_if_modified_since_returns_304(app, file_id):
+    later = http_date(datetime.utcnow() + timedelta(minutes=1))
+    assert _get(app, file_id, **{"If-Modified-Since": later}).status_code == 304
+    earlier = http_date(datetime.utcnow() - timedelta(days=1))
+    assert _get(app, file_id, **{"If-Modified-Since": earlier}).status_code == 200
+
+
+def test_if_range_with_stale_etag_sends_whole_file(app, file_id):
+    etag = _get(app, file_id).headers["ETag"]
+    res = _get(app, file_id, Range="bytes=0-9", **{"If-Range": etag})
+    assert res.status_code == 206
+    res = _get(app, file_id, Range="bytes=0-9", **{"If-Range": '"stale"'})
+    assert res.status_code == 200
+    assert res.data == BODY
+
+
+def test_etag_uses_content_hash(app, mongo):
+    file_id = get_fs().put(b"abc", filename="a.txt", metadata={"sha256": "deadbeef"})
+    assert _get(app, file_id).headers["ETag"] == '"deadbeef"'
+
+
+def test_download_name_sets_filename_and_type(app, file_id):
+    # 중복 제거로 공유된 파일은 문서에 저장된 이름/형식으로 내려준다
+    app.config["DOWNLOAD_NAME"] = "보고서.pdf"
+    res = _get(app, file_id)
+    assert res.mimetype == "application/pdf"
+    assert "filename*=UTF-8''%EB%B3%B4%EA%B3%A0%EC%84%9C.pdf" in res.headers["Content-Disposition"]
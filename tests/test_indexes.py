@@ -0,0 +1,40 @@
+from pymongo import ASCENDING, DESCENDING
+
+from services.indexes import INDEXES, _index_signature, ensure_indexes
+
+
+def test_ensure_indexes_creates_declared_indexes_once(mongo):
+    report = ensure_indexes(mongo)
+    assert len(report["created"]) == sum(len(models) for models in INDEXES.values())
+    assert report["drift"] == [] and report["errors"] == []
+
+    report = ensure_indexes(mongo)
+    assert report["created"] == [] and report["drift"] == []
+
+
+def test_signature_normalizes_server_values():
+    declared = {"key": {"a": 1, "b": -1}, "partialFilterExpression": {"x": {"$gt": 1}}}
+    returned = {"key": [("a", 1.0), ("b", -1.0)], "partialFilterExpression": {"x": {"$gt": 1.0}}, "v": 2}
+    assert _index_signature(declared) == _index_signature(returned)
+
+
+def test_key_order_matters():
+    assert _index_signature({"key": [("a", 1), ("b", 1)]}) != _index_signature({"key": [("b", 1), ("a", 1)]})
+
+
+def test_partial_filter_drift_is_reported(mongo):
+    # 같은 이름/키로 partialFilterExpression 없이 만들어진 기존 인덱스
+    mongo["clients"].create_index([("expiry_state", ASCENDING), ("contract.end_date", ASCENDING)],
+                                  name="expiry_state_end_date")
+    drift = ensure_indexes(mongo)["drift"]
+    assert len(drift) == 1 and drift[0].startswith("clients.expiry_state_end_date:")
+    assert "partialFilterExpression" in drift[0]
+
+
+def test_ttl_and_sparse_drift_is_reported(mongo):
+    mongo["contract_expiry_digest"].create_index([("generated_at", DESCENDING)], name="generated_at_ttl",
+                                                  expireAfterSeconds=3600)
+    mongo["counters"].create_index([("scope", ASCENDING), ("day", ASCENDING)], name="scope_day")
+    drift = ensure_indexes(mongo)["drift"]
+    assert sorted(item.split(":")[0] for item in drift) == ["contract_expiry_digest.generated_at_ttl",
+                                                            "counters.scope_day"]
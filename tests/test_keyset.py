@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+
+from services.keyset import decode_cursor, encode_cursor, keyset_page, keyset_query
+
+PAGE_SIZE = 3
+
+
+def _page(mongo, after=None, before=None):
+    # 라우트(issue_route, write_route)와 같은 순서로 한 페이지를 읽는다
+    query, direction = keyset_query({"kind": "post"}, after, before)
+    docs = list(mongo["items"].find(query).sort([("created_at", direction), ("_id", direction)]).limit(PAGE_SIZE + 1))
+    docs, prev_cursor, next_cursor = keyset_page(docs, PAGE_SIZE, after, before)
+    return [doc["n"] for doc in docs], decode_cursor(prev_cursor) if prev_cursor else None, \
+        decode_cursor(next_cursor) if next_cursor else None
+
+
+def _insert(mongo, count=8):
+    base = datetime(2025, 7, 1)
+    # 같은 created_at 이 여러 건이어도 _id 로 순서가 정해진다
+    mongo["items"].insert_many([{"_id": ObjectId(), "n": n, "kind": "post", "created_at": base + timedelta(hours=n // 2)}
+                                for n in range(count)])
+
+
+def test_cursor_round_trip():
+    doc = {"_id": ObjectId(), "created_at": datetime(2025, 7, 1, 9, 30, 15, 123000)}
+    assert decode_cursor(encode_cursor(doc)) == (doc["created_at"], doc["_id"])
+
+
+def test_invalid_cursor_means_first_page():
+    assert decode_cursor("garbage") is None
+    assert decode_cursor("2025-07-01T00:00:00_nothex") is None
+
+
+def test_forward_pages_are_newest_first_without_gaps(mongo):
+    _insert(mongo)
+    pages, after = [], None
+    while True:
+        numbers, prev_cursor, after = _page(mongo, after=after)
+        pages.append(numbers)
+        assert (prev_cursor is not None) == (len(pages) > 1)
+        if after is None:
+            break
+    assert pages == [[7, 6, 5], [4, 3, 2], [1, 0]]
+
+
+def test_back_paging_returns_the_same_pages(mongo):
+    _insert(mongo)
+    _, _, after = _page(mongo)
+    _, _, after = _page(mongo, after=after)
+    last, prev_cursor, next_cursor = _page(mongo, after=after)
+    assert last == [1, 0] and next_cursor is None
+
+    middle, prev_cursor, next_cursor = _page(mongo, before=prev_cursor)
+    assert middle == [4, 3, 2]
+    assert next_cursor is not None
+
+    first, prev_cursor, next_cursor = _page(mongo, before=prev_cursor)
+    assert first == [7, 6, 5]
+    assert prev_cursor is None
+    assert _page(mongo, after=next_cursor)[0] == [4, 3, 2]
+
+
+def test_back_paging_from_a_partial_last_page(mongo):
+    # 덜 찬 마지막 페이지에서 돌아와도 첫 페이지는 page_size 건이고 이전 cursor 가 없다
+    _insert(mongo, count=5)
+    _, _, after = _page(mongo)
+    _, prev_cursor, _ = _page(mongo, after=after)
+    numbers, prev_cursor, next_cursor = _page(mongo, before=prev_cursor)
+    assert numbers == [4, 3, 2]
+    assert prev_cursor is None and next_cursor is not None
+
+
+def test_empty_collection(mongo):
+    assert _page(mongo) == ([], None, None)
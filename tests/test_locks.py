@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+from services.locks import acquire_lock, release_lock
+
+
+def test_first_acquire_creates_lock(mongo):
+    assert acquire_lock("job", 60, owner="a") is True
+    assert mongo["locks"].find_one({"_id": "job"})["owner"] == "a"
+
+
+def test_other_owner_cannot_take_valid_lock(mongo):
+    acquire_lock("job", 60, owner="a")
+    assert acquire_lock("job", 60, owner="b") is False
+    assert mongo["locks"].find_one({"_id": "job"})["owner"] == "a"
+
+
+def test_owner_renews_lock(mongo):
+    acquire_lock("job", 1, owner="a")
+    first = mongo["locks"].find_one({"_id": "job"})["expires_at"]
+    assert acquire_lock("job", 600, owner="a") is True
+    assert mongo["locks"].find_one({"_id": "job"})["expires_at"] > first
+
+
+def test_expired_lock_is_taken_over(mongo):
+    mongo["locks"].insert_one({"_id": "job", "owner": "a", "expires_at": datetime.utcnow() - timedelta(seconds=1)})
+    assert acquire_lock("job", 60, owner="b") is True
+    assert mongo["locks"].find_one({"_id": "job"})["owner"] == "b"
+
+
+def test_release_only_by_owner(mongo):
+    acquire_lock("job", 60, owner="a")
+    release_lock("job", owner="b")
+    assert mongo["locks"].find_one({"_id": "job"}) is not None
+    release_lock("job", owner="a")
+    assert mongo["locks"].find_one({"_id": "job"}) is None
+    assert acquire_lock("job", 60, owner="b") is True
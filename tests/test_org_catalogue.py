@@ -0,0 +1,33 @@
+from services.org_catalogue import record_employee_change
+
+
+def _entries(mongo):
+    return {doc["_id"]: (doc["total"], doc["active"]) for doc in mongo["org_catalogue"].find()}
+
+
+EMPLOYEE = {"department": "개발팀", "position": "사원", "job_title": "팀원", "status": "재직중"}
+
+
+def test_new_employee_counts_total_and_active(mongo):
+    record_employee_change(None, EMPLOYEE)
+    assert _entries(mongo) == {"department|개발팀": (1, 1), "position|사원": (1, 1), "job_title|팀원": (1, 1)}
+
+
+def test_department_move_only_touches_changed_entries(mongo):
+    record_employee_change(None, EMPLOYEE)
+    record_employee_change(EMPLOYEE, {**EMPLOYEE, "department": " 영업팀 "})
+    assert _entries(mongo) == {
+        "department|개발팀": (0, 0), "department|영업팀": (1, 1),
+        "position|사원": (1, 1), "job_title|팀원": (1, 1),
+    }
+
+
+def test_retirement_keeps_total_and_drops_active(mongo):
+    record_employee_change(None, EMPLOYEE)
+    record_employee_change(EMPLOYEE, {**EMPLOYEE, "status": "퇴사"})
+    assert _entries(mongo) == {"department|개발팀": (1, 0), "position|사원": (1, 0), "job_title|팀원": (1, 0)}
+
+
+def test_unchanged_employee_writes_nothing(mongo):
+    record_employee_change(EMPLOYEE, dict(EMPLOYEE))
+    assert _entries(mongo) == {}
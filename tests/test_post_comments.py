@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson.objectid import ObjectId
+
+from services import post_comments
+from services.post_comments import (COMMENT_COUNT_EXPR, add_comment, comments_page, delete_comment, find_comment,
+                                    migrate_embedded_comments)
+
+BASE = datetime(2025, 7, 1)
+
+
+@pytest.fixture(autouse=True)
+def small_buckets(monkeypatch):
+    monkeypatch.setattr(post_comments, "BUCKET_SIZE", 3)
+
+
+def _comment(n):
+    return {"comment_id": ObjectId(), "content": f"댓글 {n}", "created_at": BASE + timedelta(minutes=n)}
+
+
+def _post(mongo, **fields):
+    return mongo["posts"].insert_one({"title": "글", **fields}).inserted_id
+
+
+def _page_contents(post_id, page):
+    return [c["content"] for c in comments_page(post_id, page)["comments"]]
+
+
+def _comment_count(mongo, post_id):
+    return mongo["posts"].find_one({"_id": post_id}).get("comment_count", 0)
+
+
+def test_buckets_roll_over_at_bucket_size(mongo):
+    post_id = _post(mongo)
+    for n in range(4):
+        add_comment(post_id, _comment(n))
+
+    assert [b["count"] for b in mongo["post_comments"].find().sort("_id", 1)] == [3, 1]
+    assert _comment_count(mongo, post_id) == 4
+    assert comments_page(post_id, 1)["has_next"] is True
+    assert _page_contents(post_id, 1) == ["댓글 0", "댓글 1", "댓글 2"]
+    assert _page_contents(post_id, 2) == ["댓글 3"]
+    assert comments_page(post_id, 2)["has_next"] is False
+
+
+def test_delete_does_not_reopen_a_closed_bucket(mongo):
+    post_id = _post(mongo)
+    comments = [_comment(n) for n in range(4)]
+    for comment in comments:
+        add_comment(post_id, comment)
+
+    assert delete_comment(post_id, comments[0]["comment_id"]) is True
+    add_comment(post_id, _comment(4))
+    # 빈자리가 생긴 닫힌 bucket 대신 열린 bucket 에 이어서 들어가 작성순이 유지된다
+    assert _page_contents(post_id, 1) == ["댓글 1", "댓글 2"]
+    assert _page_contents(post_id, 2) == ["댓글 3", "댓글 4"]
+    assert _comment_count(mongo, post_id) == 4
+
+
+def test_empty_closed_bucket_is_removed(mongo):
+    post_id = _post(mongo)
+    comments = [_comment(n) for n in range(4)]
+    for comment in comments:
+        add_comment(post_id, comment)
+    for comment in comments[:3]:
+        delete_comment(post_id, comment["comment_id"])
+
+    assert mongo["post_comments"].count_documents({"post_id": post_id}) == 1
+    assert _page_contents(post_id, 1) == ["댓글 3"]
+
+
+def test_delete_missing_comment(mongo):
+    post_id = _post(mongo)
+    add_comment(post_id, _comment(0))
+    assert delete_comment(post_id, ObjectId()) is False
+    assert _comment_count(mongo, post_id) == 1
+
+
+def test_legacy_post_is_migrated_before_first_write(mongo):
+    # 배포 전 comments 배열에 쌓인 댓글 (작성순이 아닐 수 있음)
+    legacy = [_comment(n) for n in (4, 0, 3, 1, 2)]
+    post_id = _post(mongo, comments=legacy)
+
+    add_comment(post_id, _comment(5))
+    post = mongo["posts"].find_one({"_id": post_id})
+    assert "comments" not in post
+    assert post["comment_count"] == 6
+    assert _page_contents(post_id, 1) == ["댓글 0", "댓글 1", "댓글 2"]
+    assert _page_contents(post_id, 2) == ["댓글 3", "댓글 4"]
+    assert _page_contents(post_id, 3) == ["댓글 5"]
+
+
+def test_legacy_comment_can_be_found_and_deleted(mongo):
+    legacy = [_comment(n) for n in range(2)]
+    post_id = _post(mongo, comments=legacy)
+
+    assert find_comment(post_id, legacy[1]["comment_id"])["content"] == "댓글 1"
+    assert delete_comment(post_id, legacy[0]["comment_id"]) is True
+    assert _comment_count(mongo, post_id) == 1
+
+
+def test_migration_counts_comments_once(mongo):
+    # 배포 후 새 bucket 에 달린 댓글 1개 + 아직 옮기지 않은 배열 댓글 2개
+    post_id = _post(mongo, comments=[_comment(0), _comment(1)], comment_count=1)
+    mongo["post_comments"].insert_one({"post_id": post_id, "comments": [_comment(2)], "count": 1, "pushed": 1})
+
+    assert migrate_embedded_comments() == (1, 2)
+    assert migrate_embedded_comments() == (0, 0)
+    assert _comment_count(mongo, post_id) == 3
+
+
+def test_comment_count_expr_covers_unmigrated_posts(mongo):
+    _post(mongo, comments=[_comment(0), _comment(1)], comment_count=1)
+    _post(mongo, comment_count=4)
+    _post(mongo)
+    counts = sorted(doc["count"] for doc in mongo["posts"].aggregate([{"$project": {"count": COMMENT_COUNT_EXPR}}]))
+    assert counts == [0, 3, 4]
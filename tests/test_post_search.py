@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+from markupsafe import Markup
+
+from services.post_search import is_searchable, rebuild_post_search, search_posts, tokenize
+
+
+def test_tokenize_bigrams():
+    assert tokenize("회의록") == {"회의", "의록"}
+
+
+def test_tokenize_keeps_single_character_words():
+    assert tokenize("a 회의") == {"a", "회의"}
+
+
+def test_tokenize_normalizes_case_and_splits_on_symbols():
+    assert tokenize("Deploy, 배포!") == tokenize("deploy 배포")
+    assert "de" in tokenize("DEPLOY")
+
+
+def test_tokenize_empty():
+    assert tokenize("") == set()
+    assert tokenize(None) == set()
+    assert tokenize("!!! ...") == set()
+
+
+def test_tokenize_nfd_input_matches_nfc():
+    # macOS 등에서 자모 분리(NFD)로 들어온 한글도 같은 bigram 이 된다
+    import unicodedata
+    assert tokenize(unicodedata.normalize("NFD", "회의록")) == tokenize("회의록")
+
+
+def test_is_searchable():
+    assert is_searchable("회의")
+    assert not is_searchable("   ")
+
+
+def _add_posts(mongo, *posts):
+    base = datetime(2025, 7, 1)
+    ids = mongo["posts"].insert_many([{"category": "free", "author_id": None, "created_at": base + timedelta(minutes=i), **post}
+                                      for i, post in enumerate(posts)]).inserted_ids
+    rebuild_post_search()
+    return ids
+
+
+def test_search_drops_bigram_false_positives(mongo):
+    # "가나" 와 "나다" 가 따로 있는 글은 "가나다" 검색에 나오지 않는다
+    hit, _ = _add_posts(mongo, {"title": "가나다 공지", "content": ""}, {"title": "가나 나다", "content": ""})
+    result = search_posts("가나다")
+    assert [post["_id"] for post in result["posts"]] == [hit]
+
+
+def test_search_ranks_title_matches_first(mongo):
+    in_content, in_title = _add_posts(mongo, {"title": "일정", "content": "배포 안내"}, {"title": "배포 안내", "content": ""})
+    assert [post["_id"] for post in search_posts("배포")["posts"]] == [in_title, in_content]
+
+
+def test_search_pages_common_term(mongo):
+    # 거의 모든 글에 나오는 단어: 검색어가 있는 글만 순위순으로 잘라 페이지를 나눈다
+    # 다섯 번째 글마다 bigram 은 모두 있지만 단어는 없는 후보("회의" + "의록")를 섞는다
+    posts = [{"title": "글", "content": "회의록 정리" if i % 5 else "회의 의록"} for i in range(12)]
+    ids = _add_posts(mongo, *posts)
+    hits = [post_id for i, post_id in enumerate(ids) if i % 5][::-1]
+
+    first = search_posts("회의록", page_size=3)
+    second = search_posts("회의록", page=2, page_size=3)
+    third = search_posts("회의록", page=3, page_size=3)
+    assert [p["_id"] for p in first["posts"] + second["posts"] + third["posts"]] == hits
+    assert first["has_next"] and second["has_next"] and not third["has_next"]
+    assert first["posts"][0]["snippet"] == Markup("<mark>회의록</mark> 정리")
+
+
+def test_search_filters_by_category_and_counts_comments(mongo):
+    notice, _ = _add_posts(mongo, {"title": "서버 점검", "content": "", "category": "notice", "comment_count": 2,
+                                   "comments": [{"content": "확인"}]},
+                           {"title": "서버 점검", "content": "", "category": "free"})
+    result = search_posts("서버", category="notice")
+    assert [post["_id"] for post in result["posts"]] == [notice]
+    assert result["posts"][0]["comment_count"] == 3
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from services.task_chart import DEFAULT_FUTURE_DAYS, DEFAULT_PAST_DAYS, _bucket, default_range
+
+
+def test_bucket_day():
+    day = datetime(2025, 7, 16)
+    assert _bucket(day, "day") == day
+
+
+def test_bucket_week_starts_on_monday():
+    # 2025-07-16 은 수요일
+    assert _bucket(datetime(2025, 7, 16), "week") == datetime(2025, 7, 14)
+    assert _bucket(datetime(2025, 7, 14), "week") == datetime(2025, 7, 14)
+    assert _bucket(datetime(2025, 7, 20), "week") == datetime(2025, 7, 14)
+
+
+def test_bucket_week_across_month_boundary():
+    assert _bucket(datetime(2025, 3, 1), "week") == datetime(2025, 2, 24)
+
+
+def test_bucket_month():
+    assert _bucket(datetime(2025, 7, 31), "month") == datetime(2025, 7, 1)
+
+
+def test_default_range_drops_time_of_day():
+    date_from, date_to = default_range(datetime(2025, 7, 16, 15, 30))
+    assert date_from == datetime(2025, 4, 17)
+    assert date_to == datetime(2025, 8, 15)
+    assert (date_to - date_from).days == DEFAULT_PAST_DAYS + DEFAULT_FUTURE_DAYS
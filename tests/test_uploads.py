@@ -0,0 +1,105 @@
+import hashlib
+import io
+
+import pytest
+from flask import Flask, jsonify, request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from extension import get_fs
+from services.uploads import GridFSUploadStream, init_uploads, store_upload, stream_uploads
+
+
+def _stream(data, max_file_size=0):
+    stream = GridFSUploadStream("a.txt", "text/plain", chunk_size=4, max_file_size=max_file_size)
+    for i in range(0, len(data), 5):
+        stream.write(data[i:i + 5])
+    # werkzeug 는 파트를 다 받으면 seek(0) 을 호출한다
+    stream.seek(0)
+    return stream
+
+
+def _counts(mongo):
+    return mongo["fs.files"].count_documents({}), mongo["fs.chunks"].count_documents({})
+
+
+def test_claim_keeps_file_with_hash_and_refcount(mongo):
+    stream = _stream(b"hello world")
+    file_id = stream.claim()
+    assert get_fs().get(file_id).read() == b"hello world"
+    metadata = mongo["fs.files"].find_one({"_id": file_id})["metadata"]
+    assert metadata == {"sha256": hashlib.sha256(b"hello world").hexdigest(), "refcount": 1}
+
+
+def test_claim_reuses_existing_file_with_same_content(mongo):
+    first = _stream(b"same").claim()
+    assert _stream(b"same").claim() == first
+    assert _counts(mongo) == (1, 1)
+
+
+def test_empty_file_is_kept(mongo):
+    stream = GridFSUploadStream("empty.txt", "text/plain", chunk_size=4, max_file_size=0)
+    stream.seek(0)
+    file_id = stream.claim()
+    assert get_fs().get(file_id).read() == b""
+
+
+def test_discard_after_finish_deletes_file_and_chunks(mongo):
+    stream = _stream(b"hello world")
+    stream.discard()
+    assert _counts(mongo) == (0, 0)
+
+
+def test_discard_before_finish_aborts_partial_upload(mongo):
+    stream = GridFSUploadStream("a.txt", "text/plain", chunk_size=4, max_file_size=0)
+    stream.write(b"hello world")
+    stream.discard()
+    assert _counts(mongo) == (0, 0)
+
+
+def test_file_over_limit_is_rejected_and_removed(mongo):
+    with pytest.raises(RequestEntityTooLarge):
+        _stream(b"x" * 20, max_file_size=12)
+    assert _counts(mongo) == (0, 0)
+
+
+@pytest.fixture
+def app(mongo):
+    app = Flask(__name__)
+    init_uploads(app)
+
+    @app.route("/keep", methods=["POST"])
+    @stream_uploads
+    def keep():
+        return jsonify(file_id=str(store_upload(request.files["file"])))
+
+    @app.route("/drop", methods=["POST"])
+    @stream_uploads
+    def drop():
+        # 파일 파트는 이미 GridFS 로 받았지만 검증 실패 등으로 저장하지 않고 끝난 요청
+        assert isinstance(request.files["file"].stream, GridFSUploadStream)
+        assert mongo["fs.files"].count_documents({}) == 1
+        return "", 400
+
+    return app
+
+
+def _post(app, path, data=b"hello world"):
+    return app.test_client().post(path, data={"file": (io.BytesIO(data), "a.txt")},
+                                  content_type="multipart/form-data")
+
+
+def test_claimed_upload_survives_request(app, mongo):
+    res = _post(app, "/keep")
+    assert res.status_code == 200
+    assert mongo["fs.files"].count_documents({}) == 1
+
+
+def test_unclaimed_upload_is_discarded_at_teardown(app, mongo):
+    assert _post(app, "/drop").status_code == 400
+    assert _counts(mongo) == (0, 0)
+
+
+def test_upload_over_limit_returns_413(app, mongo):
+    app.config["UPLOAD_MAX_FILE_BYTES"] = 5
+    assert _post(app, "/keep").status_code == 413
+    assert _counts(mongo) == (0, 0)